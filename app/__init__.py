@@ -5,9 +5,38 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_socketio import SocketIO
 
+from app.admission import AdmissionController
+from app.context_window import ContextWindow
+from app.conversation_store import ConversationStore
+from app.database import configure_engines, engine_options
+from app.executor import BackgroundExecutor
+from app.greeting_cache import GreetingCache
+from app.http_client import OpenRouterClient
+from app.logs import configure_logging
+from app.model_router import ModelRouter
+from app.persistence import WriteBehindWriter
+from app.prompts import PromptBook
+from app.readiness import ReadinessScorer
+from app.response_cache import ResponseCache
+from app.reports import ReportJobs
+from app.stt import TranscriptionPool
+
 db = SQLAlchemy()
 login_manager = LoginManager()
 socketio = SocketIO()
+openrouter = OpenRouterClient()
+model_router = ModelRouter()
+executor = BackgroundExecutor()
+stt = TranscriptionPool()
+conversations = ConversationStore()
+writer = WriteBehindWriter()
+greetings = GreetingCache()
+prompts = PromptBook()
+response_cache = ResponseCache()
+context_window = ContextWindow()
+readiness = ReadinessScorer()
+reports = ReportJobs()
+admission = AdmissionController()
 
 
 def create_app(config_class="config.Config"):
@@ -15,9 +44,13 @@ def create_app(config_class="config.Config"):
 
     app = Flask(__name__)
     app.config.from_object(config_class)
+    configure_logging(app.config["LOG_LEVEL"], app.config["LOG_FORMAT"])
 
     # ── Eklentiler ──────────────────────────────────────────
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
     db.init_app(app)
+    configure_engines(app, db)
+    writer.init_app(app, db)
 
     login_manager.login_view = "main.login"
     login_manager.login_message = "Lütfen giriş yapın."
@@ -28,8 +61,24 @@ def create_app(config_class="config.Config"):
         app,
         cors_allowed_origins="*",
         max_http_buffer_size=app.config["MAX_AUDIO_BUFFER"],
+        async_mode=app.config["SOCKETIO_ASYNC_MODE"],
+        message_queue=app.config["SOCKETIO_MESSAGE_QUEUE"],
+        channel=app.config["SOCKETIO_CHANNEL"],
     )
 
+    openrouter.init_app(app)
+    model_router.init_app(app)
+    admission.init_app(app)
+    executor.init_app(app)
+    stt.init_app(app, socketio)
+    conversations.init_app(app)
+    prompts.init_app(app)
+    response_cache.init_app(app)
+    greetings.init_app(app, executor)
+    context_window.init_app(app, conversations, executor)
+    readiness.init_app(app)
+    reports.init_app(app, db, executor, socketio)
+
     # ── Kullanıcı yükleyiciler ──────────────────────────────
     @login_manager.user_loader
     def load_user(user_id):
@@ -50,30 +99,8 @@ def create_app(config_class="config.Config"):
     from app import socket_events  # noqa: F401
 
     # ── CLI komutları ────────────────────────────────────────
-    @app.cli.command("create-db")
-    def create_db_cmd():
-        db.create_all()
-        print("✅ Veritabanı oluşturuldu.")
+    from app.cli import register_commands
 
-    # ── Otomatik kullanıcı seed ──────────────────────────────
-    with app.app_context():
-        from app.models import User
-        from werkzeug.security import generate_password_hash
-
-        db.create_all()  # Tabloları oluştur (yoksa)
-
-        # 'test' kullanıcısı yoksa oluştur
-        test_user = User.query.filter_by(username="test").first()
-        if not test_user:
-            test_user = User(
-                username="test",
-                password_hash=generate_password_hash("test123", method="pbkdf2:sha256"),
-                role="user",
-            )
-            db.session.add(test_user)
-            db.session.commit()
-            print("✅ Test kullanıcısı oluşturuldu (username: test, password: test123)")
-        else:
-            print("ℹ️  Test kullanıcısı zaten mevcut")
+    register_commands(app)
 
     return app
@@ -0,0 +1,172 @@
+"""LLM ve STT istekleri için kabul denetimi (admission control).
+
+Her istek iki token kovasından geçer: kullanıcı başına ve süreç geneli.
+LLM çağrıları ayrıca eşzamanlılık semaforu ile sınırlanır. Kova boşsa
+veya semafor doluysa istek en fazla ``ADMISSION_QUEUE_TIMEOUT`` saniye
+bekler; bu sürede yer açılmayacaksa ``AdmissionRejected`` yükselir ve
+işleyici istemciye ``busy`` olayı gönderir. STT'de eşzamanlılığı iş
+süreci sayısı ve sınırlı kuyruk (``STT_WORKERS``, ``STT_QUEUE_SIZE``)
+belirler; burada yalnızca hız sınırı uygulanır ve beklenmez.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from app.metrics import ADMISSION_REJECTED, ADMISSION_WAIT
+
+_MAX_USER_BUCKETS = 10000
+
+
+class AdmissionRejected(Exception):
+    """İstek kabul edilmedi; ``retry_after`` saniye sonra tekrar denenebilir."""
+
+    def __init__(self, kind, reason, retry_after):
+        self.kind = kind  # "llm" | "stt"
+        self.reason = reason  # "rate_limited" | "overloaded"
+        self.retry_after = max(1, round(retry_after))
+        ADMISSION_REJECTED.inc(kind=kind, reason=reason)
+        super().__init__(f"{kind} isteği reddedildi ({reason}), {self.retry_after} sn sonra deneyin")
+
+    def to_event(self):
+        """İstemciye gönderilecek ``busy`` olayı verisi."""
+        return {
+            "kind": self.kind,
+            "reason": self.reason,
+            "retry_after": self.retry_after,
+            "message": (
+                f"Sunucu şu anda yoğun, lütfen {self.retry_after} saniye sonra "
+                "tekrar deneyin."
+            ),
+        }
+
+
+class TokenBucket:
+    """``rate`` token/saniye dolan, en fazla ``burst`` token tutan kova."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        """Bir token ayırmayı dene; ``(ayrıldı_mı, bekleme_süresi)`` döndür.
+
+        Token hemen yoksa dolmasına kalan süre hesaplanır; bu süre
+        ``max_wait``'i aşarsa token ayrılmaz.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                return False, wait
+            self._tokens -= 1  # eksiye düşebilir: sıradaki bekleyiş uzar
+            return True, wait
+
+    def refund(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class AdmissionController:
+    """Kullanıcı ve süreç kovaları + LLM eşzamanlılık semaforu.
+
+    Kullanıcı kovaları sınırlı bir LRU'da tutulur; en uzun süredir
+    görülmeyen kullanıcının kovası önce düşer.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._user_buckets = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        self.enabled = cfg["ADMISSION_CONTROL"]
+        self.queue_timeout = cfg["ADMISSION_QUEUE_TIMEOUT"]
+        self._limits = {
+            "llm": (cfg["LLM_RATE_PER_USER"], cfg["LLM_RATE_GLOBAL"]),
+            "stt": (cfg["STT_RATE_PER_USER"], cfg["STT_RATE_GLOBAL"]),
+        }
+        self._global = {
+            kind: TokenBucket(per_min / 60, max(1, per_min // 10))
+            for kind, (_, per_min) in self._limits.items()
+        }
+        self._llm_slots = threading.BoundedSemaphore(cfg["LLM_MAX_CONCURRENCY"])
+        app.extensions["admission"] = self
+
+    # ── Genel API ───────────────────────────────────────────
+
+    @contextmanager
+    def llm_slot(self, user_id=None):
+        """LLM çağrısı için hız + eşzamanlılık izni al; blok süresince tut."""
+        if not self.enabled:
+            yield
+            return
+
+        started = time.monotonic()
+        deadline = started + self.queue_timeout
+        taken = self._take("llm", user_id, deadline)
+        remaining = max(0.0, deadline - time.monotonic())
+        if not self._llm_slots.acquire(timeout=remaining):
+            # Çağrı yapılmadı: hız bütçesi reddedilen isteğe harcanmasın
+            for bucket in taken:
+                bucket.refund()
+            raise AdmissionRejected("llm", "overloaded", self.queue_timeout)
+        ADMISSION_WAIT.observe(time.monotonic() - started, kind="llm")
+        try:
+            yield
+        finally:
+            self._llm_slots.release()
+
+    def admit_stt(self, user_id=None):
+        """STT isteği için hız sınırını kontrol et (beklemeden)."""
+        if self.enabled:
+            self._take("stt", user_id, time.monotonic())
+
+    # ── İç işlemler ─────────────────────────────────────────
+
+    def _user_bucket(self, kind, user_id):
+        key = (kind, user_id)
+        with self._lock:
+            bucket = self._user_buckets.get(key)
+            if bucket is None:
+                per_min = self._limits[kind][0]
+                bucket = TokenBucket(per_min / 60, max(1, per_min // 4))
+                self._user_buckets[key] = bucket
+                while len(self._user_buckets) > _MAX_USER_BUCKETS:
+                    self._user_buckets.popitem(last=False)
+            else:
+                self._user_buckets.move_to_end(key)
+            return bucket
+
+    def _take(self, kind, user_id, deadline):
+        """Kullanıcı ve genel kovadan token al; gerekirse süre sonuna kadar bekle.
+
+        Token alınan kovaları döndürür (sonradan iade edilebilmesi için).
+        """
+        buckets = [self._global[kind]]
+        if user_id is not None:
+            buckets.insert(0, self._user_bucket(kind, user_id))
+
+        taken = []
+        wait = 0.0
+        for bucket in buckets:
+            ok, needed = bucket.reserve(max(0.0, deadline - time.monotonic()))
+            if not ok:
+                for previous in taken:
+                    previous.refund()
+                reason = "rate_limited" if bucket is not self._global[kind] else "overloaded"
+                raise AdmissionRejected(kind, reason, needed)
+            taken.append(bucket)
+            wait = max(wait, needed)
+        if wait:
+            time.sleep(wait)
+        return taken
@@ -0,0 +1,127 @@
+"""Flask CLI komutları (``flask --app run <komut>``).
+
+Şema oluşturma ve seed işlemleri her açılışta ve her worker'da değil,
+yalnızca bu komutlar çalıştırıldığında yapılır.
+"""
+
+import click
+
+from app import db
+
+
+def register_commands(app):
+    """Uygulamaya CLI komutlarını kaydet."""
+
+    @app.cli.command("create-db")
+    def create_db_cmd():
+        db.create_all()
+        print("✅ Veritabanı oluşturuldu.")
+
+    @app.cli.command("stt-bench")
+    @click.argument("clips_dir", type=click.Path(exists=True, file_okay=False))
+    @click.option("--model", "models", multiple=True, metavar="ARKA_UÇ:MODEL[:COMPUTE]",
+                  help="Karşılaştırılacak yapılandırma (tekrarlanabilir); "
+                       "verilmezse geçerli STT ayarları.")
+    @click.option("--beam-size", type=int, help="Işın genişliği (varsayılan: STT_BEAM_SIZE).")
+    @click.option("--temperature", type=float, help="Çözme sıcaklığı (varsayılan: 0).")
+    @click.option("--threads", type=int, help="faster-whisper CPU iş parçacığı sayısı.")
+    @click.option("--no-prompt", is_flag=True, help="WHISPER_INITIAL_PROMPT kullanma.")
+    @click.option("--runs", default=1, show_default=True, help="Her klibin kaç kez çevrileceği.")
+    @click.option("--json", "json_path", type=click.Path(dir_okay=False),
+                  help="Özet ve klip sonuçlarını bu dosyaya yaz.")
+    def stt_bench_cmd(clips_dir, models, beam_size, temperature, threads, no_prompt, runs,
+                      json_path):
+        """Ses kliplerinde RTF, bellek, yükleme süresi ve WER ölç."""
+        import json
+
+        from app import stt
+        from app.stt.bench import (
+            config_label,
+            find_clips,
+            format_table,
+            parse_config,
+            run_isolated,
+            summarize,
+        )
+
+        clips = find_clips(clips_dir)
+        if not clips:
+            raise click.ClickException(f"{clips_dir} içinde ses kaydı yok.")
+        base = dict(stt.settings)
+        if beam_size is not None:
+            base["beam_size"] = beam_size
+        if temperature is not None:
+            base["temperature"] = temperature
+        if threads is not None:
+            base["cpu_threads"] = threads
+        if no_prompt:
+            base["initial_prompt"] = None
+        try:
+            configs = [parse_config(spec, base) for spec in models] or [base]
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--model") from None
+
+        with_refs = sum(1 for _path, reference in clips if reference is not None)
+        print(f"{len(clips)} klip ({with_refs} referanslı), {len(configs)} yapılandırma")
+        rows, report = [], []
+        for settings in configs:
+            print(f"  → {config_label(settings)} ...", flush=True)
+            try:
+                result = run_isolated(settings, clips, runs)
+            except RuntimeError as e:
+                print(f"  ❌ {e}")
+                continue
+            summary = summarize(settings, result)
+            rows.append(summary)
+            report.append({"summary": summary, "clips": result["clips"]})
+
+        if rows:
+            print()
+            print(format_table(rows))
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"📄 {json_path}")
+
+    @app.cli.command("migrate-db")
+    def migrate_db_cmd():
+        """Mevcut veritabanına eksik sütun ve indeksleri ekle."""
+        from app.migrations import upgrade_schema
+
+        applied = upgrade_schema(db)
+        for change in applied:
+            print(f"  + {change}")
+        print("✅ Şema güncel." if applied else "ℹ️  Şema zaten güncel.")
+
+    @app.cli.command("seed-db")
+    def seed_db_cmd():
+        """'test' kullanıcısı yoksa oluştur."""
+        from werkzeug.security import generate_password_hash
+
+        from app.models import User
+
+        test_user = User.query.filter_by(username="test").first()
+        if not test_user:
+            test_user = User(
+                username="test",
+                password_hash=generate_password_hash("test123", method="pbkdf2:sha256"),
+                role="user",
+            )
+            db.session.add(test_user)
+            db.session.commit()
+            print("✅ Test kullanıcısı oluşturuldu (username: test, password: test123)")
+        else:
+            print("ℹ️  Test kullanıcısı zaten mevcut")
+
+    @app.cli.command("warm-greetings")
+    def warm_greetings_cmd():
+        """Karşılama önbelleğini tüm tarzlar için doldur."""
+        from app import greetings, prompts
+        from app.services import prefill_greetings
+
+        if not greetings.enabled:
+            print("ℹ️  GREETING_CACHE kapalı.")
+            return
+        for tarz, added in prefill_greetings(prompts.styles, wait=True).items():
+            print(f"  {tarz}: +{added} (toplam {greetings.size(tarz)})")
+        print(f"✅ Karşılama önbelleği hazır: {greetings.path}")
@@ -4,6 +4,7 @@ PSIKOLOG_TARZLARI = {
     "samimi": {
         "isim": "İrem",
         "aciklama": "Sıcakkanlı ve Samimi",
+        "slogan": "Arkadaşça, rahatlatıcı bir sohbet ortamı",
         "avatar": (
             "https://api.dicebear.com/9.x/toon-head/svg"
             "?seed=i&backgroundColor=c0aede&eyes=happy&mouth=laugh"
@@ -19,6 +20,7 @@ PSIKOLOG_TARZLARI = {
     "profesyonel": {
         "isim": "Tuğrul",
         "aciklama": "Profesyonel ve Deneyimli",
+        "slogan": "Sakin, güven veren bilimsel yaklaşım",
         "avatar": (
             "https://api.dicebear.com/9.x/toon-head/svg"
             "?seed=Tugrul&backgroundColor=b6e3f4&eyes=happy&mouth=laugh"
@@ -34,6 +36,7 @@ PSIKOLOG_TARZLARI = {
     "duygusal": {
         "isim": "Yasemin",
         "aciklama": "Duygusal ve Empatik",
+        "slogan": "Hislerini derinden anlayan, şefkatli",
         "avatar": (
             "https://api.dicebear.com/9.x/toon-head/svg"
             "?seed=yaso&backgroundColor=ffd5dc&eyes=happy&mouth=laugh"
@@ -48,6 +51,7 @@ PSIKOLOG_TARZLARI = {
     "gercekci": {
         "isim": "Ali",
         "aciklama": "Gerçekçi ve Doğrudan",
+        "slogan": "Net, açık ve dürüst geri bildirimler",
         "avatar": (
             "https://api.dicebear.com/9.x/toon-head/svg"
             "?seed=ali&backgroundColor=d1f4d1&eyes=happy&mouth=laugh"
@@ -60,3 +64,9 @@ PSIKOLOG_TARZLARI = {
         ),
     },
 }
+
+# Anlam taşımayan dolgu kelimeleri ("bilmiyorum ki" = "bilmiyorum ya");
+# yanıt önbelleği eşleştirmede atar, READY puanı konu saymaz
+DOLGU_KELIMELERI = frozenset({
+    "ki", "ya", "yani", "valla", "vallahi", "hm", "hmm", "ı", "e", "şey", "işte",
+})
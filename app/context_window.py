@@ -0,0 +1,155 @@
+"""Uzun görüşmeler için istem boyutu yönetimi.
+
+Her turda geçmişin tamamını göndermek yerine son ``CONTEXT_RECENT_TURNS``
+tur olduğu gibi, daha eskileri ise artımlı olarak güncellenen bir özet
+halinde gönderilir. Özet yalnızca pencere ``CONTEXT_SUMMARY_STEP`` tur
+kaydığında (arka planda) güncellenir; istem ``CONTEXT_TOKEN_BUDGET``'ı
+aşarsa eski turlar hemen özete katlanır. Özet durumu görüşme deposunda
+``<conversation_id>:ctx`` anahtarıyla tutulur, böylece tüm worker'lar
+aynı özeti kullanır.
+
+Token sayımı ``tiktoken`` kuruluysa onunla, değilse karakter tabanlı bir
+tahminle yapılır.
+"""
+
+import threading
+
+_ENCODING = None
+_MESSAGE_OVERHEAD = 4  # rol ve ayırıcılar için mesaj başına yaklaşık token
+
+
+def count_tokens(text):
+    """Metindeki token sayısı (``tiktoken`` yoksa ~3 karakter/token tahmini)."""
+    global _ENCODING
+    if _ENCODING is None:
+        try:
+            import tiktoken
+
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _ENCODING = False
+    if _ENCODING:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 2) // 3
+
+
+def count_message_tokens(messages):
+    """OpenAI formatındaki mesaj listesinin istem token sayısı."""
+    return sum(
+        count_tokens(message["content"]) + _MESSAGE_OVERHEAD for message in messages
+    )
+
+
+class ContextWindow:
+    """Özet + son turlar penceresi.
+
+    Özet görüşme deposunda durur; arka plan katlaması görüşme başına aynı
+    anda bir kez çalışır.
+    """
+
+    def __init__(self, app=None, store=None, executor=None):
+        self.enabled = False
+        self._folding = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, store, executor)
+
+    def init_app(self, app, store, executor):
+        cfg = app.config
+        self.enabled = cfg["CONTEXT_SUMMARY"]
+        self.recent_items = 2 * max(1, cfg["CONTEXT_RECENT_TURNS"])
+        self.step_items = 2 * max(1, cfg["CONTEXT_SUMMARY_STEP"])
+        self.token_budget = cfg["CONTEXT_TOKEN_BUDGET"]
+        self._store = store
+        self._executor = executor
+        app.extensions["context_window"] = self
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def build(self, conversation_id, history, render, summarize):
+        """İstem mesajlarını oluştur.
+
+        ``render(summary, items)`` mesaj listesini üretir (``summary`` yoksa
+        ``None``); ``summarize(previous_summary, items)`` eski turları önceki
+        özete katlayıp yeni özeti (hata durumunda ``None``) döndürür.
+        """
+        return render(*self.select(conversation_id, history, render, summarize))
+
+    def select(self, conversation_id, history, render, summarize):
+        """Pencereyi ``(özet, son öğeler)`` olarak seç; ``build`` ile aynı kurallar.
+
+        Aynı tur için birden çok istem (sohbet yanıtı ve READY kontrolü)
+        üretilecekse pencere bir kez seçilip paylaşılır; böylece eski turlar
+        eşzamanlı olarak iki kez özete katlanmaz.
+        """
+        if not self.enabled or not conversation_id:
+            return None, history
+
+        summary, covered = self._state(conversation_id)
+        covered = min(covered, len(history))
+        recent = history[covered:]
+
+        if count_message_tokens(render(summary, recent)) > self.token_budget:
+            # Bütçe aşıldı: sığana kadar en eski turları hemen özete kat
+            fold = 0
+            while len(recent) - fold > 2 and count_message_tokens(
+                render(summary, recent[fold:])
+            ) > self.token_budget:
+                fold += 2
+            if fold:
+                new_summary = summarize(summary, recent[:fold])
+                if new_summary:
+                    summary = new_summary
+                    self._save(conversation_id, summary, covered + fold)
+                recent = recent[fold:]
+        elif len(recent) > self.recent_items + self.step_items:
+            # Pencere kaydı: özeti arka planda güncelle, bu tur eski özetle git
+            fold = len(recent) - self.recent_items
+            fold -= fold % 2
+            self._schedule_fold(
+                conversation_id, summary, covered, recent[:fold], summarize
+            )
+
+        return summary, recent
+
+    def forget(self, conversation_id):
+        """Görüşmeye ait özet durumunu sil."""
+        if conversation_id:
+            self._store.delete(self._key(conversation_id))
+
+    # ── Özet durumu ─────────────────────────────────────────
+
+    @staticmethod
+    def _key(conversation_id):
+        return f"{conversation_id}:ctx"
+
+    def _state(self, conversation_id):
+        """(özet, özetlenen öğe sayısı) — kayıt yoksa (None, 0)."""
+        records = self._store.get(self._key(conversation_id))
+        if not records:
+            return None, 0
+        return records[-1]["summary"], records[-1]["covered"]
+
+    def _save(self, conversation_id, summary, covered):
+        self._store.append(
+            self._key(conversation_id), {"summary": summary, "covered": covered}
+        )
+
+    def _schedule_fold(self, conversation_id, summary, covered, items, summarize):
+        with self._lock:
+            if conversation_id in self._folding:
+                return
+            self._folding.add(conversation_id)
+        self._executor.submit(
+            self._fold, conversation_id, summary, covered, items, summarize
+        )
+
+    def _fold(self, conversation_id, summary, covered, items, summarize):
+        try:
+            new_summary = summarize(summary, items)
+            # Bu arada bütçe nedeniyle başka bir katlama yapıldıysa yazma
+            if new_summary and self._state(conversation_id)[1] == covered:
+                self._save(conversation_id, new_summary, covered + len(items))
+        finally:
+            with self._lock:
+                self._folding.discard(conversation_id)
@@ -0,0 +1,179 @@
+"""Sunucu tarafı görüşme geçmişi deposu.
+
+Görüşme geçmişi artık imzalı çerez oturumunda değil, oturumdaki
+``conversation_id`` ile anahtarlanan bir depoda tutulur. Yazmalar yalnızca
+ekleme (append) şeklindedir; her tur geçmişin tamamını değil tek bir öğeyi
+yazar. Arka uçlar: süreç içi LRU (``memory``), SQLite (``sqlite``) ve Redis
+protokolü konuşan herhangi bir sunucu (``redis``).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+
+
+# ── Arka uçlar ──────────────────────────────────────────────
+
+class MemoryBackend:
+    """Süreç içi, en az kullanılanı atan (LRU) depo."""
+
+    def __init__(self, max_conversations=1000):
+        self.max_conversations = max_conversations
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, conversation_id, item):
+        with self._lock:
+            items = self._data.setdefault(conversation_id, [])
+            items.append(item)
+            self._data.move_to_end(conversation_id)
+            while len(self._data) > self.max_conversations:
+                self._data.popitem(last=False)
+
+    def get(self, conversation_id):
+        with self._lock:
+            items = self._data.get(conversation_id)
+            if items is None:
+                return []
+            self._data.move_to_end(conversation_id)
+            return list(items)
+
+    def delete(self, conversation_id):
+        with self._lock:
+            self._data.pop(conversation_id, None)
+
+
+class SQLiteBackend:
+    """Her öğeyi ayrı satır olarak ekleyen SQLite deposu (iş parçacığı başına bağlantı)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS conversation_items ("
+            " conversation_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " item TEXT NOT NULL,"
+            " PRIMARY KEY (conversation_id, seq))"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, conversation_id, item):
+        self._conn().execute(
+            "INSERT INTO conversation_items (conversation_id, seq, item) VALUES ("
+            " ?, (SELECT COALESCE(MAX(seq), -1) + 1 FROM conversation_items"
+            " WHERE conversation_id = ?), ?)",
+            (conversation_id, conversation_id, json.dumps(item, ensure_ascii=False)),
+        )
+
+    def get(self, conversation_id):
+        rows = self._conn().execute(
+            "SELECT item FROM conversation_items WHERE conversation_id = ? ORDER BY seq",
+            (conversation_id,),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def delete(self, conversation_id):
+        self._conn().execute(
+            "DELETE FROM conversation_items WHERE conversation_id = ?",
+            (conversation_id,),
+        )
+
+
+class RedisBackend:
+    """Redis listesi (RPUSH/LRANGE) kullanan depo.
+
+    Redis protokolü konuşan her sunucuyla çalışır (Redis, Valkey, KeyDB veya
+    geliştirmede yerel bir yedek sunucu). ``redis`` paketi gerektirir.
+    """
+
+    def __init__(self, url, ttl=None, prefix="anamnez:conv:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CONVERSATION_STORE=redis için 'redis' paketi kurulmalı."
+            ) from e
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def append(self, conversation_id, item):
+        key = self.prefix + conversation_id
+        pipe = self._client.pipeline()
+        pipe.rpush(key, json.dumps(item, ensure_ascii=False))
+        if self.ttl:
+            pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def get(self, conversation_id):
+        raw = self._client.lrange(self.prefix + conversation_id, 0, -1)
+        return [json.loads(value) for value in raw]
+
+    def delete(self, conversation_id):
+        self._client.delete(self.prefix + conversation_id)
+
+
+# ── Depo ────────────────────────────────────────────────────
+
+class ConversationStore:
+    """Görüşme geçmişlerinin tek erişim noktası.
+
+    Arka uç ``init_app``'te seçilir; kilitleme ve kayıt ömrü (ör. Redis
+    TTL) arka uca aittir.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        kind = cfg["CONVERSATION_STORE"]
+        url = cfg["CONVERSATION_STORE_URL"]
+
+        if kind == "memory":
+            self.backend = MemoryBackend(cfg["CONVERSATION_STORE_MAX"])
+        elif kind == "sqlite":
+            path = url or os.path.join(app.instance_path, "conversations.db")
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.backend = SQLiteBackend(path)
+        elif kind == "redis":
+            self.backend = RedisBackend(
+                url or "redis://localhost:6379/0", ttl=cfg["CONVERSATION_TTL"]
+            )
+        else:
+            raise ValueError(f"Bilinmeyen CONVERSATION_STORE: {kind!r}")
+
+        app.extensions["conversations"] = self
+
+    @staticmethod
+    def new_id():
+        """Yeni bir görüşme kimliği üret."""
+        return uuid.uuid4().hex
+
+    def append(self, conversation_id, item):
+        """Görüşmeye tek bir mesaj ekle (O(1) yazma)."""
+        self.backend.append(conversation_id, item)
+
+    def get(self, conversation_id):
+        """Görüşme geçmişini sırasıyla döndür (yoksa boş liste)."""
+        if not conversation_id:
+            return []
+        return self.backend.get(conversation_id)
+
+    def delete(self, conversation_id):
+        if conversation_id:
+            self.backend.delete(conversation_id)
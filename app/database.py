@@ -0,0 +1,59 @@
+"""Veritabanı motoru profilleri — SQLite ayarları ve sunucu DB havuzu."""
+
+from sqlalchemy import event
+
+
+def is_sqlite(uri):
+    return uri.startswith("sqlite")
+
+
+def engine_options(config):
+    """Bağlantı adresine göre ``SQLALCHEMY_ENGINE_OPTIONS`` oluştur.
+
+    Yapılandırmada elle verilen seçenekler korunur; profil yalnızca eksik
+    anahtarları doldurur.
+    """
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if not config["DB_TUNING"]:
+        return options
+
+    if is_sqlite(config["SQLALCHEMY_DATABASE_URI"]):
+        connect_args = dict(options.get("connect_args") or {})
+        # sqlite3 sürücüsünün kendi kilit bekleme süresi (saniye)
+        connect_args.setdefault("timeout", config["SQLITE_BUSY_TIMEOUT_MS"] / 1000)
+        options["connect_args"] = connect_args
+    else:
+        options.setdefault("pool_size", config["DB_POOL_SIZE"])
+        options.setdefault("max_overflow", config["DB_MAX_OVERFLOW"])
+        options.setdefault("pool_pre_ping", True)
+        options.setdefault("pool_recycle", config["DB_POOL_RECYCLE"])
+    return options
+
+
+def apply_sqlite_pragmas(engine, config):
+    """Her yeni SQLite bağlantısında WAL ve performans PRAGMA'larını uygula."""
+    pragmas = (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def configure_engines(app, db):
+    """``db.init_app`` sonrası motorlara profil olay dinleyicilerini bağla."""
+    if not app.config["DB_TUNING"]:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                apply_sqlite_pragmas(engine, app.config)
@@ -0,0 +1,38 @@
+"""Arka plan işleri için sınırlı iş parçacığı havuzu."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundExecutor:
+    """Uygulama bağlamında çalışan, boyutu sınırlı görev havuzu.
+
+    Socket/HTTP işleyicilerinin beklemek zorunda olmadığı işler (ör. READY
+    kontrolü) buraya gönderilir; dönen ``Future`` ile sonuç daha sonra
+    alınabilir veya iptal edilebilir.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pool = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self.app = app
+        self._pool = ThreadPoolExecutor(
+            max_workers=app.config["BACKGROUND_WORKERS"],
+            thread_name_prefix="anamnez-bg",
+        )
+        app.extensions["executor"] = self
+
+    def submit(self, fn, *args, **kwargs):
+        """``fn``'i uygulama bağlamı içinde havuza gönder, ``Future`` döndür."""
+        app = self.app
+
+        def run():
+            with app.app_context():
+                return fn(*args, **kwargs)
+
+        return self._pool.submit(run)
@@ -0,0 +1,167 @@
+"""İlk karşılama mesajları için tarz + model başına önbellek havuzu.
+
+Karşılama istemi yalnızca psikolog tarzına bağlıdır; her yeni görüşmede
+LLM'e gitmek yerine her (tarz, model) için ``GREETING_POOL_SIZE`` adet
+farklı karşılama tutulur ve aralarından rastgele biri seçilir. Süresi
+(``GREETING_TTL``) dolan karşılamalar atılır; eksilen havuz arka planda
+yeniden doldurulur. Havuz JSON dosyasına yazılır, yeniden başlatmada
+okunur.
+"""
+
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class GreetingCache:
+    """(tarz, model) anahtarlı karşılama havuzları.
+
+    Havuzlar bellekte kilitle korunur ve her değişiklikte JSON dosyasına
+    yazılır; süreç yeniden başlasa da korunur.
+    """
+
+    def __init__(self, app=None, executor=None):
+        self.enabled = False
+        self._pools = {}
+        self._filling = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # dosyaya yazma sırası
+        if app is not None:
+            self.init_app(app, executor)
+
+    def init_app(self, app, executor):
+        cfg = app.config
+        self.enabled = cfg["GREETING_CACHE"]
+        self.pool_size = max(1, cfg["GREETING_POOL_SIZE"])
+        self.ttl = cfg["GREETING_TTL"]
+        self.model = app.extensions["model_router"].primary("karşılama")
+        self.path = cfg["GREETING_CACHE_PATH"] or os.path.join(
+            app.instance_path, "greetings.json"
+        )
+        self._executor = executor
+        self._pools = self._load() if self.enabled else {}
+        app.extensions["greetings"] = self
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def get(self, style, generate):
+        """Havuzdan rastgele bir karşılama döndür.
+
+        Havuz boşsa ``generate()`` ile bir tane üretilir (``None`` dönerse
+        ``None`` döner); havuz eksikse kalanı arka planda doldurulur. Arka
+        plan dolumu eşzamanlı üretim bittikten sonra başlar, böylece aynı
+        anda iki çağrı yapılmaz.
+        """
+        key = self._key(style)
+        with self._lock:
+            texts = self._valid_locked(key)
+
+        if texts:
+            if len(texts) < self.pool_size:
+                self.schedule_fill(style, generate)
+            return random.choice(texts)
+
+        text = generate()
+        if text:
+            self._add(key, text)
+            self.schedule_fill(style, generate)
+        return text
+
+    def schedule_fill(self, style, generate):
+        """Havuzu arka planda ``GREETING_POOL_SIZE``'a tamamla (aynı anda bir kez)."""
+        key = self._key(style)
+        with self._lock:
+            if key in self._filling:
+                return
+            self._filling.add(key)
+        self._executor.submit(self._fill_and_release, style, generate)
+
+    def fill(self, style, generate):
+        """Havuzu eşzamanlı olarak doldur; eklenen karşılama sayısını döndür."""
+        key = self._key(style)
+        added = 0
+        # Aynı metin tekrar gelirse sonsuza kadar denemeyelim
+        for _ in range(self.pool_size * 2):
+            with self._lock:
+                if len(self._valid_locked(key)) >= self.pool_size:
+                    break
+            text = generate()
+            if not text:
+                break
+            if self._add(key, text):
+                added += 1
+        return added
+
+    def size(self, style):
+        with self._lock:
+            return len(self._valid_locked(self._key(style)))
+
+    # ── İç işlemler ─────────────────────────────────────────
+
+    def _key(self, style):
+        return f"{self.model}::{style}"
+
+    def _valid_locked(self, key):
+        """Süresi dolanları at, geçerli metinleri döndür."""
+        entries = self._pools.get(key, [])
+        cutoff = time.time() - self.ttl
+        fresh = [entry for entry in entries if entry["created_at"] >= cutoff]
+        if len(fresh) != len(entries):
+            self._pools[key] = fresh
+        return [entry["text"] for entry in fresh]
+
+    def _add(self, key, text):
+        with self._lock:
+            entries = self._pools.setdefault(key, [])
+            if any(entry["text"] == text for entry in entries):
+                return False
+            entries.append({"text": text, "created_at": time.time()})
+            del entries[:-self.pool_size]
+        self._save()
+        return True
+
+    def _fill_and_release(self, style, generate):
+        try:
+            self.fill(style, generate)
+        finally:
+            with self._lock:
+                self._filling.discard(self._key(style))
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Karşılama önbelleği okunamadı (%s): %s", self.path, e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self):
+        # Eşzamanlı doldurmalar sırayla yazar; anlık görüntü kilit içinde
+        # alındığından eski bir görüntü yenisinin üzerine yazılmaz.
+        # Yarım yazılmış dosya kalmasın: benzersiz geçici dosyaya yaz, sonra değiştir
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with self._save_lock:
+            with self._lock:
+                snapshot = json.dumps(self._pools, ensure_ascii=False, indent=1)
+            tmp = None
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(
+                    dir=directory, prefix=os.path.basename(self.path) + ".", suffix=".tmp"
+                )
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(snapshot)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logger.warning("Karşılama önbelleği yazılamadı (%s): %s", self.path, e)
+                if tmp is not None and os.path.exists(tmp):
+                    os.remove(tmp)
@@ -0,0 +1,194 @@
+"""OpenRouter için havuzlu, keep-alive HTTP istemcisi.
+
+Tüm LLM çağrıları süreç genelinde tek bir ``requests.Session`` üzerinden
+gider; böylece TCP+TLS bağlantıları yeniden kullanılır. İstemci bağlantı/okuma
+zaman aşımı, 429/5xx için jitter'lı geri çekilmeli sınırlı tekrar ve art arda
+hatalarda upstream'i dinlendiren bir devre kesici uygular. Devre kesici model
+başınadır: bir modelin sağlayıcısı çöktüğünde yedek modeller çağrılabilir.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHAT_COMPLETIONS_PATH = "/chat/completions"
+
+# Tekrar denenecek HTTP durum kodları
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Devre kesici açık — istek upstream'e gönderilmedi."""
+
+
+# ── Devre Kesici ────────────────────────────────────────────
+
+class CircuitBreaker:
+    """Art arda hata sayısına göre açılan basit devre kesici.
+
+    ``threshold`` kadar ardışık başarısız çağrıdan sonra devre açılır ve
+    ``reset_after`` saniye boyunca istekler hemen reddedilir. Süre dolunca
+    tek bir deneme isteğine izin verilir (half-open); başarılı olursa devre
+    kapanır, olmazsa tekrar açılır.
+    """
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """İstek gönderilebilir mi?"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                # Half-open: bir denemeye izin ver, yeniden açılmaya hazır ol
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+
+# ── İstemci ─────────────────────────────────────────────────
+
+class OpenRouterClient:
+    """Süreç genelinde paylaşılan OpenRouter istemcisi.
+
+    Keep-alive oturumunu ve model başına devre kesicileri tutar; ayarlar
+    ``Config.OPENROUTER_*`` anahtarlarından okunur.
+    """
+
+    def __init__(self, app=None):
+        self._session = None
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        self.circuit_threshold = 5
+        self.circuit_reset = 30.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        self.url = cfg["OPENROUTER_BASE_URL"].rstrip("/") + CHAT_COMPLETIONS_PATH
+        self.api_key = cfg["OPENROUTER_API_KEY"]
+        # Kabul denetimi bu kadar eşzamanlı çağrıya izin verir; her birine
+        # havuzda bir keep-alive bağlantı düşmeli
+        self.pool_size = max(cfg["OPENROUTER_POOL_SIZE"], cfg["LLM_MAX_CONCURRENCY"])
+        self.timeout = (cfg["OPENROUTER_CONNECT_TIMEOUT"], cfg["OPENROUTER_READ_TIMEOUT"])
+        self.max_retries = cfg["OPENROUTER_MAX_RETRIES"]
+        self.backoff_base = cfg["OPENROUTER_BACKOFF_BASE"]
+        self.backoff_max = cfg["OPENROUTER_BACKOFF_MAX"]
+        self.retry_budget = cfg["OPENROUTER_RETRY_BUDGET"]
+        self.circuit_threshold = cfg["OPENROUTER_CIRCUIT_THRESHOLD"]
+        self.circuit_reset = cfg["OPENROUTER_CIRCUIT_RESET"]
+        self._breakers = {}
+
+        if self._session is not None:
+            self._session.close()
+        self._session = self._build_session()
+        app.extensions["openrouter"] = self
+
+    def _build_session(self):
+        """Keep-alive bağlantı havuzlu oturum oluştur."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            # Havuz doluysa beklemek yerine geçici bağlantı aç: urllib3'te
+            # bloklu havuzun bekleme süresi yoktur ve işleyici asılı kalır
+            pool_block=False,
+            max_retries=0,  # Tekrarları kendimiz yönetiyoruz
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
+        return session
+
+    def breaker(self, model):
+        """Modelin devre kesicisi (ilk kullanımda oluşturulur)."""
+        with self._breakers_lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = self._breakers[model] = CircuitBreaker(
+                    threshold=self.circuit_threshold, reset_after=self.circuit_reset
+                )
+            return breaker
+
+    def _backoff(self, attempt, response=None):
+        """Full-jitter üstel geri çekilme süresi (Retry-After'a saygılı)."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, body, timeout=None, retries=None, **kwargs):
+        """Chat completion isteği gönder, ``requests.Response`` döndür.
+
+        Bağlantı hataları, zaman aşımları ve 429/5xx yanıtları toplam
+        ``retry_budget`` saniyeyi aşmadan ``max_retries`` kez tekrar denenir.
+        Tekrarlar tükendiğinde son hata yükseltilir ya da son hatalı yanıt
+        döndürülür (çağıran taraf gövdeyi zaten kontrol ediyor). ``timeout``
+        (okuma zaman aşımı, saniye) ve ``retries`` bu çağrı için varsayılanları
+        değiştirir; yedek modeli olan çağrılar aynı modelde tekrar beklemez.
+        """
+        if self._session is None:
+            raise RuntimeError("OpenRouterClient.init_app çağrılmadı.")
+        breaker = self.breaker(body.get("model"))
+        if not breaker.allow():
+            raise CircuitOpenError(f"OpenRouter devre kesicisi açık ({body.get('model')}).")
+
+        timeout = self.timeout if timeout is None else (self.timeout[0], timeout)
+        retries = self.max_retries if retries is None else retries
+        started = time.monotonic()
+        last_exc = None
+        response = None
+
+        for attempt in range(retries + 1):
+            try:
+                response = self._session.post(
+                    self.url, json=body, timeout=timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_exc, response = e, None
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                last_exc = None
+                response.close()
+
+            if attempt == retries:
+                break
+            delay = self._backoff(attempt, response)
+            if time.monotonic() - started + delay > self.retry_budget:
+                break
+            time.sleep(delay)
+
+        breaker.record_failure()
+        if last_exc is not None:
+            raise last_exc
+        return response
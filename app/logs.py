@@ -0,0 +1,63 @@
+"""Uygulama loglarının yapılandırılması.
+
+Modüller ``logging.getLogger(__name__)`` ile ``app.*`` altında log yazar;
+düzey ``LOG_LEVEL``, biçim ``LOG_FORMAT`` ile seçilir:
+
+- ``text``: ``zaman düzey modül: mesaj k=v ...``
+- ``json``: satır başına bir JSON nesnesi (log toplayıcılar için)
+
+``extra={...}`` ile verilen alanlar her iki biçimde de mesaja eklenir.
+"""
+
+import json
+import logging
+import sys
+
+# LogRecord'un kendi öznitelikleri; bunların dışındakiler "extra" alanıdır
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def _extra_fields(record):
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = {k: v for k, v in _extra_fields(record).items() if v is not None}
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level="INFO", fmt="text"):
+    """``app`` log ağacına tek bir stderr işleyicisi kur (idempotent)."""
+    logger = logging.getLogger("app")
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_anamnez", False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    handler._anamnez = True
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
@@ -0,0 +1,316 @@
+"""Prometheus metin biçiminde sayaç, gösterge ve histogramlar.
+
+Ek bağımlılık gerektirmeyen küçük bir ölçüm katmanı: ölçümler modül
+düzeyinde tanımlanır ve süreç içinde tutulur; ``/metrics`` uç noktası
+``render()`` çıktısını döndürür. STT iş süreçlerindeki süreler sonuçla
+birlikte ana sürece taşınıp burada kaydedilir. Birden çok sunucu
+süreci varsa her biri ayrı ayrı kazınır (scrape).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+_REGISTRY = []
+
+# Saniye cinsinden varsayılan histogram dilimleri (LLM ve DB için geniş aralık)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: etiketler {sorted(labels)} yerine {list(self.labelnames)} olmalı"
+            )
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines += self._samples()
+        return "\n".join(lines)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Anlık değer; ``set_function`` ile kazıma anında hesaplanabilir."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """Etiketsiz gösterge değerini her kazımada ``function()`` ile al."""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                return []
+        return super()._samples()
+
+
+class Histogram(_Metric):
+    """Dilimli dağılım (``_bucket``, ``_sum``, ``_count``)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Blok süresini gözlemle (hata olsa da)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels):
+        """``(toplam, adet)`` — benchmark ve testler için."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return (state[1], state[2]) if state else (0.0, 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render():
+    """Tüm ölçümleri Prometheus metin biçiminde (0.0.4) döndür."""
+    return "\n".join(metric.render() for metric in _REGISTRY) + "\n"
+
+
+# ── LLM ─────────────────────────────────────────────────────
+
+LLM_LATENCY = Histogram(
+    "anamnez_llm_request_seconds",
+    "OpenRouter çağrı süresi (akışta son parçaya kadar).",
+    ["caller", "outcome"],
+)
+LLM_FIRST_TOKEN = Histogram(
+    "anamnez_llm_first_token_seconds",
+    "Akışlı çağrıda ilk parçanın gelme süresi.",
+    ["caller"],
+)
+LLM_TOKENS = Counter(
+    "anamnez_llm_tokens_total",
+    "API'nin bildirdiği token kullanımı (istem / yanıt).",
+    ["caller", "kind"],
+)
+LLM_ERRORS = Counter(
+    "anamnez_llm_errors_total",
+    "Başarısız OpenRouter çağrıları.",
+    ["caller"],
+)
+FALLBACKS = Counter(
+    "anamnez_fallback_responses_total",
+    "LLM yerine yedek metin veya yerel karar kullanılan durumlar.",
+    ["caller"],
+)
+LLM_ROUTE_ATTEMPTS = Counter(
+    "anamnez_llm_route_attempts_total",
+    "Görev ve model başına deneme sayısı (yedek modeller dahil).",
+    ["route", "model", "outcome"],
+)
+LLM_ROUTE_LATENCY = Gauge(
+    "anamnez_llm_route_latency_seconds",
+    "Görev/model başarılı çağrı süresinin üstel ortalaması.",
+    ["route", "model"],
+)
+LLM_ROUTE_ERROR_RATE = Gauge(
+    "anamnez_llm_route_error_rate",
+    "Görev/model hata oranının üstel ortalaması.",
+    ["route", "model"],
+)
+LLM_ROUTE_FALLBACKS = Counter(
+    "anamnez_llm_route_fallbacks_total",
+    "Zincirdeki ilk model yerine yedek modelin yanıt verdiği çağrılar.",
+    ["route", "model"],
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "anamnez_response_cache_lookups_total",
+    "Yanıt önbelleği aramaları (exact / similar isabet, miss).",
+    ["result"],
+)
+RESPONSE_CACHE_ENTRIES = Gauge(
+    "anamnez_response_cache_entries",
+    "Yanıt önbelleğindeki girdi sayısı.",
+)
+ADMISSION_REJECTED = Counter(
+    "anamnez_admission_rejected_total",
+    "Kabul denetiminin geri çevirdiği istekler.",
+    ["kind", "reason"],
+)
+ADMISSION_WAIT = Histogram(
+    "anamnez_admission_wait_seconds",
+    "Kabul edilen isteklerin token ve eşzamanlılık için beklediği süre.",
+    ["kind"],
+)
+
+# ── STT ─────────────────────────────────────────────────────
+
+STT_DECODE = Histogram(
+    "anamnez_stt_decode_seconds",
+    "Sıkıştırılmış kaydın PCM'e çözülme süresi.",
+)
+STT_TRANSCRIBE = Histogram(
+    "anamnez_stt_transcribe_seconds",
+    "Modelin transkripsiyon süresi (çözme hariç).",
+    ["backend", "model"],
+)
+STT_REAL_TIME_FACTOR = Histogram(
+    "anamnez_stt_real_time_factor",
+    "Transkripsiyon süresi / ses süresi.",
+    ["backend", "model"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5),
+)
+STT_AUDIO_SECONDS = Counter(
+    "anamnez_stt_audio_seconds_total",
+    "Çevrilen toplam ses süresi.",
+)
+STT_QUEUE_WAIT = Histogram(
+    "anamnez_stt_queue_wait_seconds",
+    "İşin kuyrukta bir iş sürecine verilene kadar beklediği süre.",
+)
+STT_ERRORS = Counter(
+    "anamnez_stt_errors_total",
+    "Başarısız transkripsiyonlar.",
+)
+STT_QUEUE_DEPTH = Gauge(
+    "anamnez_stt_queue_depth",
+    "Kuyrukta bekleyen transkripsiyon işi.",
+)
+STT_BUSY_WORKERS = Gauge(
+    "anamnez_stt_busy_workers",
+    "Şu anda iş çeviren STT süreci sayısı.",
+)
+STT_BATCH_SIZE = Histogram(
+    "anamnez_stt_batch_size",
+    "Tek model geçişinde birlikte çevrilen klip sayısı.",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+STT_BATCH_MODEL_SECONDS = Counter(
+    "anamnez_stt_batch_model_seconds_total",
+    "Yığın boyutuna göre toplam model süresi.",
+    ["batch_size"],
+)
+STT_BATCH_AUDIO_SECONDS = Counter(
+    "anamnez_stt_batch_audio_seconds_total",
+    "Yığın boyutuna göre çevrilen toplam ses süresi.",
+    ["batch_size"],
+)
+STT_BATCH_SPEEDUP = Gauge(
+    "anamnez_stt_batch_speedup",
+    "Toplu çıkarımın tekli çıkarıma göre kazancı (tekli RTF / toplu RTF).",
+)
+
+# ── Veritabanı ──────────────────────────────────────────────
+
+DB_COMMIT = Histogram(
+    "anamnez_db_commit_seconds",
+    "INSERT + commit süresi.",
+    ["path"],
+)
+DB_ROWS = Counter(
+    "anamnez_db_rows_written_total",
+    "Yazılan satır sayısı.",
+    ["path"],
+)
+DB_ERRORS = Counter(
+    "anamnez_db_write_errors_total",
+    "Geri alınan yazma işlemleri.",
+    ["path"],
+)
+DB_WRITE_QUEUE = Gauge(
+    "anamnez_db_write_queue_depth",
+    "Write-behind kuyruğunda bekleyen satır.",
+)
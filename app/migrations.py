@@ -0,0 +1,41 @@
+"""Mevcut veritabanları için hafif şema yükseltmesi.
+
+``db.create_all()`` var olan tablolara sütun veya indeks eklemez. Bu modül
+modellerde tanımlı olup veritabanında eksik olan sütunları
+``ALTER TABLE ... ADD COLUMN`` ile, eksik indeksleri ``CREATE INDEX`` ile
+ekler. Yalnızca ekleme yapar; hiçbir veri silinmez veya değiştirilmez.
+"""
+
+from sqlalchemy import inspect
+
+
+def _add_column_sql(engine, table, column):
+    column_type = column.type.compile(dialect=engine.dialect)
+    preparer = engine.dialect.identifier_preparer
+    return (
+        f"ALTER TABLE {preparer.quote(table.name)} "
+        f"ADD COLUMN {preparer.quote(column.name)} {column_type}"
+    )
+
+
+def upgrade_schema(db):
+    """Eksik tabloları, sütunları ve indeksleri oluştur; yapılanları döndür."""
+    engine = db.engine
+    db.create_all()  # Hiç olmayan tablolar
+
+    inspector = inspect(engine)
+    applied = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    conn.exec_driver_sql(_add_column_sql(engine, table, column))
+                    applied.append(f"{table.name}.{column.name} sütunu")
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    applied.append(f"{index.name} indeksi")
+    return applied
@@ -0,0 +1,140 @@
+"""Görev başına model seçimi ve yedek model zinciri.
+
+Her LLM çağrısının bir görevi (``caller`` etiketi) vardır: ``sohbet``,
+``karşılama``, ``özet``, ``ready`` ve ``analiz``. ``LLM_ROUTES`` her görev
+için sırayla denenecek modelleri verir (boşsa ``OPENROUTER_MODEL``);
+``OPENROUTER_FALLBACK_MODELS`` tüm zincirlerin sonuna eklenir. Böylece READY
+sınıflandırması hızlı/ucuz, rapor analizi daha güçlü bir modelle çalışabilir.
+
+Her (görev, model) için gecikme ve hata oranı üstel hareketli ortalama
+ile izlenir. Zincir sırası şu kurallarla değişir:
+
+- art arda ``LLM_ROUTE_MAX_FAILURES`` hata veren ya da hata oranı
+  ``LLM_ROUTE_ERROR_THRESHOLD``'u aşan model ``LLM_ROUTE_COOLDOWN`` saniye
+  boyunca sona alınır; süre dolunca yeniden denenir,
+- ortalama gecikmesi görevin okuma zaman aşımının yarısını aşan model
+  yavaş sayılır ve sağlıklı, hızlı modellerin arkasına düşer. Yavaş
+  model ``LLM_ROUTE_COOLDOWN`` boyunca hiç çağrılmazsa ölçümü eskimiş
+  sayılır ve yeniden sırasına döner (gecikmesi tekrar ölçülür).
+
+İstatistikler süreç içindedir ve ``/metrics``'te yayımlanır.
+"""
+
+import threading
+import time
+
+from app.metrics import LLM_ROUTE_ATTEMPTS, LLM_ROUTE_ERROR_RATE, LLM_ROUTE_LATENCY
+
+_ALPHA = 0.2  # üstel ortalama ağırlığı
+_MIN_CALLS = 5  # hata oranına bakmadan önce gereken çağrı sayısı
+
+
+def parse_models(value):
+    """``"a, b,c"`` → ``["a", "b", "c"]``"""
+    return [model.strip() for model in (value or "").split(",") if model.strip()]
+
+
+class _ModelStats:
+    __slots__ = ("latency", "error_rate", "calls", "failures", "cooldown_until", "updated")
+
+    def __init__(self):
+        self.updated = time.monotonic()
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+
+class ModelRouter:
+    """Görev → model zinciri; model başına gecikme/hata istatistikleri tek kilit altında tutulur."""
+
+    def __init__(self, app=None):
+        self._chains = {}
+        self._timeouts = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        default = cfg["OPENROUTER_MODEL"]
+        fallbacks = parse_models(cfg["OPENROUTER_FALLBACK_MODELS"])
+        self._chains = {}
+        for route, models in cfg["LLM_ROUTES"].items():
+            chain = parse_models(models) or [default]
+            # Sıra korunarak tekrarlar atılır
+            self._chains[route] = list(dict.fromkeys(chain + fallbacks))
+        self._default_chain = list(dict.fromkeys([default] + fallbacks))
+        self.default_timeout = cfg["OPENROUTER_READ_TIMEOUT"]
+        self._timeouts = dict(cfg["LLM_ROUTE_TIMEOUTS"])
+        self.max_failures = cfg["LLM_ROUTE_MAX_FAILURES"]
+        self.error_threshold = cfg["LLM_ROUTE_ERROR_THRESHOLD"]
+        self.cooldown = cfg["LLM_ROUTE_COOLDOWN"]
+        self._stats = {}
+        app.extensions["model_router"] = self
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def chain(self, route):
+        """Görevin yapılandırılmış model zinciri (sağlık durumundan bağımsız)."""
+        return self._chains.get(route, self._default_chain)
+
+    def primary(self, route):
+        return self.chain(route)[0]
+
+    def timeout(self, route):
+        """Görevin tek deneme için okuma zaman aşımı (saniye)."""
+        return self._timeouts.get(route, self.default_timeout)
+
+    def candidates(self, route):
+        """Bu çağrıda denenecek modeller, sağlık durumuna göre sıralı."""
+        chain = self.chain(route)
+        if len(chain) == 1:
+            return list(chain)
+        now = time.monotonic()
+        slow_after = self.timeout(route) / 2
+        with self._lock:
+            def rank(indexed):
+                position, model = indexed
+                stats = self._stats.get((route, model))
+                if stats is None:
+                    return (0, position)
+                if stats.cooldown_until > now:
+                    return (2, stats.cooldown_until)
+                fresh = now - stats.updated < self.cooldown
+                if fresh and stats.latency is not None and stats.latency > slow_after:
+                    return (1, stats.latency)
+                return (0, position)
+
+            return [model for _position, model in sorted(enumerate(chain), key=rank)]
+
+    def record(self, route, model, seconds, ok):
+        """Bir denemenin sonucunu istatistiklere işle."""
+        with self._lock:
+            stats = self._stats.get((route, model))
+            if stats is None:
+                stats = self._stats[(route, model)] = _ModelStats()
+            stats.calls += 1
+            stats.updated = time.monotonic()
+            stats.error_rate += _ALPHA * ((0.0 if ok else 1.0) - stats.error_rate)
+            if ok:
+                stats.failures = 0
+                stats.latency = (
+                    seconds if stats.latency is None
+                    else stats.latency + _ALPHA * (seconds - stats.latency)
+                )
+            else:
+                stats.failures += 1
+                if stats.failures >= self.max_failures or (
+                    stats.calls >= _MIN_CALLS and stats.error_rate > self.error_threshold
+                ):
+                    stats.cooldown_until = time.monotonic() + self.cooldown
+                    stats.failures = 0
+            latency, error_rate = stats.latency, stats.error_rate
+
+        LLM_ROUTE_ATTEMPTS.inc(route=route, model=model, outcome="ok" if ok else "error")
+        LLM_ROUTE_ERROR_RATE.set(error_rate, route=route, model=model)
+        if latency is not None:
+            LLM_ROUTE_LATENCY.set(latency, route=route, model=model)
@@ -24,9 +24,14 @@ class Answer(db.Model):
     """Cevap modeli — her soru-cevap çifti için bir kayıt."""
 
     __tablename__ = "answers"
+    __table_args__ = (
+        db.Index("ix_answers_user_id_created_at", "user_id", "created_at"),
+        db.Index("ix_answers_conversation_id", "conversation_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    conversation_id = db.Column(db.String(32), nullable=True)
     question_text = db.Column(db.Text, nullable=False)
     answer_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -36,9 +41,14 @@ class TestResult(db.Model):
     """Test sonucu modeli — görüşme sonu analiz raporu."""
 
     __tablename__ = "test_results"
+    __table_args__ = (
+        db.Index("ix_test_results_user_id_created_at", "user_id", "created_at"),
+        db.Index("ix_test_results_conversation_id", "conversation_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    conversation_id = db.Column(db.String(32), nullable=True)
     result_summary = db.Column(db.Text, nullable=True)
     dsm_diagnosis = db.Column(db.Text, nullable=True)
     psychologist_note = db.Column(db.Text, nullable=True)
@@ -0,0 +1,166 @@
+"""Write-behind kalıcılık katmanı — Answer/TestResult eklemelerini toplu yazar.
+
+İşleyiciler satırı kuyruğa bırakıp hemen döner; arka plan iş parçacığı
+kuyruktaki satırları ``PERSISTENCE_BATCH_SIZE`` dolunca veya
+``PERSISTENCE_FLUSH_INTERVAL`` saniye geçince tek bir işlemde (tek fsync)
+yazar. Başarısız toplu yazma (ör. geçici ``database is locked``) artan
+beklemeyle ``PERSISTENCE_RETRIES`` kez tekrarlanır; yine olmazsa satırlar
+tek tek yazılır, böylece tek bir hatalı satır diğerlerini kaybettirmez.
+Süreç kapanırken kuyruk tamamen boşaltılır. Testler için
+``PERSISTENCE_MODE = "sync"`` her eklemeyi anında commit eder.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from app.metrics import DB_COMMIT, DB_ERRORS, DB_ROWS, DB_WRITE_QUEUE
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindWriter:
+    """Model satırlarını tamponlayıp toplu ``INSERT`` ile yazan yazıcı."""
+
+    def __init__(self, app=None, db=None):
+        self.app = None
+        self.db = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        cfg = app.config
+        self.app = app
+        self.db = db
+        self.mode = cfg["PERSISTENCE_MODE"]
+        self.batch_size = cfg["PERSISTENCE_BATCH_SIZE"]
+        self.flush_interval = cfg["PERSISTENCE_FLUSH_INTERVAL"]
+        self.retries = cfg["PERSISTENCE_RETRIES"]
+        self.retry_backoff = cfg["PERSISTENCE_RETRY_BACKOFF"]
+        app.extensions["persistence"] = self
+        DB_WRITE_QUEUE.set_function(self._queue.qsize)
+        if self.mode == "async":
+            atexit.register(self.shutdown)
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def add(self, model, **values):
+        """``model`` için bir satır ekle.
+
+        ``created_at`` kuyruğa alındığı an olarak sabitlenir; böylece kayıt
+        zamanı yazma gecikmesinden etkilenmez. ``shutdown()`` sonrasında
+        eklenen satırlar kuyruğa alınmaz, hemen yazılır.
+        """
+        values.setdefault("created_at", datetime.utcnow())
+
+        if self.mode == "sync":
+            with DB_COMMIT.time(path="sync"):
+                self.db.session.add(model(**values))
+                self.db.session.commit()
+            DB_ROWS.inc(path="sync")
+            return
+
+        with self._lock:
+            if not self._stop.is_set():
+                self._ensure_worker_locked()
+                self._queue.put((model, values))
+                return
+        # Yazıcı durduruldu: kuyruğu okuyan kalmadı
+        self._write([(model, values)])
+
+    def flush(self):
+        """Kuyruktaki tüm satırları hemen yaz; yazılan satır sayısını döndür."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._write(batch)
+        return len(batch)
+
+    def shutdown(self):
+        """Arka plan iş parçacığını durdur ve kalan satırları yaz."""
+        with self._lock:
+            self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    # ── Arka plan ───────────────────────────────────────────
+
+    def _ensure_worker_locked(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="anamnez-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+
+        rows = defaultdict(list)
+        for model, values in batch:
+            rows[model].append(values)
+
+        with self.app.app_context():
+            for attempt in range(self.retries + 1):
+                error = self._commit(rows.items(), "batch")
+                if error is None:
+                    return
+                if attempt < self.retries:
+                    delay = self.retry_backoff * 2 ** attempt
+                    logger.warning(
+                        "Toplu yazma hatası (%d kayıt, %.1f sn sonra tekrar): %s",
+                        len(batch), delay, error,
+                    )
+                    time.sleep(delay)
+
+            logger.error("Toplu yazma başarısız, %d kayıt tek tek yazılıyor: %s", len(batch), error)
+            for model, values in batch:
+                error = self._commit([(model, [values])], "row")
+                if error is not None:
+                    logger.error("Kayıt yazılamadı (%s): %s", model.__name__, error)
+
+    def _commit(self, rows, path):
+        """``(model, satırlar)`` çiftlerini tek işlemde yaz; hata varsa onu döndür."""
+        session = self.db.session
+        started = time.perf_counter()
+        count = 0
+        try:
+            for model, values in rows:
+                session.execute(self.db.insert(model), values)
+                count += len(values)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            DB_ERRORS.inc(path=path)
+            return e
+        seconds = time.perf_counter() - started
+        DB_COMMIT.observe(seconds, path=path)
+        DB_ROWS.inc(count, path=path)
+        logger.debug("%d kayıt yazıldı (%s, %.1f ms)", count, path, seconds * 1000)
+        return None
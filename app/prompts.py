@@ -0,0 +1,224 @@
+"""Psikolog tarzları ve sohbet istemlerinin hazırlanması.
+
+- Tarzlar ``constants.PSIKOLOG_TARZLARI``'ndan, ``STYLES_FILE`` verilmişse
+  ayrıca bir JSON dosyasından yüklenir. Dosyadaki tarz aynı anahtarlı
+  yerleşik tarzı değiştirir, yenisini ekler; ``null`` değeri tarzı kaldırır.
+- Her tarzın sabit sistem istemleri (karşılama, sohbet, uzun görüşme)
+  açılışta bir kez derlenir; turda yalnızca özet eklenir.
+- Görüşme başına OpenAI mesajları ve transkript satırları süreç içinde
+  artımlı tutulur: her turda yalnızca yeni öğeler çevrilir. Geçmiş başka
+  bir worker'da değiştiyse (ör. yeni görüşme) liste baştan kurulur.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from app.constants import PSIKOLOG_TARZLARI
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("isim", "aciklama", "avatar", "sistem")
+
+GREETING_INSTRUCTION = (
+    " Bu ilk karşılaşman. Kendini tanıt, sıcak bir şekilde selamla "
+    "ve ilk açık uçlu psikolojik soruyu sor. Kısa ve öz ol, "
+    "maksimum 3-4 cümle."
+)
+CHAT_INSTRUCTION = (
+    " Danışanın son cevabına kısa bir yorum/karşılık ver (1-2 cümle), "
+    "empati göster veya anlayış belirt, sonra yeni bir açık uçlu psikolojik "
+    "soru sor. Toplamda 3-4 cümleyi geçme."
+)
+EXTENDED_INSTRUCTION = (
+    " \n\nÖNEMLİ: Görüşmede önemli bir noktaya ulaştın (10+ mesaj). "
+    "Klinik bir değerlendirme için yeterli verin var mı değerlendir. "
+    "Eğer YOKSA, eksik bilgiyi özellikle sor. "
+    "Eğer VARSA, sohbeti doğal bir şekilde sürdür ama derinlemesine "
+    "sorular sormaya devam et."
+)
+SUMMARY_HEADER = "\n\nGörüşmenin önceki bölümünün özeti:\n"
+
+
+def load_styles(path=None):
+    """Yerleşik tarzları ``path``'teki JSON tarzlarıyla birleştir.
+
+    Eksik alanlı bir tarz ``ValueError`` yükseltir; hatalı dosya uygulama
+    açılırken fark edilir.
+    """
+    styles = {key: dict(style) for key, style in PSIKOLOG_TARZLARI.items()}
+    if not path:
+        return styles
+
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path}: tarz anahtarından tarza bir JSON nesnesi olmalı")
+    for key, style in overrides.items():
+        if style is None:
+            styles.pop(key, None)
+            continue
+        missing = [
+            field for field in REQUIRED_FIELDS
+            if not isinstance(style, dict) or not isinstance(style.get(field), str)
+        ]
+        if missing:
+            raise ValueError(f"{path}: '{key}' tarzında eksik alan: {', '.join(missing)}")
+        styles[key] = style
+    if not styles:
+        raise ValueError(f"{path}: en az bir psikolog tarzı kalmalı")
+    return styles
+
+
+class CompiledStyle:
+    """Bir tarzın değişmeyen sistem istemleri."""
+
+    __slots__ = ("greeting", "chat", "extended")
+
+    def __init__(self, system):
+        self.greeting = system + GREETING_INSTRUCTION
+        self.chat = system + CHAT_INSTRUCTION
+        self.extended = self.chat + EXTENDED_INSTRUCTION
+
+
+class ConversationTurns:
+    """Bir görüşmenin artımlı tutulan sohbet mesajları ve transkript satırları.
+
+    ``starts[i]`` geçmişteki ``i``. öğeden önceki mesaj sayısıdır; böylece
+    bağlam penceresinin istediği son öğeler baştan çevrilmeden dilimlenir.
+    """
+
+    __slots__ = ("messages", "lines", "starts", "last")
+
+    def __init__(self):
+        self.messages = []
+        self.lines = []
+        self.starts = []
+        self.last = None
+
+    def matches(self, history):
+        """Tutulan öğeler ``history``'nin başıyla aynı mı?"""
+        count = len(self.starts)
+        return count <= len(history) and (
+            count == 0 or history[count - 1].get("mesaj") == self.last
+        )
+
+    def extend(self, history):
+        """Yalnızca henüz çevrilmemiş öğeleri ekle; anlık görünümü döndür."""
+        for item in history[len(self.starts):]:
+            self.starts.append(len(self.messages))
+            if item.get("tip") == "psikolog":
+                self.messages.append({"role": "assistant", "content": item["mesaj"]})
+                self.lines.append(f"Psikolog: {item['mesaj']}\n")
+            else:
+                if item.get("tip") == "kullanici":
+                    self.messages.append({"role": "user", "content": item["mesaj"]})
+                self.lines.append(f"Danışan: {item['mesaj']}\n")
+            self.last = item.get("mesaj")
+        return TurnsView(self, len(self.starts), len(self.messages))
+
+
+class TurnsView:
+    """``ConversationTurns``'ün belirli bir uzunluktaki hali.
+
+    Aynı görüşmeye eşzamanlı bir tur öğe eklese de dilimler bu turun
+    geçmişiyle sınırlı kalır.
+    """
+
+    __slots__ = ("_turns", "_count", "_end")
+
+    def __init__(self, turns, count, end):
+        self._turns = turns
+        self._count = count
+        self._end = end
+
+    def chat(self, items):
+        """Geçmişin son ``len(items)`` öğesine ait sohbet mesajları."""
+        if not items:
+            return []
+        start = self._turns.starts[self._count - len(items)]
+        return self._turns.messages[start:self._end]
+
+    def transcript(self, items):
+        """Geçmişin son ``len(items)`` öğesinin transkripti."""
+        if not items:
+            return ""
+        return "".join(self._turns.lines[self._count - len(items):self._count])
+
+
+class PromptBook:
+    """Tarz kayıt defteri ve derlenmiş istemler.
+
+    Görüşme başına artımlı mesaj listeleri kilitli bir LRU'da tutulur.
+    """
+
+    def __init__(self, app=None):
+        self.styles = dict(PSIKOLOG_TARZLARI)
+        self._compiled = {}
+        self._turns = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_conversations = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        self.styles = load_styles(cfg["STYLES_FILE"])
+        self._compiled = {
+            style["sistem"]: CompiledStyle(style["sistem"]) for style in self.styles.values()
+        }
+        self.max_conversations = cfg["PROMPT_CACHE_CONVERSATIONS"]
+        if cfg["STYLES_FILE"]:
+            logger.info(
+                "Psikolog tarzları yüklendi",
+                extra={"path": cfg["STYLES_FILE"], "styles": ",".join(self.styles)},
+            )
+        app.extensions["prompts"] = self
+
+    # ── Tarzlar ─────────────────────────────────────────────
+
+    def style(self, key):
+        """Tarzı döndür; bilinmiyorsa (ör. tarz dosyası değişti) ilk tarzı."""
+        return self.styles.get(key) or next(iter(self.styles.values()))
+
+    def compiled(self, psikolog):
+        compiled = self._compiled.get(psikolog["sistem"])
+        if compiled is None:
+            # Kayıt defteri dışından gelen tarz (ör. CLI, benchmark)
+            compiled = self._compiled[psikolog["sistem"]] = CompiledStyle(psikolog["sistem"])
+        return compiled
+
+    def greeting_prompt(self, psikolog):
+        return self.compiled(psikolog).greeting
+
+    def chat_prompt(self, psikolog, extended_mode=False, summary=None):
+        compiled = self.compiled(psikolog)
+        prompt = compiled.extended if extended_mode else compiled.chat
+        return prompt + SUMMARY_HEADER + summary if summary else prompt
+
+    # ── Görüşme mesajları ───────────────────────────────────
+
+    def turns(self, conversation_id, history):
+        """``history``'nin mesajları ve transkripti için ``TurnsView``.
+
+        ``conversation_id`` yoksa önbelleğe alınmayan yeni bir liste kurulur.
+        """
+        if not conversation_id or self.max_conversations <= 0:
+            return ConversationTurns().extend(history)
+
+        with self._lock:
+            turns = self._turns.get(conversation_id)
+            if turns is None or not turns.matches(history):
+                turns = self._turns[conversation_id] = ConversationTurns()
+            else:
+                self._turns.move_to_end(conversation_id)
+            view = turns.extend(history)
+            while len(self._turns) > self.max_conversations:
+                self._turns.popitem(last=False)
+            return view
+
+    def forget(self, conversation_id):
+        """Görüşmeye ait mesaj önbelleğini at."""
+        with self._lock:
+            self._turns.pop(conversation_id, None)
@@ -0,0 +1,127 @@
+"""Cevaplar ve test sonuçları üzerinde indeksli, keyset sayfalı sorgular.
+
+Sayfalama ``OFFSET`` yerine son görülen ``(created_at, id)`` anahtarından
+devam eder; böylece her sayfa ``(user_id, created_at)`` indeksinde kısa bir
+aralık taramasıdır ve geçmiş büyüdükçe yavaşlamaz. İmleçler istemciye opak
+dize olarak verilir.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_
+
+from app import db
+from app.models import Answer, TestResult
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """Çözümlenemeyen sayfalama imleci."""
+
+
+def encode_cursor(created_at, key):
+    raw = json.dumps([created_at.isoformat(), key])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, key_type):
+    """İmleci ``(created_at, key)`` olarak çöz; ``key`` ``key_type`` olmalı."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, key = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(created_at, str):
+            raise TypeError("created_at")
+        # bool da int sayılır; JSON'daki true/false kimlik olamaz
+        if type(key) is not key_type:
+            raise TypeError("key")
+        return datetime.fromisoformat(created_at), key
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Geçersiz imleç.") from e
+
+
+def _page(rows, limit, cursor_of):
+    """``limit + 1`` satırdan sayfayı ve sonraki imleci çıkar."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = cursor_of(rows[-1]) if has_more and rows else None
+    return rows, next_cursor
+
+
+# ── Görüşmeler ──────────────────────────────────────────────
+
+def list_conversations(user_id, limit=20, cursor=None):
+    """Kullanıcının görüşmelerini son mesaj zamanına göre yeniden eskiye listele.
+
+    Her öğe ``conversation_id``, ``started_at``, ``last_at`` ve
+    ``answer_count`` içerir. ``conversation_id`` taşımayan eski kayıtlar
+    listelenmez.
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    last_at = func.max(Answer.created_at).label("last_at")
+    query = (
+        db.session.query(
+            Answer.conversation_id,
+            func.min(Answer.created_at).label("started_at"),
+            last_at,
+            func.count(Answer.id).label("answer_count"),
+        )
+        .filter(Answer.user_id == user_id, Answer.conversation_id.isnot(None))
+        .group_by(Answer.conversation_id)
+    )
+    if cursor:
+        before_at, before_id = decode_cursor(cursor, str)
+        query = query.having(or_(
+            last_at < before_at,
+            and_(last_at == before_at, Answer.conversation_id < before_id),
+        ))
+    rows = (
+        query.order_by(last_at.desc(), Answer.conversation_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return _page(rows, limit, lambda r: encode_cursor(r.last_at, r.conversation_id))
+
+
+def conversation_answers(user_id, conversation_id):
+    """Bir görüşmenin cevaplarını sırasıyla döndür (conversation_id indeksi)."""
+    return (
+        Answer.query.filter_by(conversation_id=conversation_id, user_id=user_id)
+        .order_by(Answer.created_at, Answer.id)
+        .all()
+    )
+
+
+def last_conversation_answers(user_id):
+    """Kullanıcının en son görüşmesinin cevapları."""
+    latest = (
+        db.session.query(Answer.conversation_id)
+        .filter(Answer.user_id == user_id, Answer.conversation_id.isnot(None))
+        .order_by(Answer.created_at.desc(), Answer.id.desc())
+        .first()
+    )
+    if latest is None:
+        return []
+    return conversation_answers(user_id, latest.conversation_id)
+
+
+# ── Test sonuçları ──────────────────────────────────────────
+
+def list_results(user_id, limit=20, cursor=None):
+    """Kullanıcının test sonuçlarını yeniden eskiye keyset sayfalı listele."""
+    limit = min(limit, MAX_PAGE_SIZE)
+    query = TestResult.query.filter(TestResult.user_id == user_id)
+    if cursor:
+        before_at, before_id = decode_cursor(cursor, int)
+        query = query.filter(or_(
+            TestResult.created_at < before_at,
+            and_(TestResult.created_at == before_at, TestResult.id < before_id),
+        ))
+    rows = (
+        query.order_by(TestResult.created_at.desc(), TestResult.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return _page(rows, limit, lambda r: encode_cursor(r.created_at, r.id))
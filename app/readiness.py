@@ -0,0 +1,174 @@
+"""Görüşmenin analiz için hazır olup olmadığını değerlendiren puanlayıcı.
+
+READY kontrolü için her turda uzak modele gitmek yerine yerel, yalnızca
+CPU kullanan bir sezgisel puan hesaplanır: danışan cevaplarının sayısı,
+uzunluğu ve kapsanan konu başlıkları (uyku, aile, kaygı, iş/okul ...).
+Mod ``READINESS_SCORER`` ile seçilir:
+
+- ``heuristic``: yalnızca yerel puan,
+- ``llm``: her seferinde LLM (önceki davranış),
+- ``hybrid``: puan eşiğe ``READINESS_MARGIN``'dan yakınsa LLM'e sorulur.
+
+``READINESS_LOG_PATH`` ayarlanırsa her LLM kararı yerel puan ve geçmişle
+birlikte JSONL olarak kaydedilir; ``benchmarks/readiness_eval.py`` bu
+kayıtlarla yerel kararları karşılaştırır.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+
+from app.constants import DOLGU_KELIMELERI
+from app.metrics import FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+# Konu başlığı → kelime kökleri (kelime başına önek eşleşmesi). Kökler en az
+# dört harflidir: "iş", "uyu", "yas" gibi kısa kökler "işte", "iştah",
+# "uyumlu", "yasak" gibi ilgisiz kelimelerin de başıdır.
+TOPICS = {
+    "uyku": ("uyku", "uyuy", "uyud", "uyuma", "uyur", "kabus", "uyan"),
+    "duygu": ("üzgün", "üzül", "mutsuz", "keder", "ağla", "umutsuz", "boşluk",
+              "depres", "moral", "hüzün", "çökkün"),
+    "kaygı": ("kaygı", "endişe", "panik", "kork", "gergin", "stres", "tedirgin",
+              "huzursuz"),
+    "aile": ("anne", "baba", "kardeş", "aile", "eşim", "çocuğum", "çocuklar"),
+    "ilişki": ("arkadaş", "sevgili", "ilişki", "yalnız", "partner", "evlilik",
+               "ayrıl", "sosyal"),
+    "iş_okul": ("işyer", "işsiz", "okul", "ders", "sınav", "patron", "çalış",
+                "üniversite", "kariyer"),
+    "beden": ("yorgun", "iştah", "kilo", "ağrı", "enerji", "hasta", "halsiz",
+              "yemek"),
+    "geçmiş": ("çocukluğ", "çocukluk", "geçmiş", "travma", "kayıp", "ölüm",
+               "kaybett"),
+    "benlik": ("özgüven", "kendimi", "değersiz", "suçlu", "utan", "yetersiz",
+               "başarısız"),
+    "risk": ("alkol", "sigara", "ilaç", "madde", "intihar", "zarar", "öfke",
+             "sinir"),
+    "baş_etme": ("spor", "terapi", "destek", "rahatla", "hobi", "yürüyüş",
+                 "meditasyon"),
+}
+
+# Kısa köklerin yalnızca tam kelime olarak sayılan çekimleri
+TOPIC_WORDS = {
+    "iş_okul": frozenset({
+        "iş", "işi", "işim", "işimi", "işime", "işimde", "işimden", "işe",
+        "işten", "işler", "işlerim",
+    }),
+    "geçmiş": frozenset({"yas", "yası", "yasta", "yastayım", "yasını"}),
+}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SHORT_ANSWER_WORDS = 4
+
+
+def _words(text):
+    # Türkçe büyük İ/I doğru küçülsün
+    text = text.replace("İ", "i").replace("I", "ı").lower()
+    return _WORD.findall(text)
+
+
+def features(history):
+    """Danışan cevaplarından sayısal özellikler çıkar."""
+    answers = [item["mesaj"] for item in history if item.get("tip") == "kullanici"]
+    words_per_answer = [_words(answer) for answer in answers]
+    all_words = [word for words in words_per_answer for word in words]
+
+    content = {word for word in all_words if word not in DOLGU_KELIMELERI}
+    topics = sorted(
+        topic
+        for topic, stems in TOPICS.items()
+        if not content.isdisjoint(TOPIC_WORDS.get(topic, ()))
+        or any(word.startswith(stems) for word in content)
+    )
+    short = sum(1 for words in words_per_answer if len(words) < _SHORT_ANSWER_WORDS)
+    return {
+        "answers": len(answers),
+        "words": len(all_words),
+        "topics": topics,
+        "short_ratio": short / len(answers) if answers else 1.0,
+    }
+
+
+def heuristic_score(history):
+    """0-1 arası hazır olma puanı (yalnızca yerel hesap, milisaniye altı)."""
+    f = features(history)
+    score = (
+        0.35 * min(f["answers"] / 8, 1.0)
+        + 0.30 * min(f["words"] / 250, 1.0)
+        + 0.35 * min(len(f["topics"]) / 5, 1.0)
+    )
+    # "evet", "bilmiyorum" gibi kısa cevaplar bilgi taşımaz
+    return round(score * (1 - 0.5 * f["short_ratio"]), 3)
+
+
+class ReadinessScorer:
+    """Yerel puanla, gerekirse LLM'e sorarak READY kararı veren puanlayıcı.
+
+    Durumsuzdur; yalnızca karar günlüğüne (``READINESS_LOG_PATH``) yazım
+    kilitle sıralanır.
+    """
+
+    MODES = ("heuristic", "llm", "hybrid")
+
+    def __init__(self, app=None):
+        self.mode = "llm"
+        self.log_path = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        self.mode = cfg["READINESS_SCORER"]
+        if self.mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen READINESS_SCORER: {self.mode!r}")
+        self.threshold = cfg["READINESS_THRESHOLD"]
+        self.margin = cfg["READINESS_MARGIN"]
+        self.log_path = cfg["READINESS_LOG_PATH"]
+        app.extensions["readiness"] = self
+
+    def is_uncertain(self, score):
+        return abs(score - self.threshold) < self.margin
+
+    def decide(self, history, llm_check, conversation_id=None):
+        """Hazır mı? ``llm_check()`` True/False veya hata durumunda ``None`` döner."""
+        score = heuristic_score(history)
+        local = score >= self.threshold
+
+        if self.mode == "heuristic" or (
+            self.mode == "hybrid" and not self.is_uncertain(score)
+        ):
+            logger.info("READY puanı %.2f → %s (yerel)", score, "READY" if local else "NOT_READY")
+            return local
+
+        answer = llm_check()
+        self._log(conversation_id, history, score, answer)
+        if answer is None:
+            logger.warning("READY puanı %.2f → LLM yanıt vermedi, yerel karar", score)
+            FALLBACKS.inc(caller="ready")
+            return local
+        logger.info("READY puanı %.2f → %s (LLM)", score, "READY" if answer else "NOT_READY")
+        return answer
+
+    def _log(self, conversation_id, history, score, answer):
+        if not self.log_path or answer is None:
+            return
+        record = {
+            "ts": time.time(),
+            "conversation_id": conversation_id,
+            "score": score,
+            "llm_ready": answer,
+            "history": [
+                {"tip": item.get("tip"), "mesaj": item.get("mesaj", "")}
+                for item in history
+            ],
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        try:
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning("READY kaydı yazılamadı (%s): %s", self.log_path, e)
@@ -0,0 +1,141 @@
+"""Görüşme sonu raporunun arka planda, görüşme başına bir kez üretilmesi.
+
+``/result`` isteği raporu beklemez: iş arka plan havuzuna bırakılır ve
+sayfa hemen döner. Durum (``queued`` → ``running`` → ``done``/``error``)
+``report:<conversation_id>`` odasına ``report_status`` olayıyla iletilir;
+istemci ayrıca ``/api/report`` üzerinden yoklayabilir. Bitmiş rapor
+``TestResult`` olarak saklanır ve sonraki istekler LLM'e gitmeden ondan
+sunulur. Hata durumunda iş yeniden başlatılabilir.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+from app.metrics import DB_COMMIT, DB_ROWS
+
+logger = logging.getLogger(__name__)
+
+_MAX_TRACKED = 1000  # bellekte tutulan iş durumu sayısı
+
+
+def qa_pairs(history):
+    """Görüşme geçmişinden soru-cevap çiftlerini çıkar."""
+    cevaplar = []
+    current_soru = ""
+    for item in history:
+        if item.get("tip") == "psikolog" and item.get("soru"):
+            current_soru = item["mesaj"]
+        elif item.get("tip") == "kullanici" and current_soru:
+            cevaplar.append({"soru": current_soru, "cevap": item["mesaj"]})
+            current_soru = ""
+    return cevaplar
+
+
+def room_for(conversation_id):
+    return f"report:{conversation_id}"
+
+
+class ReportJobs:
+    """Görüşme başına idempotent rapor işleri.
+
+    İş durumları bellekte en fazla ``_MAX_TRACKED`` tane tutulur; biten
+    rapor ``TestResult`` olarak kaydedilir.
+    """
+
+    def __init__(self, app=None, db=None, executor=None, socketio=None):
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db, executor, socketio)
+
+    def init_app(self, app, db, executor, socketio):
+        self.db = db
+        self._executor = executor
+        self._socketio = socketio
+        app.extensions["reports"] = self
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def status(self, user_id, conversation_id):
+        """Raporun durumu: ``none`` | ``queued`` | ``running`` | ``done`` | ``error``."""
+        with self._lock:
+            job = self._jobs.get(conversation_id)
+            if job is not None:
+                return dict(job)
+
+        row = self.stored(user_id, conversation_id)
+        if row is not None:
+            return {"status": "done", "analiz": row.result_summary}
+        return {"status": "none"}
+
+    def start(self, user_id, conversation_id, generate):
+        """Rapor yoksa ``generate()`` ile üretimi başlat; güncel durumu döndür.
+
+        Aynı görüşme için çalışan veya bitmiş bir iş varsa yenisi başlatılmaz.
+        ``generate()`` analiz metnini, başarısız olursa ``None`` döndürür.
+        """
+        current = self.status(user_id, conversation_id)
+        if current["status"] in ("queued", "running", "done"):
+            return current
+
+        with self._lock:
+            job = self._jobs.get(conversation_id)
+            if job is not None and job["status"] != "error":
+                return dict(job)
+            self._jobs[conversation_id] = {"status": "queued"}
+            while len(self._jobs) > _MAX_TRACKED:
+                self._jobs.popitem(last=False)
+
+        self._executor.submit(self._run, user_id, conversation_id, generate)
+        return {"status": "queued"}
+
+    def stored(self, user_id, conversation_id):
+        """Görüşmenin kayıtlı en son ``TestResult`` satırı (yoksa ``None``)."""
+        from app.models import TestResult
+
+        if not conversation_id:
+            return None
+        return (
+            TestResult.query
+            .filter_by(user_id=user_id, conversation_id=conversation_id)
+            .order_by(TestResult.id.desc())
+            .first()
+        )
+
+    # ── Arka plan ───────────────────────────────────────────
+
+    def _run(self, user_id, conversation_id, generate):
+        from app.models import TestResult
+
+        self._update(conversation_id, status="running")
+        try:
+            analiz = generate()
+            if not analiz:
+                raise RuntimeError("Analiz oluşturulamadı.")
+            with DB_COMMIT.time(path="report"):
+                self.db.session.add(TestResult(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    result_summary=analiz,
+                    dsm_diagnosis="(otomatik tanı eklenecek)",
+                    psychologist_note="",
+                ))
+                self.db.session.commit()
+            DB_ROWS.inc(path="report")
+        except Exception as e:
+            self.db.session.rollback()
+            logger.error("Rapor oluşturulamadı (%s): %s", conversation_id, e)
+            self._update(conversation_id, status="error", message=str(e))
+            return
+        logger.info("Rapor hazır (%s)", conversation_id)
+        self._update(conversation_id, status="done", analiz=analiz)
+
+    def _update(self, conversation_id, **state):
+        with self._lock:
+            self._jobs[conversation_id] = state
+        self._socketio.emit(
+            "report_status",
+            {"conversation_id": conversation_id, **state},
+            to=room_for(conversation_id),
+        )
@@ -0,0 +1,170 @@
+"""Kısa ve sık tekrarlanan danışan cevapları için yanıt önbelleği.
+
+Görüşmenin ilk turlarında aynı karşılamaya ("evet", "bilmiyorum",
+"iyiyim" gibi) neredeyse aynı kısa cevaplar verilir; bunların her biri
+için LLM'e gitmek yerine daha önce üretilmiş yanıt kullanılabilir.
+
+Anahtar (tarz, model, son psikolog sorusu, tur) üzerinden bir grup seçer;
+grup içinde normalize edilmiş cevap önce birebir, bulunamazsa karakter
+3-gram Jaccard benzerliğiyle (``RESPONSE_CACHE_SIMILARITY``) aranır.
+Türkçede olumsuzluk kelime içi bir ektir ("biliyorum" / "bilmiyorum"
+≈ 0.58), bu yüzden varsayılan eşik yüksek tutulur.
+Girdiler ``RESPONSE_CACHE_TTL`` sonra geçersizdir; toplam sayı
+``RESPONSE_CACHE_SIZE``'ı aşınca en uzun süre kullanılmayan atılır.
+Yalnızca ``RESPONSE_CACHE_MAX_TURN``. tura kadar ve en fazla
+``RESPONSE_CACHE_MAX_WORDS`` kelimelik cevaplar önbelleğe girer; daha
+sonraki turlarda yanıt görüşmenin bağlamına bağlıdır.
+
+Önbellek süreç içindedir ve varsayılan olarak kapalıdır
+(``RESPONSE_CACHE=1`` ile açılır).
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from app.constants import DOLGU_KELIMELERI
+from app.metrics import RESPONSE_CACHE_ENTRIES, RESPONSE_CACHE_LOOKUPS
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STRETCHED = re.compile(r"(\w)\1{2,}")  # "evettt" → "evet"
+_NGRAM = 3
+
+
+def normalize(text):
+    """Türkçe küçük harf, noktalama ve emoji olmadan tek boşluklu metin."""
+    text = text.replace("İ", "i").replace("I", "ı").lower()
+    words = _STRETCHED.sub(r"\1", " ".join(_WORD.findall(text))).split()
+    return " ".join(word for word in words if word not in DOLGU_KELIMELERI) or " ".join(words)
+
+
+def ngrams(text):
+    padded = f" {text} "
+    return frozenset(padded[i:i + _NGRAM] for i in range(len(padded) - _NGRAM + 1))
+
+
+def similarity(a, b):
+    """İki n-gram kümesinin Jaccard benzerliği."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Entry:
+    __slots__ = ("group", "answer", "grams", "response", "created")
+
+    def __init__(self, group, answer, response):
+        self.group = group
+        self.answer = answer
+        self.grams = ngrams(answer)
+        self.response = response
+        self.created = time.monotonic()
+
+
+class ResponseCache:
+    """Soru grubu başına cevap → yanıt önbelleği.
+
+    Girdiler süreç belleğinde LRU sırası ve TTL ile tutulur; tüm erişim tek
+    kilit altındadır.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._entries = OrderedDict()  # (grup, cevap) → _Entry, LRU sırasıyla
+        self._groups = {}  # grup → {cevap: _Entry}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        self.enabled = cfg["RESPONSE_CACHE"]
+        self.max_entries = max(1, cfg["RESPONSE_CACHE_SIZE"])
+        self.ttl = cfg["RESPONSE_CACHE_TTL"]
+        self.threshold = cfg["RESPONSE_CACHE_SIMILARITY"]
+        self.max_turn = cfg["RESPONSE_CACHE_MAX_TURN"]
+        self.max_words = cfg["RESPONSE_CACHE_MAX_WORDS"]
+        self.model = app.extensions["model_router"].primary("sohbet")
+        RESPONSE_CACHE_ENTRIES.set_function(lambda: len(self._entries))
+        app.extensions["response_cache"] = self
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def key(self, style, history, extended_mode=False):
+        """Geçmişin son cevabı için ``(grup, cevap)`` ya da önbelleğe uygun değilse ``None``.
+
+        ``history`` son öğesi danışan cevabı olan görüşme geçmişidir.
+        """
+        if not self.enabled or extended_mode or not history:
+            return None
+        last = history[-1]
+        if last.get("tip") != "kullanici":
+            return None
+        turn = sum(1 for item in history if item.get("tip") == "kullanici")
+        answer = normalize(last["mesaj"])
+        if turn > self.max_turn or not answer or len(answer.split()) > self.max_words:
+            return None
+
+        question = ""
+        for item in reversed(history[:-1]):
+            if item.get("tip") == "psikolog":
+                question = normalize(item["mesaj"])
+                break
+        return (style, self.model, question, turn), answer
+
+    def get(self, key):
+        """Birebir ya da yeterince benzer cevabın yanıtı; yoksa ``None``."""
+        if key is None:
+            return None
+        group, answer = key
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._nearest(group, answer)
+            if entry is not None and now - entry.created > self.ttl:
+                self._remove(entry)
+                entry = None
+            if entry is None:
+                RESPONSE_CACHE_LOOKUPS.inc(result="miss")
+                return None
+            self._entries.move_to_end((entry.group, entry.answer))
+            RESPONSE_CACHE_LOOKUPS.inc(result="exact" if entry.answer == answer else "similar")
+            return entry.response
+
+    def put(self, key, response):
+        if key is None or not response:
+            return
+        group, answer = key
+        entry = _Entry(group, answer, response)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._groups[group].pop(answer, None)
+            self._entries[key] = entry
+            self._groups.setdefault(group, {})[answer] = entry
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries.values())))
+
+    # ── İç yardımcılar ──────────────────────────────────────
+
+    def _nearest(self, group, answer):
+        candidates = self._groups.get(group)
+        if not candidates:
+            return None
+        grams = ngrams(answer)
+        best, best_score = None, self.threshold
+        for entry in candidates.values():
+            score = similarity(grams, entry.grams)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def _remove(self, entry):
+        self._entries.pop((entry.group, entry.answer), None)
+        group = self._groups.get(entry.group)
+        if group is not None:
+            group.pop(entry.answer, None)
+            if not group:
+                del self._groups[entry.group]
@@ -1,20 +1,33 @@
 """HTTP route tanımları (Blueprint)."""
 
+import hmac
+
 from flask import (
     Blueprint,
+    Response,
+    abort,
+    current_app,
     render_template,
     request,
     session,
     redirect,
     url_for,
     flash,
+    jsonify,
 )
 from flask_login import login_user, login_required, logout_user, current_user
 from werkzeug.security import check_password_hash
 
-from app import db
-from app.models import User, Answer, TestResult
-from app.constants import PSIKOLOG_TARZLARI
+from app import context_window, conversations, metrics, prompts, reports, writer
+from app.admission import AdmissionRejected
+from app.models import User, Answer
+from app.reports import qa_pairs
+from app.queries import (
+    InvalidCursorError,
+    conversation_answers,
+    list_conversations,
+    list_results,
+)
 from app.services import (
     get_first_greeting,
     get_ai_response_with_style,
@@ -24,6 +37,23 @@ from app.services import (
 main_bp = Blueprint("main", __name__)
 
 
+@main_bp.errorhandler(AdmissionRejected)
+def handle_admission_rejected(e):
+    """Kabul denetimi reddi → 503 + ``Retry-After``."""
+    event = e.to_event()
+    headers = {"Retry-After": str(e.retry_after)}
+    if request.path.startswith("/api/"):
+        return jsonify({"error": event["message"], **event}), 503, headers
+    return event["message"], 503, headers
+
+
+def _forget_conversation(conversation_id):
+    """Görüşme geçmişini ve bağlam özetini depodan sil."""
+    conversations.delete(conversation_id)
+    context_window.forget(conversation_id)
+    prompts.forget(conversation_id)
+
+
 # ── Kimlik Doğrulama ────────────────────────────────────────
 
 @main_bp.route("/login", methods=["GET", "POST"])
@@ -43,7 +73,7 @@ def login():
 @login_required
 def logout():
     session.pop("psikolog_tarz", None)
-    session.pop("history", None)
+    _forget_conversation(session.pop("conversation_id", None))
     logout_user()
     return redirect(url_for("main.login"))
 
@@ -63,24 +93,26 @@ def index():
 def select_style():
     if request.method == "POST":
         tarz = request.form.get("tarz")
-        if tarz in PSIKOLOG_TARZLARI:
+        if tarz in prompts.styles:
             session["psikolog_tarz"] = tarz
-            session["history"] = []
-
-            psikolog = PSIKOLOG_TARZLARI[tarz]
-            karsilama = get_first_greeting(psikolog)
-            session["history"].append(
-                {"mesaj": karsilama, "tip": "psikolog", "soru": True}
+            _forget_conversation(session.get("conversation_id"))
+            conversation_id = conversations.new_id()
+            session["conversation_id"] = conversation_id
+
+            psikolog = prompts.styles[tarz]
+            karsilama = get_first_greeting(psikolog, tarz)
+            conversations.append(
+                conversation_id, {"mesaj": karsilama, "tip": "psikolog", "soru": True}
             )
             return redirect(url_for("main.question"))
 
-    return render_template("select_style.html", tarzlar=PSIKOLOG_TARZLARI)
+    return render_template("select_style.html", tarzlar=prompts.styles)
 
 
 @main_bp.route("/close-chat")
 @login_required
 def close_chat():
-    session.pop("history", None)
+    _forget_conversation(session.pop("conversation_id", None))
     session.pop("psikolog_tarz", None)
     return redirect(url_for("main.select_style"))
 
@@ -90,47 +122,52 @@ def close_chat():
 @main_bp.route("/question", methods=["GET", "POST"])
 @login_required
 def question():
-    if "psikolog_tarz" not in session:
+    if "psikolog_tarz" not in session or "conversation_id" not in session:
         return redirect(url_for("main.select_style"))
 
     tarz = session["psikolog_tarz"]
-    psikolog = PSIKOLOG_TARZLARI[tarz]
+    psikolog = prompts.style(tarz)
+    conversation_id = session["conversation_id"]
+    history = conversations.get(conversation_id)
 
     if request.method == "POST":
         cevap = request.form.get("cevap")
-        session["history"].append({"mesaj": cevap, "tip": "kullanici"})
-        session.modified = True
 
         # Son psikolog sorusunu bul
         son_soru = ""
-        for item in reversed(session["history"]):
+        for item in reversed(history):
             if item.get("tip") == "psikolog" and item.get("soru"):
                 son_soru = item["mesaj"]
                 break
 
-        answer = Answer(
+        history.append({"mesaj": cevap, "tip": "kullanici"})
+        soru_sayisi = sum(1 for item in history if item.get("tip") == "kullanici")
+        yeni_mesaj = None
+        if soru_sayisi < 5:
+            # Kabul denetimi reddederse cevap kaydedilmeden 503 döner
+            yeni_mesaj = get_ai_response_with_style(
+                history, psikolog, conversation_id=conversation_id, user_id=current_user.id
+            )
+
+        conversations.append(conversation_id, history[-1])
+        writer.add(
+            Answer,
             user_id=current_user.id,
+            conversation_id=conversation_id,
             question_text=son_soru,
             answer_text=cevap,
         )
-        db.session.add(answer)
-        db.session.commit()
 
-        soru_sayisi = sum(
-            1 for item in session["history"] if item.get("tip") == "kullanici"
-        )
-        if soru_sayisi >= 5:
+        if yeni_mesaj is None:
             return redirect(url_for("main.result"))
 
-        yeni_mesaj = get_ai_response_with_style(session["history"], psikolog)
-        session["history"].append(
-            {"mesaj": yeni_mesaj, "tip": "psikolog", "soru": True}
-        )
-        session.modified = True
+        item = {"mesaj": yeni_mesaj, "tip": "psikolog", "soru": True}
+        conversations.append(conversation_id, item)
+        history.append(item)
 
     # Son psikolog mesajını bul
     son_psikolog_mesaji = ""
-    for item in reversed(session["history"]):
+    for item in reversed(history):
         if item.get("tip") == "psikolog":
             son_psikolog_mesaji = item["mesaj"]
             break
@@ -139,7 +176,8 @@ def question():
         "questions.html",
         mesaj=son_psikolog_mesaji,
         psikolog=psikolog,
-        history=session["history"],
+        history=history,
+        stt_streaming=current_app.config["STT_STREAMING"],
     )
 
 
@@ -148,30 +186,123 @@ def question():
 @main_bp.route("/result")
 @login_required
 def result():
+    """Raporu göster; yoksa arka planda üretimini başlatıp hemen dön."""
+    conversation_id = session.get("conversation_id")
+    if not conversation_id:
+        return redirect(url_for("main.select_style"))
+    cevaplar = qa_pairs(conversations.get(conversation_id))
+    user_id = current_user.id
+
+    rapor = reports.start(
+        user_id, conversation_id, lambda: get_summary_response(cevaplar, user_id)
+    )
 
-    history = session.get("history", [])
-    tarz = session.get("psikolog_tarz", "profesyonel")
-    psikolog = PSIKOLOG_TARZLARI.get(tarz, PSIKOLOG_TARZLARI["profesyonel"])
-
-    # Soru-cevap çiftleri
-    cevaplar = []
-    current_soru = ""
-    for item in history:
-        if item.get("tip") == "psikolog" and item.get("soru"):
-            current_soru = item["mesaj"]
-        elif item.get("tip") == "kullanici" and current_soru:
-            cevaplar.append({"soru": current_soru, "cevap": item["mesaj"]})
-            current_soru = ""
-
-    analiz = get_summary_response(cevaplar)
-
-    test_result = TestResult(
-        user_id=current_user.id,
-        result_summary=analiz,
-        dsm_diagnosis="(otomatik tanı eklenecek)",
-        psychologist_note="",
+    return render_template(
+        "result.html",
+        cevaplar=cevaplar,
+        analiz=rapor.get("analiz"),
+        rapor_durumu=rapor["status"],
     )
-    db.session.add(test_result)
-    db.session.commit()
 
-    return render_template("result.html", cevaplar=cevaplar, analiz=analiz)
+
+@main_bp.route("/api/report", methods=["GET", "POST"])
+@login_required
+def api_report():
+    """Geçerli görüşmenin rapor durumu; POST başarısız işi yeniden başlatır."""
+    conversation_id = session.get("conversation_id")
+    if not conversation_id:
+        return jsonify({"error": "Aktif görüşme yok."}), 404
+
+    if request.method == "POST":
+        cevaplar = qa_pairs(conversations.get(conversation_id))
+        user_id = current_user.id
+        # Üretim arka planda: kullanıcının hız sınırı yeniden denemelere de uygulanır
+        rapor = reports.start(
+            user_id, conversation_id, lambda: get_summary_response(cevaplar, user_id)
+        )
+        return jsonify(rapor), 202
+
+    return jsonify(reports.status(current_user.id, conversation_id))
+
+
+# ── Geçmiş (JSON, keyset sayfalı) ───────────────────────────
+
+def _page_args():
+    limit = request.args.get("limit", 20, type=int)
+    return max(1, limit), request.args.get("cursor")
+
+
+@main_bp.route("/api/sessions")
+@login_required
+def api_sessions():
+    limit, cursor = _page_args()
+    try:
+        rows, next_cursor = list_conversations(current_user.id, limit, cursor)
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "items": [
+            {
+                "conversation_id": row.conversation_id,
+                "started_at": row.started_at.isoformat(),
+                "last_at": row.last_at.isoformat(),
+                "answer_count": row.answer_count,
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+@main_bp.route("/api/sessions/<conversation_id>")
+@login_required
+def api_session_detail(conversation_id):
+    answers = conversation_answers(current_user.id, conversation_id)
+    return jsonify({
+        "conversation_id": conversation_id,
+        "answers": [
+            {
+                "soru": answer.question_text,
+                "cevap": answer.answer_text,
+                "created_at": answer.created_at.isoformat(),
+            }
+            for answer in answers
+        ],
+    })
+
+
+@main_bp.route("/api/results")
+@login_required
+def api_results():
+    limit, cursor = _page_args()
+    try:
+        rows, next_cursor = list_results(current_user.id, limit, cursor)
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "items": [
+            {
+                "id": row.id,
+                "conversation_id": row.conversation_id,
+                "result_summary": row.result_summary,
+                "created_at": row.created_at.isoformat(),
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+# ── İzleme ──────────────────────────────────────────────────
+
+@main_bp.route("/metrics")
+def metrics_endpoint():
+    """Prometheus kazıma uç noktası (``METRICS_TOKEN`` ayarlıysa Bearer ister)."""
+    if not current_app.config["METRICS_ENABLED"]:
+        abort(404)
+    token = current_app.config["METRICS_TOKEN"]
+    if token:
+        given = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(given, f"Bearer {token}"):
+            abort(401)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -1,93 +1,397 @@
 """OpenRouter AI servis fonksiyonları."""
 
+import functools
+import json
+import logging
+import time
+
 import requests
-from flask import current_app
+from flask import current_app, has_request_context
+from flask_login import current_user
+
+from app import (
+    admission,
+    context_window,
+    greetings,
+    model_router,
+    openrouter,
+    prompts,
+    readiness,
+    response_cache,
+)
+from app.admission import AdmissionRejected
+from app.context_window import count_message_tokens
+from app.metrics import (
+    FALLBACKS,
+    LLM_ERRORS,
+    LLM_FIRST_TOKEN,
+    LLM_LATENCY,
+    LLM_ROUTE_FALLBACKS,
+    LLM_TOKENS,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # ── Yardımcı ────────────────────────────────────────────────
 
-def _api_call(messages, max_tokens=None):
-    """OpenRouter API'ye istek gönder ve JSON yanıt döndür."""
-    api_key = current_app.config["OPENROUTER_API_KEY"]
-    model = current_app.config["OPENROUTER_MODEL"]
+def _record_call(label, messages, seconds, usage=None, ok=True, model=None):
+    """Çağrı süresini ve token kullanımını ölçümlere ve loga yaz.
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    API istem token sayısını bildirmezse yerel tahmin kullanılır.
+    """
+    usage = usage or {}
+    estimate = count_message_tokens(messages)
+    prompt_tokens = usage.get("prompt_tokens")
+    completion_tokens = usage.get("completion_tokens")
 
-    body = {"model": model, "messages": messages}
-    if max_tokens:
-        body["max_tokens"] = max_tokens
+    LLM_LATENCY.observe(seconds, caller=label, outcome="ok" if ok else "error")
+    LLM_TOKENS.inc(prompt_tokens if prompt_tokens is not None else estimate,
+                   caller=label, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, caller=label, kind="completion")
+    if not ok:
+        LLM_ERRORS.inc(caller=label)
+    if model is not None:
+        model_router.record(label, model, seconds, ok)
+
+    logger.info("LLM çağrısı", extra={
+        "caller": label,
+        "model": model,
+        "seconds": round(seconds, 3),
+        "messages": len(messages),
+        "prompt_tokens_est": estimate,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "ok": ok,
+    })
+
+
+def _record_fallback(label, model):
+    """Zincirin ilk modeli yerine yedek model yanıt verdiyse say."""
+    if model != model_router.primary(label):
+        LLM_ROUTE_FALLBACKS.inc(route=label, model=model)
+
+
+def _current_user_id(user_id=None):
+    """Kabul denetiminde kullanılacak kullanıcı kimliği.
+
+    Arka plan havuzunda istek bağlamı olmadığından çağıranlar kimliği açıkça
+    geçirir; verilmezse istek bağlamındaki kullanıcı (yoksa ``None``).
+    """
+    if user_id is not None:
+        return user_id
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
 
-    response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions",
-        headers=headers,
-        json=body,
-    )
-    return response.json()
+
+def _api_call(messages, max_tokens=None, label="sohbet", user_id=None):
+    """OpenRouter API'ye istek gönder ve JSON yanıt döndür.
+
+    İstek, süreç genelinde paylaşılan havuzlu istemci üzerinden gider.
+    Model ``label`` görevinin zincirinden seçilir; bağlantı hatası, zaman
+    aşımı, açık devre kesici veya hatalı gövdede sıradaki model denenir.
+    Zincir tükenirse son ``{"error": ...}`` döner; çağıranlar bunu yedek
+    mesajla karşılar. Kabul denetimi isteği geri çevirirse
+    ``AdmissionRejected`` yükselir.
+    """
+    models = model_router.candidates(label)
+    timeout = model_router.timeout(label)
+    result = {"error": "Denenecek model yok."}
+
+    with admission.llm_slot(_current_user_id(user_id)):
+        for index, model in enumerate(models):
+            body = {"model": model, "messages": messages}
+            if max_tokens:
+                body["max_tokens"] = max_tokens
+            last = index == len(models) - 1
+            started = time.perf_counter()
+            try:
+                # Yedek model varken aynı modelde tekrar beklemek yerine sıradakine geç
+                response = openrouter.post(body, timeout=timeout, retries=None if last else 0)
+                result = response.json()
+            except (requests.RequestException, ValueError) as e:
+                _record_call(label, messages, time.perf_counter() - started,
+                             ok=False, model=model)
+                result = {"error": str(e)}
+                continue
+            ok = "choices" in result
+            _record_call(label, messages, time.perf_counter() - started,
+                         result.get("usage"), ok=ok, model=model)
+            if ok:
+                _record_fallback(label, model)
+                return result
+    return result
+
+
+def _api_stream(messages, max_tokens=None, label="sohbet", user_id=None):
+    """OpenRouter'dan SSE (``stream: true``) ile yanıt parçalarını üret.
+
+    Her ``data:`` satırındaki ``delta.content`` metni sırayla yield edilir.
+    İlk parça gelmeden oluşan hatada görevin zincirindeki sıradaki model
+    denenir; parça yield edildikten sonra ya da zincir tükendiğinde hata
+    ``RequestException`` olarak yükseltilir. Kabul denetimi izni akış
+    boyunca tutulur.
+    """
+    models = model_router.candidates(label)
+    timeout = model_router.timeout(label)
+
+    with admission.llm_slot(_current_user_id(user_id)):
+        for index, model in enumerate(models):
+            body = {"model": model, "messages": messages, "stream": True}
+            if max_tokens:
+                body["max_tokens"] = max_tokens
+            last = index == len(models) - 1
+            usage = None
+            first_token = False
+            started = time.perf_counter()
+            try:
+                response = openrouter.post(
+                    body, timeout=timeout, retries=None if last else 0, stream=True
+                )
+                with response:
+                    if response.status_code != 200:
+                        raise requests.HTTPError(
+                            f"OpenRouter akış hatası: HTTP {response.status_code}",
+                            response=response,
+                        )
+                    for raw in response.iter_lines():
+                        # Boş satırlar olay ayırıcı, ':' ile başlayanlar keep-alive yorumu
+                        line = raw.decode("utf-8").strip()
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        if "error" in chunk:
+                            raise requests.RequestException(str(chunk["error"]))
+                        usage = chunk.get("usage") or usage  # son parçada gelir
+                        choices = chunk.get("choices") or [{}]
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            if not first_token:
+                                first_token = True
+                                LLM_FIRST_TOKEN.observe(
+                                    time.perf_counter() - started, caller=label
+                                )
+                            yield delta
+            except (requests.RequestException, ValueError):
+                _record_call(label, messages, time.perf_counter() - started,
+                             ok=False, model=model)
+                # Kullanıcı metnin bir kısmını gördüyse başka modelle baştan başlanmaz
+                if first_token or last:
+                    raise
+                continue
+            _record_call(label, messages, time.perf_counter() - started, usage, model=model)
+            _record_fallback(label, model)
+            return
 
 
 # ── Genel Servisler ─────────────────────────────────────────
 
-def get_first_greeting(psikolog):
-    """İlk karşılama mesajını AI'dan al."""
-    result = _api_call([
-        {
-            "role": "system",
-            "content": (
-                psikolog["sistem"]
-                + " Bu ilk karşılaşman. Kendini tanıt, sıcak bir şekilde selamla "
-                "ve ilk açık uçlu psikolojik soruyu sor. Kısa ve öz ol, "
-                "maksimum 3-4 cümle."
-            ),
-        },
-        {"role": "user", "content": "Merhaba, seninle konuşmak istiyorum."},
-    ])
+def _generate_greeting(psikolog):
+    """LLM'den yeni bir karşılama mesajı üret; hata veya yoğunlukta ``None``.
+
+    Karşılamanın sabit bir yedeği olduğundan kabul denetimi reddi burada
+    ``busy`` olarak yüzeye çıkarılmaz.
+    """
+    try:
+        result = _api_call([
+            {"role": "system", "content": prompts.greeting_prompt(psikolog)},
+            {"role": "user", "content": "Merhaba, seninle konuşmak istiyorum."},
+        ], label="karşılama")
+    except AdmissionRejected as e:
+        logger.warning("Karşılama üretilemedi: %s", e)
+        return None
 
     if "choices" not in result:
-        print("❌ API HATASI:", result)
+        logger.error("Karşılama API hatası: %s", result)
+        return None
+    return result["choices"][0]["message"]["content"].strip()
+
+
+def get_first_greeting(psikolog, tarz=None):
+    """İlk karşılama mesajını döndür.
+
+    ``tarz`` verilirse ve önbellek açıksa karşılama (tarz, model) havuzundan
+    seçilir; LLM'e yalnızca havuz boşken gidilir.
+    """
+    if tarz and greetings.enabled:
+        text = greetings.get(tarz, lambda: _generate_greeting(psikolog))
+    else:
+        text = _generate_greeting(psikolog)
+
+    if not text:
+        FALLBACKS.inc(caller="karşılama")
         return (
             f"Merhaba! Ben {psikolog['isim']}. "
             "Seninle tanıştığıma memnun oldum. Bugün seni buraya getiren nedir?"
         )
-    return result["choices"][0]["message"]["content"].strip()
+    return text
+
+
+def prefill_greetings(tarzlar, wait=False):
+    """Tüm tarzlar için karşılama havuzlarını doldur.
+
+    ``wait=False`` işleri arka plan havuzuna bırakır; ``wait=True`` bitene
+    kadar bekler ve tarz başına eklenen karşılama sayısını döndürür.
+    """
+    added = {}
+    for tarz, psikolog in tarzlar.items():
+        def generate(psikolog=psikolog):
+            return _generate_greeting(psikolog)
+
+        if wait:
+            added[tarz] = greetings.fill(tarz, generate)
+        else:
+            greetings.schedule_fill(tarz, generate)
+    return added
 
 
-def get_ai_response_with_style(history, psikolog, extended_mode=False):
-    """Tarz bazlı AI yanıtı al."""
-    base_prompt = (
-        psikolog["sistem"]
-        + " Danışanın son cevabına kısa bir yorum/karşılık ver (1-2 cümle), "
-        "empati göster veya anlayış belirt, sonra yeni bir açık uçlu psikolojik "
-        "soru sor. Toplamda 3-4 cümleyi geçme."
+def _chat_messages(psikolog, extended_mode, turns, summary, items):
+    return [
+        {"role": "system", "content": prompts.chat_prompt(psikolog, extended_mode, summary)},
+        *turns.chat(items),
+    ]
+
+
+def build_window(history, psikolog, extended_mode=False, conversation_id=None, user_id=None):
+    """Turun bağlam penceresi: ``(turns, özet, son öğeler)``.
+
+    Sistem istemi tarz için önceden derlenmiştir; tur mesajları görüşme
+    başına artımlı tutulur, yalnızca yeni öğeler çevrilir. Gerekirse eski
+    turlar burada bir kez özete katlanır; sohbet yanıtı ve READY kontrolü
+    aynı pencereyi ``window=`` ile paylaşabilir.
+    """
+    turns = prompts.turns(conversation_id, history)
+    summary, items = context_window.select(
+        conversation_id,
+        history,
+        lambda summary, items: _chat_messages(psikolog, extended_mode, turns, summary, items),
+        functools.partial(summarize_turns, user_id=user_id),
     )
+    return turns, summary, items
 
-    if extended_mode:
-        base_prompt += (
-            " \n\nÖNEMLİ: Görüşmede önemli bir noktaya ulaştın (10+ mesaj). "
-            "Klinik bir değerlendirme için yeterli verin var mı değerlendir. "
-            "Eğer YOKSA, eksik bilgiyi özellikle sor. "
-            "Eğer VARSA, sohbeti doğal bir şekilde sürdür ama derinlemesine "
-            "sorular sormaya devam et."
-        )
 
-    messages = [{"role": "system", "content": base_prompt}]
+def _format_transcript(history):
+    lines = []
     for item in history:
         if item.get("tip") == "psikolog":
-            messages.append({"role": "assistant", "content": item["mesaj"]})
-        elif item.get("tip") == "kullanici":
-            messages.append({"role": "user", "content": item["mesaj"]})
+            lines.append(f"Psikolog: {item['mesaj']}")
+        else:
+            lines.append(f"Danışan: {item['mesaj']}")
+    return "".join(line + "\n" for line in lines)
+
+
+def summarize_turns(previous_summary, items, user_id=None):
+    """Eski turları önceki özete katlayarak yeni özeti döndür; hata → ``None``."""
+    content = ""
+    if previous_summary:
+        content += f"Mevcut özet:\n{previous_summary}\n\n"
+    content += "Özete eklenecek yeni konuşma bölümü:\n" + _format_transcript(items)
+
+    result = _api_call(
+        [
+            {
+                "role": "system",
+                "content": (
+                    "Bir psikolojik ön görüşmenin özetini tutuyorsun. Mevcut özeti "
+                    "yeni konuşma bölümüyle güncelle. Danışanın anlattığı olguları, "
+                    "duyguları, belirtileri ve psikoloğun sorduğu konuları koru; "
+                    "tekrarları at. Sadece güncel özeti, Türkçe ve en fazla "
+                    "8-10 cümle olarak yaz."
+                ),
+            },
+            {"role": "user", "content": content},
+        ],
+        max_tokens=current_app.config["CONTEXT_SUMMARY_MAX_TOKENS"],
+        label="özet",
+        user_id=user_id,
+    )
 
-    result = _api_call(messages)
     if "choices" not in result:
-        print("❌ API HATASI:", result)
-        return "Anlıyorum... Peki bunu biraz daha açar mısın?"
-    return result["choices"][0]["message"]["content"].strip()
+        logger.error("Özet API hatası: %s", result)
+        FALLBACKS.inc(caller="özet")
+        return None
+    return result["choices"][0]["message"]["content"].strip() or None
+
+
+_STYLE_FALLBACK = "Anlıyorum... Peki bunu biraz daha açar mısın?"
+
+
+def get_ai_response_with_style(
+    history, psikolog, extended_mode=False, conversation_id=None, user_id=None,
+    window=None,
+):
+    """Tarz bazlı AI yanıtı al.
+
+    ``conversation_id`` verilirse eski turlar özetlenmiş bağlamla gönderilir;
+    ``window`` (``build_window``) verilirse pencere yeniden seçilmez.
+    Kısa erken cevaplar için yanıt önbelleği açıksa önce oraya bakılır.
+    """
+    cache_key = response_cache.key(psikolog["sistem"], history, extended_mode)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached
+
+    if window is None:
+        window = build_window(history, psikolog, extended_mode, conversation_id, user_id)
+    messages = _chat_messages(psikolog, extended_mode, *window)
+
+    result = _api_call(messages, user_id=user_id)
+    if "choices" not in result:
+        logger.error("Sohbet API hatası: %s", result)
+        FALLBACKS.inc(caller="sohbet")
+        return _STYLE_FALLBACK
+    text = result["choices"][0]["message"]["content"].strip()
+    response_cache.put(cache_key, text)
+    return text
+
+
+def stream_ai_response_with_style(
+    history, psikolog, extended_mode=False, conversation_id=None, user_id=None,
+    window=None,
+):
+    """Tarz bazlı AI yanıtını parça parça üret (token streaming).
+
+    Hiç parça gelmezse yedek mesaj tek parça olarak döner;
+    akış ortasında kesilirse o ana kadar gelen metinle yetinilir. Önbellekten
+    gelen yanıt tek parça olarak döner; yalnızca tamamlanan akışlar
+    önbelleğe yazılır.
+    """
+    cache_key = response_cache.key(psikolog["sistem"], history, extended_mode)
+    cached = response_cache.get(cache_key)
+    if cached:
+        yield cached
+        return
+
+    if window is None:
+        window = build_window(history, psikolog, extended_mode, conversation_id, user_id)
+    messages = _chat_messages(psikolog, extended_mode, *window)
+
+    parts = []
+    try:
+        for delta in _api_stream(messages, user_id=user_id):
+            parts.append(delta)
+            yield delta
+    except (requests.RequestException, ValueError) as e:
+        logger.error("Sohbet API akış hatası: %s", e)
+        cache_key = None
 
+    if not parts:
+        FALLBACKS.inc(caller="sohbet")
+        yield _STYLE_FALLBACK
+        return
+    response_cache.put(cache_key, "".join(parts).strip())
 
-def get_summary_response(qa_list):
-    """Görüşme sonu analiz/özet yanıtı al."""
+
+def get_summary_response(qa_list, user_id=None):
+    """Görüşme sonu analiz/özet yanıtı al; hata durumunda ``None``.
+
+    Arka planda üretildiğinden ``user_id`` kabul denetimi için açıkça verilir.
+    """
     content = "Aşağıda bir kişinin psikolojik sorulara verdiği yanıtlar var:\n\n"
     for i, qa in enumerate(qa_list, 1):
         content += f"{i}. Soru: {qa['soru']}\n   Cevap: {qa['cevap']}\n\n"
@@ -102,51 +406,74 @@ def get_summary_response(qa_list):
     result = _api_call([
         {"role": "system", "content": "Sen bir deneyimli psikolojik danışmansın."},
         {"role": "user", "content": content},
-    ])
+    ], label="analiz", user_id=user_id)
 
     if "choices" not in result:
-        print("❌ ANALİZ API HATASI:", result)
-        return "Analiz oluşturulamadı."
+        logger.error("Analiz API hatası: %s", result)
+        return None
     return result["choices"][0]["message"]["content"].strip()
 
 
-def check_if_ready_for_diagnosis(history):
-    """LLM'e sohbetin analiz için yeterli olup olmadığını sor."""
-    try:
-        conversation = ""
-        for item in history:
-            if item.get("tip") == "psikolog":
-                conversation += f"Psikolog: {item['mesaj']}\n"
-            else:
-                conversation += f"Danışan: {item['mesaj']}\n"
-
-        result = _api_call(
-            [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a clinical assessment expert. "
-                        "Analyze the conversation and determine if there's enough "
-                        "psychological data for a preliminary observation. "
-                        "Answer ONLY with 'READY' or 'NOT_READY'. Nothing else."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "Based on this conversation history, do you have enough data "
-                        "to provide a preliminary psychological observation?\n\n"
-                        + conversation
-                    ),
-                },
-            ],
-            max_tokens=10,
+def _build_ready_messages(conversation, summary=None):
+    if summary:
+        conversation = (
+            f"Görüşmenin önceki bölümünün özeti:\n{summary}\n\n"
+            f"Son konuşmalar:\n{conversation}"
         )
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a clinical assessment expert. "
+                "Analyze the conversation and determine if there's enough "
+                "psychological data for a preliminary observation. "
+                "Answer ONLY with 'READY' or 'NOT_READY'. Nothing else."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                "Based on this conversation history, do you have enough data "
+                "to provide a preliminary psychological observation?\n\n"
+                + conversation
+            ),
+        },
+    ]
+
+
+def _llm_ready_check(history, conversation_id=None, user_id=None, window=None):
+    """LLM'e sohbetin analiz için yeterli olup olmadığını sor; hata → ``None``."""
+    try:
+        if window is not None:
+            turns, summary, items = window
+            messages = _build_ready_messages(turns.transcript(items), summary)
+        else:
+            turns = prompts.turns(conversation_id, history)
+            messages = context_window.build(
+                conversation_id,
+                history,
+                lambda summary, items: _build_ready_messages(turns.transcript(items), summary),
+                functools.partial(summarize_turns, user_id=user_id),
+            )
+        result = _api_call(messages, max_tokens=10, label="ready", user_id=user_id)
 
         answer = result["choices"][0]["message"]["content"].strip().upper()
-        print(f"🔍 READY kontrolü: {answer}")
-        return "READY" in answer
+        logger.debug("LLM READY yanıtı: %s", answer)
+        return "READY" in answer and "NOT_READY" not in answer
 
     except Exception as e:
-        print(f"❌ READY kontrol hatası: {e}")
-        return False
+        logger.error("READY kontrol hatası: %s", e)
+        return None
+
+
+def check_if_ready_for_diagnosis(history, conversation_id=None, user_id=None, window=None):
+    """Sohbet analiz için yeterli mi? (yerel puan, gerekirse LLM)
+
+    Arka plan havuzunda çalıştığından ``user_id`` açıkça verilir; ``window``
+    sohbet yanıtının seçtiği bağlam penceresidir (yeniden özetleme yapılmaz).
+    """
+    return readiness.decide(
+        history,
+        lambda: _llm_ready_check(history, conversation_id, user_id, window),
+        conversation_id,
+    )
@@ -1,141 +1,256 @@
 """SocketIO olay işleyicileri ve Whisper STT entegrasyonu."""
 
-import os
-import tempfile
+import logging
+from concurrent.futures import TimeoutError as FutureTimeout
 
-import whisper
-from flask import session
+from flask import current_app, request, session
 from flask_login import current_user
-from flask_socketio import emit
+from flask_socketio import emit, join_room
 
-from app import db, socketio
-from app.constants import PSIKOLOG_TARZLARI
+from app import admission, conversations, executor, prompts, reports, socketio, stt, writer
+from app.admission import AdmissionRejected
 from app.models import Answer
-from app.services import get_ai_response_with_style, check_if_ready_for_diagnosis
+from app.reports import room_for
+from app.services import (
+    build_window,
+    get_ai_response_with_style,
+    stream_ai_response_with_style,
+    check_if_ready_for_diagnosis,
+)
+from app.stt import QueueFullError
 
+logger = logging.getLogger(__name__)
 
-# ── Whisper Lazy Loading ────────────────────────────────────
 
-_whisper_model = None
+# ── Ses → Metin ─────────────────────────────────────────────
+
+@socketio.on("audio_message")
+def handle_audio(data):
+    """Ses kaydını transkripsiyon kuyruğuna ekle.
+
+    Whisper iş süreçlerinde çalışır; kuyruk sırası/ETA ve sonuç olayları
+    havuz tarafından bu bağlantının ``sid``'ine gönderilir.
+    """
+    try:
+        admission.admit_stt(current_user.id)
+    except AdmissionRejected as e:
+        emit("busy", e.to_event())
+        return
 
+    logger.debug("Ses kaydı alındı, kuyruğa ekleniyor")
+    emit("transcription_status", {"status": "processing"})
 
-def _get_whisper_model():
-    """Whisper modelini lazy olarak yükle (ilk ses kaydında)."""
-    global _whisper_model
-    if _whisper_model is None:
-        from flask import current_app
+    try:
+        stt.submit(request.sid, data)
+    except QueueFullError:
+        _emit_stt_busy()
 
-        model_name = current_app.config["WHISPER_MODEL"]
-        print(f"🎤 Whisper '{model_name}' modeli yükleniyor (ilk kullanım)...")
-        _whisper_model = whisper.load_model(model_name)
-        print(f"✅ Whisper '{model_name}' modeli hazır!")
-    return _whisper_model
 
+def _emit_stt_busy():
+    """Transkripsiyon kuyruğu dolu: istemciye ``busy`` olayı gönder."""
+    emit("busy", AdmissionRejected(
+        "stt", "overloaded", current_app.config["ADMISSION_QUEUE_TIMEOUT"]
+    ).to_event())
 
-# ── Ses → Metin ─────────────────────────────────────────────
 
-@socketio.on("audio_message")
-def handle_audio(data):
-    """Ses kaydını al, Whisper ile metne çevir."""
-    from flask import current_app
+# ── Akış Halinde Ses → Metin ────────────────────────────────
 
-    print("🎤 Ses kaydı alındı, işleniyor...")
-    emit("transcription_status", {"status": "processing"})
+# sid → aktif akış oturumu
+_ses_akislari = {}
+# Kabul denetimince reddedilen akışların sid'leri (audio_stop sessizce biter)
+_reddedilen_akislar = set()
+
+
+@socketio.on("audio_start")
+def handle_audio_start(*args):
+    """Yeni bir akış kaydı başlat (önceki varsa iptal edilir)."""
+    from app.stt.stream import StreamingTranscription
+
+    sid = request.sid
+    eski = _ses_akislari.pop(sid, None)
+    if eski is not None:
+        eski.abort()
 
     try:
-        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as tmp:
-            tmp.write(data)
-            tmp_path = tmp.name
-
-        model = _get_whisper_model()
-        result = model.transcribe(
-            tmp_path,
-            language="tr",
-            temperature=0,
-            initial_prompt=current_app.config["WHISPER_INITIAL_PROMPT"],
-        )
-        text = result["text"].strip()
+        admission.admit_stt(current_user.id)
+    except AdmissionRejected as e:
+        _reddedilen_akislar.add(sid)
+        emit("busy", e.to_event())
+        return
+    _reddedilen_akislar.discard(sid)
+
+    def emit_to_sid(event, data):
+        socketio.emit(event, data, to=sid)
 
-        os.unlink(tmp_path)
-        print(f"📝 Transkripsiyon: {text[:60]}...")
+    _ses_akislari[sid] = StreamingTranscription(
+        sid, stt, emit_to_sid, current_app.config
+    )
+    logger.debug("Akış kaydı başladı")
 
-        if not text:
-            emit("transcription_status", {"status": "empty"})
+
+@socketio.on("audio_chunk")
+def handle_audio_chunk(data):
+    """Kayıt parçasını artımlı çözücüye ilet."""
+    akis = _ses_akislari.get(request.sid)
+    if akis is not None:
+        akis.feed(data)
+
+
+@socketio.on("audio_stop")
+def handle_audio_stop(*args):
+    """Kaydı bitir; son segment çevrilince ``transcription_result`` gelir."""
+    akis = _ses_akislari.pop(request.sid, None)
+    if akis is None:
+        if request.sid in _reddedilen_akislar:
+            _reddedilen_akislar.discard(request.sid)
             return
+        emit("transcription_status", {"status": "empty"})
+        return
+    emit("transcription_status", {"status": "processing"})
+    akis.finish()
 
-        emit("transcription_result", {"text": text})
 
-    except Exception as e:
-        print(f"❌ Whisper hatası: {e}")
-        if "tmp_path" in locals() and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        emit("transcription_status", {"status": "error", "message": str(e)})
+@socketio.on("disconnect")
+def handle_disconnect(*args):
+    """Bağlantı kapanınca bu istemcinin transkripsiyon işlerini iptal et."""
+    _reddedilen_akislar.discard(request.sid)
+    akis = _ses_akislari.pop(request.sid, None)
+    if akis is not None:
+        akis.abort()
+    iptal = stt.cancel(request.sid)
+    if iptal:
+        logger.info("%d transkripsiyon işi iptal edildi (bağlantı kesildi)", iptal)
 
 
 # ── Kullanıcı Mesajı ────────────────────────────────────────
 
 @socketio.on("user_message")
 def handle_message(data):
-    """Kullanıcı mesajını işle ve AI yanıtı gönder."""
+    """Kullanıcı mesajını işle ve AI yanıtı gönder.
+
+    Kabul denetimi LLM çağrısını reddederse mesaj kaydedilmez ve istemciye
+    ``busy`` gönderilir; istemci mesajı geri alıp tekrar gönderebilir.
+    """
     user_msg = data["message"]
     tarz = session.get("psikolog_tarz", "profesyonel")
-    psikolog = PSIKOLOG_TARZLARI[tarz]
-
-    # Mesajı geçmişe ekle
-    session["history"].append({"mesaj": user_msg, "tip": "kullanici"})
-    session.modified = True
+    psikolog = prompts.style(tarz)
+    conversation_id = session.get("conversation_id")
+    history = conversations.get(conversation_id)
 
     # Son psikolog sorusunu bul
     son_soru = ""
-    for item in reversed(session["history"]):
+    for item in reversed(history):
         if item.get("tip") == "psikolog" and item.get("soru"):
             son_soru = item["mesaj"]
             break
 
+    user_item = {"mesaj": user_msg, "tip": "kullanici"}
+    history.append(user_item)
+
+    mesaj_sayisi = sum(1 for item in history if item.get("tip") == "kullanici")
+    logger.debug("Toplam kullanıcı mesajı: %d", mesaj_sayisi)
+
+    extended = mesaj_sayisi >= 10
+    ready_future = None
+    window = None
+    try:
+        # READY kontrolünü yanıtla paralel başlat (5-9. mesajlar). Bağlam
+        # penceresi bir kez seçilir ve yanıtla paylaşılır; eski turlar iki
+        # kez özete katlanmaz. Zaten READY gönderildiyse kontrol çalışmaz.
+        if 5 <= mesaj_sayisi < 10 and not session.get("ready_sent", False):
+            window = build_window(
+                history, psikolog, extended, conversation_id, current_user.id
+            )
+            ready_future = executor.submit(
+                check_if_ready_for_diagnosis,
+                list(history), conversation_id, current_user.id, window,
+            )
+
+        # AI yanıtı al
+        if current_app.config["OPENROUTER_STREAMING"]:
+            # Parçaları geldikçe ilet, sonunda birleşik mesajı gönder
+            parcalar = []
+            for delta in stream_ai_response_with_style(
+                history, psikolog, extended_mode=extended,
+                conversation_id=conversation_id, user_id=current_user.id, window=window,
+            ):
+                parcalar.append(delta)
+                emit("ai_response_chunk", {"delta": delta, "psikolog": psikolog["isim"]})
+            ai_response = "".join(parcalar).strip()
+        else:
+            ai_response = get_ai_response_with_style(
+                history, psikolog, extended_mode=extended,
+                conversation_id=conversation_id, user_id=current_user.id, window=window,
+            )
+    except AdmissionRejected as e:
+        logger.warning("Mesaj reddedildi: %s", e)
+        if ready_future is not None:
+            ready_future.cancel()
+        emit("busy", e.to_event())
+        return
+
+    # Mesajı geçmişe ekle
+    conversations.append(conversation_id, user_item)
+
     # Veritabanına kaydet
     try:
-        answer = Answer(
+        writer.add(
+            Answer,
             user_id=current_user.id,
+            conversation_id=conversation_id,
             question_text=son_soru,
             answer_text=user_msg,
         )
-        db.session.add(answer)
-        db.session.commit()
-        print(f"💾 Cevap kaydedildi: {user_msg[:30]}...")
+        logger.debug("Cevap kaydedildi: %s...", user_msg[:30])
     except Exception as e:
-        print(f"❌ Veritabanı hatası: {e}")
+        logger.error("Veritabanı hatası: %s", e)
 
-    mesaj_sayisi = sum(
-        1 for item in session["history"] if item.get("tip") == "kullanici"
-    )
-    print(f"🧠 Toplam kullanıcı mesajı: {mesaj_sayisi}")
-
-    # AI yanıtı al
-    extended = mesaj_sayisi >= 10
-    ai_response = get_ai_response_with_style(
-        session["history"], psikolog, extended_mode=extended
-    )
-
-    session["history"].append(
-        {"mesaj": ai_response, "tip": "psikolog", "soru": True}
-    )
-    session.modified = True
+    item = {"mesaj": ai_response, "tip": "psikolog", "soru": True}
+    conversations.append(conversation_id, item)
+    history.append(item)
 
     emit("ai_response", {"message": ai_response, "psikolog": psikolog["isim"]})
 
+    # Bu arada READY başka bir mesajla gönderildiyse sınıflandırıcıyı iptal et
+    if ready_future is not None and session.get("ready_sent", False):
+        ready_future.cancel()
+
     # READY kontrolü (5+ mesajda)
     if mesaj_sayisi >= 5 and not session.get("ready_sent", False):
         if mesaj_sayisi >= 10:
-            print("🟢 10 mesaj — Otomatik READY durumu")
+            logger.info("10 mesaj — otomatik READY")
             session["ready_sent"] = True
             session.modified = True
             emit("ready_for_diagnosis", {"ready": True})
-        else:
-            ready_status = check_if_ready_for_diagnosis(session["history"])
+        elif ready_future is not None:
+            # Yanıt gönderildi; yavaş bir kontrol işleyiciyi tutmasın
+            try:
+                ready_status = ready_future.result(
+                    timeout=current_app.config["READINESS_WAIT_TIMEOUT"]
+                )
+            except FutureTimeout:
+                logger.warning("READY kontrolü zaman aşımına uğradı — NOT_READY sayıldı")
+                ready_future.cancel()
+                ready_status = False
             if ready_status:
-                print("✅ LLM READY döndü — Analiz için hazır")
+                logger.info("READY — analiz için hazır")
                 session["ready_sent"] = True
                 session.modified = True
                 emit("ready_for_diagnosis", {"ready": True})
             else:
-                print("⏳ LLM NOT_READY döndü — Sohbet devam ediyor")
+                logger.debug("NOT_READY — sohbet devam ediyor")
+
+
+# ── Rapor ───────────────────────────────────────────────────
+
+@socketio.on("report_watch")
+def handle_report_watch(*args):
+    """Geçerli görüşmenin rapor odasına katıl ve mevcut durumu gönder."""
+    conversation_id = session.get("conversation_id")
+    if not conversation_id:
+        return
+    join_room(room_for(conversation_id))
+    emit("report_status", {
+        "conversation_id": conversation_id,
+        **reports.status(current_user.id, conversation_id),
+    })
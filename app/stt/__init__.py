@@ -0,0 +1,11 @@
+"""Konuşmadan metne (STT) alt sistemi.
+
+Whisper/torch gibi ağır bağımlılıklar yalnızca bu paket içindeki iş
+süreçlerinde yüklenir; web süreci sadece iş kuyruğunu yönetir. Paketin
+kendisi import edildiğinde numpy dahi yüklenmez: ``engine``, ``audio``,
+``backends`` ve ``stream`` modülleri ancak ilk kullanımda import edilir.
+"""
+
+from app.stt.pool import QueueFullError, TranscriptionPool
+
+__all__ = ["QueueFullError", "TranscriptionPool"]
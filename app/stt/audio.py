@@ -0,0 +1,40 @@
+"""Ses çözümleme — kayıt baytlarını diske yazmadan float32 PCM'e çevirir."""
+
+import subprocess
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class AudioTooLongError(ValueError):
+    """Kayıt izin verilen en uzun süreyi aşıyor."""
+
+
+def pcm16_to_float32(raw):
+    """16-bit little-endian PCM baytlarını [-1, 1] aralığında float32'ye çevir."""
+    return np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_audio(data, max_seconds=None):
+    """Sıkıştırılmış kaydı ffmpeg stdin/stdout borusuyla 16 kHz mono diziye çöz.
+
+    ``max_seconds`` verilirse ffmpeg en fazla bu süre (+1 sn tolerans) kadar
+    çözer; kayıt daha uzunsa ``AudioTooLongError`` yükseltilir. Böylece uzun
+    bir yükleme tam olarak çözülmeden reddedilir.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0"]
+    if max_seconds:
+        cmd += ["-t", str(max_seconds + 1)]
+    cmd += ["-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+
+    proc = subprocess.run(cmd, input=data, capture_output=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"Ses çözümlenemedi: {proc.stderr.decode(errors='ignore').strip()}"
+        )
+
+    audio = pcm16_to_float32(proc.stdout)
+    if max_seconds and len(audio) > max_seconds * SAMPLE_RATE:
+        raise AudioTooLongError(f"Kayıt çok uzun (en fazla {max_seconds:g} sn).")
+    return audio
@@ -0,0 +1,154 @@
+"""Değiştirilebilir STT arka uçları.
+
+Her arka uç modelini ``load()`` ile yükler ve 16 kHz mono float32 diziyi
+``transcribe()`` ile metne çevirir. Ağır kütüphaneler (torch, ctranslate2)
+yalnızca ``load()`` içinde import edilir.
+"""
+
+import numpy as np
+
+from app.stt.audio import SAMPLE_RATE
+
+# Isınma için kullanılan 1 saniyelik sessiz klip
+WARMUP_CLIP = np.zeros(SAMPLE_RATE, dtype=np.float32)
+
+
+class STTBackend:
+    """STT arka uçları için temel arayüz."""
+
+    name = None
+
+    def __init__(self, model_name, initial_prompt=None, **options):
+        self.model_name = model_name
+        self.initial_prompt = initial_prompt
+        self.options = options
+        self.model = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio):
+        raise NotImplementedError
+
+    def transcribe_batch(self, clips):
+        """Birden çok klibi çevir; toplu çıkarım desteklemeyen arka uçlarda sırayla."""
+        return [self.transcribe(audio) for audio in clips]
+
+    def decode_options(self):
+        """Çözücü ayarları: sıcaklık ve (verildiyse) ışın genişliği."""
+        options = {"temperature": self.options.get("temperature", 0)}
+        if self.options.get("beam_size"):
+            options["beam_size"] = self.options["beam_size"]
+        return options
+
+    def warm_up(self):
+        """İlk çıkarımın JIT/bellek ayırma maliyetini kullanıcıdan önce öde."""
+        self.transcribe(WARMUP_CLIP)
+
+
+class WhisperBackend(STTBackend):
+    """openai-whisper (PyTorch, fp32 CPU)."""
+
+    name = "whisper"
+
+    def load(self):
+        import whisper
+
+        self.model = whisper.load_model(self.model_name)
+
+    def transcribe(self, audio):
+        result = self.model.transcribe(
+            audio,
+            language="tr",
+            initial_prompt=self.initial_prompt,
+            **self.decode_options(),
+        )
+        return result["text"].strip()
+
+    def transcribe_batch(self, clips):
+        """30 sn'ye sığan klipleri tek kodlayıcı geçişinde çevir.
+
+        Klipler 30 sn'ye doldurulup log-mel tensörlerine çevrilir ve tek bir
+        ``(N, n_mels, 3000)`` yığını olarak çözülür; kod çözme her öğe için
+        ayrı yürür. Daha uzun klipler ``transcribe()`` ile tek tek çevrilir.
+        """
+        if len(clips) < 2:
+            return super().transcribe_batch(clips)
+
+        import torch
+        import whisper
+
+        short = [i for i, audio in enumerate(clips) if len(audio) <= whisper.audio.N_SAMPLES]
+        texts = [None] * len(clips)
+        if len(short) > 1:
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(clips[i]), n_mels=self.model.dims.n_mels
+                )
+                for i in short
+            ]).to(self.model.device)
+            options = whisper.DecodingOptions(
+                language="tr",
+                prompt=self.initial_prompt,
+                without_timestamps=True,
+                fp16=False,
+                **self.decode_options(),
+            )
+            for i, result in zip(short, whisper.decode(self.model, mel, options)):
+                # transcribe() ile aynı sessizlik eşiği: konuşma yoksa boş metin
+                silent = result.no_speech_prob > 0.6 and result.avg_logprob < -1.0
+                texts[i] = "" if silent else result.text.strip()
+        return [
+            self.transcribe(audio) if text is None else text
+            for audio, text in zip(clips, texts)
+        ]
+
+
+class FasterWhisperBackend(STTBackend):
+    """faster-whisper (CTranslate2) — CPU'da int8 kuantize çıkarım."""
+
+    name = "faster-whisper"
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=self.options.get("compute_type", "int8"),
+            cpu_threads=self.options.get("cpu_threads", 0),
+        )
+
+    def transcribe(self, audio):
+        segments, _info = self.model.transcribe(
+            audio,
+            language="tr",
+            initial_prompt=self.initial_prompt,
+            **self.decode_options(),
+        )
+        return "".join(segment.text for segment in segments).strip()
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(settings):
+    """Ayarlardaki ``backend`` adına göre (yüklenmemiş) arka uç oluştur."""
+    try:
+        backend_cls = BACKENDS[settings["backend"]]
+    except KeyError:
+        raise ValueError(
+            f"Bilinmeyen STT arka ucu: {settings['backend']!r} "
+            f"(seçenekler: {', '.join(BACKENDS)})"
+        ) from None
+    return backend_cls(
+        settings["model_name"],
+        initial_prompt=settings["initial_prompt"],
+        compute_type=settings["compute_type"],
+        cpu_threads=settings["cpu_threads"],
+        beam_size=settings.get("beam_size"),
+        temperature=settings.get("temperature", 0),
+    )
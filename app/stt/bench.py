@@ -0,0 +1,228 @@
+"""Transkripsiyon benchmark'ı (``flask --app run stt-bench``).
+
+Bir klasördeki ses kayıtlarını ``handle_audio`` ile aynı yoldan
+(``engine.transcribe``: bellekte ffmpeg çözme + arka uç) geçirir ve her
+model yapılandırması için yükleme süresi, en yüksek RSS, gerçek zaman
+çarpanı (RTF) ve referans metin varsa kelime hata oranını (WER) raporlar.
+Her yapılandırma ayrı bir "spawn" sürecinde çalışır; böylece bellek ve
+yükleme süresi önceki yapılandırmalardan etkilenmez.
+
+Referans metin, kayıtla aynı adı taşıyan ``.txt`` dosyasıdır
+(``klip01.webm`` → ``klip01.txt``).
+"""
+
+import multiprocessing
+import re
+import resource
+import sys
+import time
+from pathlib import Path
+
+AUDIO_EXTENSIONS = {".webm", ".ogg", ".opus", ".wav", ".mp3", ".m4a", ".flac"}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+# ── Klipler ve WER ──────────────────────────────────────────
+
+def find_clips(directory):
+    """Klasördeki kayıtları ``(yol, referans metin | None)`` olarak döndür."""
+    clips = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in AUDIO_EXTENSIONS:
+            continue
+        reference = path.with_suffix(".txt")
+        text = reference.read_text(encoding="utf-8") if reference.exists() else None
+        clips.append((str(path), text))
+    return clips
+
+
+def normalize_words(text):
+    """Türkçe küçük harfe çevir, noktalamayı at ve kelimelere böl."""
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    return _PUNCTUATION.sub(" ", text).split()
+
+
+def word_edits(reference, hypothesis):
+    """Kelime düzeyinde Levenshtein uzaklığı (ekleme + silme + değiştirme)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+# ── Yapılandırmalar ─────────────────────────────────────────
+
+def parse_config(spec, base):
+    """``arka_uç:model[:compute_type]`` tanımını havuz ayarlarına uygula."""
+    parts = spec.split(":")
+    if not 2 <= len(parts) <= 3 or not all(parts):
+        raise ValueError(f"Geçersiz yapılandırma: {spec!r} (ör. faster-whisper:small:int8)")
+    settings = dict(base, backend=parts[0], model_name=parts[1])
+    if len(parts) == 3:
+        settings["compute_type"] = parts[2]
+    return settings
+
+
+def config_label(settings):
+    label = f"{settings['backend']}:{settings['model_name']}"
+    if settings["backend"] == "faster-whisper":
+        label += f":{settings['compute_type']}"
+    if settings.get("beam_size"):
+        label += f" beam={settings['beam_size']}"
+    if settings.get("temperature"):
+        label += f" t={settings['temperature']:g}"
+    if not settings.get("initial_prompt"):
+        label += " istemsiz"
+    return label
+
+
+# ── Ölçüm (alt süreç) ───────────────────────────────────────
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KiB, macOS'ta bayt
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_config(settings, clips, runs=1):
+    """Modeli yükle, klipleri ``runs`` kez çevir; ham ölçümleri döndür."""
+    from app.stt.engine import load_backend, transcribe
+
+    baseline_rss = _peak_rss_mb()
+    started = time.perf_counter()
+    backend = load_backend(settings)
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    backend.warm_up()
+    warmup_seconds = time.perf_counter() - started
+    loaded_rss = _peak_rss_mb()
+
+    results = []
+    for path, reference in clips:
+        data = Path(path).read_bytes()
+        for _ in range(runs):
+            timings = {}
+            entry = {"clip": Path(path).name}
+            try:
+                entry["text"] = transcribe(backend, data, settings["max_seconds"], timings)
+            except Exception as e:
+                entry["error"] = str(e)
+                results.append(entry)
+                continue
+            entry.update(timings)
+            if reference is not None:
+                ref_words = normalize_words(reference)
+                entry["ref_words"] = len(ref_words)
+                entry["edits"] = word_edits(ref_words, normalize_words(entry["text"]))
+            results.append(entry)
+
+    return {
+        "baseline_rss_mb": baseline_rss,
+        "loaded_rss_mb": loaded_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+        "load_seconds": load_seconds,
+        "warmup_seconds": warmup_seconds,
+        "clips": results,
+    }
+
+
+def _child_main(settings, clips, runs, conn):
+    from app.logs import configure_logging
+
+    configure_logging(settings["log_level"], settings["log_format"])
+    try:
+        conn.send(("ok", run_config(settings, clips, runs)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_isolated(settings, clips, runs=1):
+    """``run_config``'i temiz bir "spawn" sürecinde çalıştır."""
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child_main, args=(settings, clips, runs, sender))
+    process.start()
+    sender.close()
+    try:
+        status, payload = receiver.recv()
+    except EOFError:
+        status, payload = "error", f"süreç beklenmedik şekilde sonlandı (kod {process.exitcode})"
+    process.join()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+
+# ── Özet ────────────────────────────────────────────────────
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+
+def summarize(settings, result):
+    """Ham ölçümlerden yapılandırma başına özet satırı üret."""
+    ok = [c for c in result["clips"] if "error" not in c]
+    audio = sum(c["audio"] for c in ok)
+    decode = sum(c["decode"] for c in ok)
+    model = sum(c["transcribe"] for c in ok)
+    ref_words = sum(c.get("ref_words", 0) for c in ok)
+    edits = sum(c.get("edits", 0) for c in ok)
+    per_clip = [(c["decode"] + c["transcribe"]) / c["audio"] for c in ok if c["audio"]]
+    return {
+        "config": config_label(settings),
+        "clips": len(result["clips"]),
+        "errors": len(result["clips"]) - len(ok),
+        "load_seconds": round(result["load_seconds"], 3),
+        "warmup_seconds": round(result["warmup_seconds"], 3),
+        "model_rss_mb": round(result["loaded_rss_mb"] - result["baseline_rss_mb"], 1),
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+        "audio_seconds": round(audio, 2),
+        "decode_seconds": round(decode, 3),
+        "transcribe_seconds": round(model, 3),
+        # Kullanıcının beklediği süre çözmeyi de içerir; model RTF'si ayrıca
+        "rtf": round((decode + model) / audio, 3) if audio else None,
+        "model_rtf": round(model / audio, 3) if audio else None,
+        "rtf_p95": round(_percentile(per_clip, 0.95), 3) if per_clip else None,
+        "wer": round(edits / ref_words, 4) if ref_words else None,
+        "ref_words": ref_words,
+    }
+
+
+def format_table(rows):
+    """Özet satırlarını konsol tablosuna çevir."""
+    columns = [
+        ("config", "yapılandırma", "{}"),
+        ("load_seconds", "yükleme s", "{:.2f}"),
+        ("warmup_seconds", "ısınma s", "{:.2f}"),
+        ("peak_rss_mb", "tepe RSS MB", "{:.0f}"),
+        ("model_rss_mb", "model MB", "{:.0f}"),
+        ("audio_seconds", "ses s", "{:.1f}"),
+        ("rtf", "RTF", "{:.3f}"),
+        ("model_rtf", "model RTF", "{:.3f}"),
+        ("rtf_p95", "p95 RTF", "{:.3f}"),
+        ("wer", "WER", "{:.1%}"),
+        ("errors", "hata", "{}"),
+    ]
+    cells = [[title for _key, title, _fmt in columns]]
+    for row in rows:
+        cells.append([
+            "-" if row.get(key) is None else fmt.format(row[key])
+            for key, _title, fmt in columns
+        ])
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.ljust(w) if i == 0 else cell.rjust(w)
+                  for i, (cell, w) in enumerate(zip(line, widths)))
+        for line in cells
+    )
@@ -0,0 +1,117 @@
+"""Arka uç yükleme, transkripsiyon ve iş süreci döngüsü."""
+
+import logging
+import time
+
+from app.stt.audio import SAMPLE_RATE, decode_audio
+from app.stt.backends import create_backend
+
+logger = logging.getLogger(__name__)
+
+
+def load_backend(settings, warm_up=False):
+    """Ayarlara göre STT arka ucunu yükle, istenirse ısıt."""
+    backend = create_backend(settings)
+    backend.load()
+    if warm_up:
+        backend.warm_up()
+    return backend
+
+
+def transcribe(backend, audio, max_seconds=None, timings=None):
+    """Ses verisini metne çevir ve temizlenmiş metni döndür.
+
+    ``audio`` sıkıştırılmış kayıt baytları (webm/opus) ya da 16 kHz mono
+    float32 PCM dizisi (akış segmentleri) olabilir. Baytlar bellekte
+    çözülür; dosya sistemine hiç dokunulmaz. ``timings`` sözlüğü
+    verilirse ``decode``, ``transcribe`` ve ``audio`` süreleri (saniye)
+    içine yazılır.
+    """
+    started = time.perf_counter()
+    if isinstance(audio, bytes):
+        audio = decode_audio(audio, max_seconds)
+    decoded = time.perf_counter()
+    text = backend.transcribe(audio)
+    if timings is not None:
+        timings["decode"] = decoded - started
+        timings["transcribe"] = time.perf_counter() - decoded
+        timings["audio"] = len(audio) / SAMPLE_RATE
+    return text
+
+
+def transcribe_batch(backend, clips, max_seconds=None):
+    """Birden çok kaydı çöz ve tek toplu çıkarımla çevir.
+
+    Her klip için ``(text, error, timings)`` döndürür. Çözülemeyen ya da
+    fazla uzun kayıtlar yalnızca kendi hatasını alır; diğerleri yine
+    birlikte çevrilir. Toplu sürenin her klibe düşen payı ses süresiyle
+    orantılı olarak ``timings["transcribe"]``'a yazılır; ``batch`` ve
+    ``batch_seconds`` yığının boyutunu ve toplam model süresini taşır.
+    """
+    results, decoded = [], []
+    for audio in clips:
+        timings = {}
+        started = time.perf_counter()
+        try:
+            if isinstance(audio, bytes):
+                audio = decode_audio(audio, max_seconds)
+        except Exception as e:
+            results.append(["", str(e), timings])
+            continue
+        timings["decode"] = time.perf_counter() - started
+        timings["audio"] = len(audio) / SAMPLE_RATE
+        decoded.append((len(results), audio))
+        results.append([None, None, timings])
+
+    if decoded:
+        started = time.perf_counter()
+        try:
+            texts, error = backend.transcribe_batch([audio for _i, audio in decoded]), None
+        except Exception as e:
+            texts, error = [""] * len(decoded), str(e)
+        elapsed = time.perf_counter() - started
+        total_audio = sum(len(audio) for _i, audio in decoded)
+        for (i, audio), text in zip(decoded, texts):
+            share = len(audio) / total_audio if total_audio else 1 / len(decoded)
+            results[i][0], results[i][1] = text, error
+            results[i][2].update(
+                transcribe=elapsed * share, batch=len(decoded), batch_seconds=elapsed
+            )
+    return [tuple(result) for result in results]
+
+
+def worker_main(index, settings, task_q, result_q):
+    """İş süreci: kendi modelini yükler, kuyruktan gelen işleri çevirir.
+
+    ``settings`` arka uç, model adı, başlangıç istemi ve en uzun süre gibi
+    ayarları taşır. ``task_q``'dan ``[(job_id, audio), ...]`` yığını alır,
+    ``result_q``'ya ``(index, [(job_id, text, error, timings), ...],
+    duration)`` yazar. ``None`` gelince çıkar. Ölçümler ana süreçte
+    ``timings`` üzerinden kaydedilir.
+    """
+    # "spawn" ile başlayan süreç ana sürecin log ayarlarını devralmaz
+    from app.logs import configure_logging
+
+    configure_logging(settings["log_level"], settings["log_format"])
+
+    label = f"{settings['backend']}/{settings['model_name']}"
+    logger.info("[stt-%d] '%s' modeli yükleniyor...", index, label)
+    started = time.perf_counter()
+    backend = load_backend(settings, warm_up=settings["warm_up"])
+    logger.info(
+        "[stt-%d] '%s' modeli hazır (%.1f sn)", index, label, time.perf_counter() - started
+    )
+
+    while True:
+        batch = task_q.get()
+        if batch is None:
+            break
+        started = time.perf_counter()
+        outcomes = transcribe_batch(
+            backend, [audio for _job_id, audio in batch], settings["max_seconds"]
+        )
+        results = [
+            (job_id, text, error, timings)
+            for (job_id, _audio), (text, error, timings) in zip(batch, outcomes)
+        ]
+        result_q.put((index, results, time.perf_counter() - started))
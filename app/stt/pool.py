@@ -0,0 +1,322 @@
+"""Sınırlı iş kuyruğu + iş süreci havuzu ile arka plan transkripsiyonu.
+
+Socket işleyicisi ses kaydını kuyruğa bırakıp hemen döner. Her iş süreci
+kendi STT modelini tutar; tek bir arka plan döngüsü boştaki süreçlere
+iş dağıtır, sonuçları toplar ve olayları ilgili ``sid``'e gönderir.
+
+``STT_BATCH_SIZE`` > 1 ise aynı anda gelen kayıtlar mikro yığınlar halinde
+tek bir model geçişinde çevrilir: boştaki süreç, kuyruk yığını doldurana
+ya da en eski iş ``STT_BATCH_WAIT_MS`` bekleyene kadar iş almaz.
+"""
+
+import atexit
+import itertools
+import logging
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+
+from app.metrics import (
+    STT_AUDIO_SECONDS,
+    STT_BATCH_AUDIO_SECONDS,
+    STT_BATCH_MODEL_SECONDS,
+    STT_BATCH_SIZE,
+    STT_BATCH_SPEEDUP,
+    STT_BUSY_WORKERS,
+    STT_DECODE,
+    STT_ERRORS,
+    STT_QUEUE_DEPTH,
+    STT_QUEUE_WAIT,
+    STT_REAL_TIME_FACTOR,
+    STT_TRANSCRIBE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Gözlenmiş süre yokken ETA hesabı için varsayılan iş süresi (saniye)
+_DEFAULT_JOB_SECONDS = 5.0
+_POLL_INTERVAL = 0.05
+# Çöken bir iş sürecinin yeniden başlatılması için en az bekleme (saniye)
+_RESPAWN_DELAY = 5.0
+
+
+class QueueFullError(Exception):
+    """Transkripsiyon kuyruğu dolu — istemci daha sonra tekrar denemeli."""
+
+
+class TranscriptionJob:
+    """Kuyruktaki tek bir transkripsiyon işi."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, sid, audio, on_done=None):
+        self.id = next(self._ids)
+        self.sid = sid
+        self.audio = audio
+        self.on_done = on_done
+        self.submitted_at = time.monotonic()
+        self.cancelled = False
+        self.last_position = None
+
+
+class _Worker:
+    """Bir iş süreci ve ona ait görev kuyruğu."""
+
+    def __init__(self, index, process, task_q):
+        self.index = index
+        self.process = process
+        self.task_q = task_q
+        self.jobs = {}  # job_id → TranscriptionJob (süreçteki yığın)
+        self.spawned_at = time.monotonic()
+
+
+class TranscriptionPool:
+    """Bounded kuyruk + N iş süreci.
+
+    İş süreçleri ``start()`` ile bir kez açılır ve uygulama kapanana dek
+    yaşar; bekleyen işler kilitli kuyrukta durur.
+    """
+
+    def __init__(self, app=None, socketio=None):
+        self._socketio = None
+        self._workers = []
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._started = False
+        self._avg_seconds = _DEFAULT_JOB_SECONDS
+        if app is not None:
+            self.init_app(app, socketio)
+
+    def init_app(self, app, socketio):
+        cfg = app.config
+        self._socketio = socketio
+        self.num_workers = max(1, cfg["STT_WORKERS"])
+        self.queue_size = cfg["STT_QUEUE_SIZE"]
+        self.batch_size = max(1, cfg["STT_BATCH_SIZE"])
+        self.batch_wait = cfg["STT_BATCH_WAIT_MS"] / 1000
+        self.settings = {
+            "backend": cfg["STT_BACKEND"],
+            "model_name": cfg["WHISPER_MODEL"],
+            "initial_prompt": cfg["WHISPER_INITIAL_PROMPT"],
+            "compute_type": cfg["STT_COMPUTE_TYPE"],
+            "cpu_threads": cfg["STT_CPU_THREADS"],
+            "beam_size": cfg["STT_BEAM_SIZE"],
+            "warm_up": cfg["STT_WARMUP"],
+            "max_seconds": cfg["STT_MAX_AUDIO_SECONDS"],
+            "log_level": cfg["LOG_LEVEL"],
+            "log_format": cfg["LOG_FORMAT"],
+        }
+        app.extensions["stt"] = self
+        STT_QUEUE_DEPTH.set_function(lambda: len(self._pending))
+        STT_BUSY_WORKERS.set_function(
+            lambda: sum(1 for worker in self._workers if worker.jobs)
+        )
+        STT_BATCH_SPEEDUP.set_function(self._batch_speedup)
+
+    # ── Yaşam döngüsü ───────────────────────────────────────
+
+    def start(self):
+        """İş süreçlerini ve dağıtım döngüsünü başlat (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._result_q = self._ctx.Queue()
+        self._workers = [self._spawn(i) for i in range(self.num_workers)]
+        atexit.register(self.shutdown)
+        self._socketio.start_background_task(self._loop)
+
+    def _spawn(self, index):
+        # engine → numpy/arka uçlar; web sürecinde yalnızca havuz başlarken yüklenir
+        from app.stt.engine import worker_main
+
+        task_q = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(index, self.settings, task_q, self._result_q),
+            name=f"stt-{index}",
+            daemon=True,
+        )
+        process.start()
+        return _Worker(index, process, task_q)
+
+    def shutdown(self):
+        """İş süreçlerine durma sinyali gönder."""
+        for worker in self._workers:
+            if worker.process.is_alive():
+                worker.task_q.put(None)
+
+    # ── Genel API ───────────────────────────────────────────
+
+    def submit(self, sid, audio, on_done=None):
+        """İşi kuyruğa ekle; kuyruk doluysa ``QueueFullError`` yükselt.
+
+        ``on_done(job, text, error)`` verilmezse sonuç standart
+        ``transcription_result`` / ``transcription_status`` olaylarıyla
+        ``sid``'e gönderilir.
+        """
+        self.start()
+        job = TranscriptionJob(sid, audio, on_done)
+        with self._lock:
+            if len(self._pending) >= self.queue_size:
+                raise QueueFullError("Transkripsiyon kuyruğu dolu.")
+            self._pending.append(job)
+        return job
+
+    def cancel(self, sid):
+        """``sid``'e ait bekleyen işleri kaldır, çalışanların sonucunu yok say."""
+        with self._lock:
+            kept = deque(job for job in self._pending if job.sid != sid)
+            removed = len(self._pending) - len(kept)
+            self._pending = kept
+            # worker.jobs dağıtım döngüsünde de değişir; aynı kilit altında gez
+            for worker in self._workers:
+                for job in worker.jobs.values():
+                    if job.sid == sid:
+                        job.cancelled = True
+        return removed
+
+    def eta(self, position):
+        """Kuyruk sırasına göre tahmini bekleme süresi (saniye)."""
+        rounds = math.ceil(position / (self.num_workers * self.batch_size))
+        return round(rounds * self._avg_seconds, 1)
+
+    # ── Dağıtım döngüsü ─────────────────────────────────────
+
+    def _loop(self):
+        while True:
+            self._reap()
+            self._dispatch()
+            if not self._collect():
+                self._socketio.sleep(_POLL_INTERVAL)
+
+    def _reap(self):
+        """Ölen iş süreçlerini yeniden başlat, yarım kalan işi hatayla bitir."""
+        for i, worker in enumerate(self._workers):
+            if worker.process.is_alive():
+                continue
+            if time.monotonic() - worker.spawned_at < _RESPAWN_DELAY:
+                continue
+            logger.error("stt-%d süreci sonlandı, yeniden başlatılıyor", worker.index)
+            replacement = self._spawn(worker.index)
+            with self._lock:
+                self._workers[i] = replacement
+                lost = list(worker.jobs.values())
+                worker.jobs = {}
+            for job in lost:
+                self._finish(job, "", "Transkripsiyon süreci beklenmedik şekilde sonlandı.")
+
+    def _batch_ready(self):
+        """Kuyruk bir yığını doldurdu mu ya da en eski iş pencereyi aştı mı?"""
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self._pending[0].submitted_at >= self.batch_wait
+
+    def _dispatch(self):
+        with self._lock:
+            for worker in self._workers:
+                if worker.jobs or not self._batch_ready():
+                    continue
+                size = min(self.batch_size, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(size)]
+                now = time.monotonic()
+                for job in batch:
+                    STT_QUEUE_WAIT.observe(now - job.submitted_at)
+                    if job.last_position is not None:
+                        self._emit(job.sid, "transcription_status", {"status": "processing"})
+                worker.jobs = {job.id: job for job in batch}
+                worker.task_q.put([(job.id, job.audio) for job in batch])
+                for job in batch:
+                    job.audio = None
+            waiting = list(self._pending)
+
+        now = time.monotonic()
+        for position, job in enumerate(waiting, 1):
+            # Yığın penceresindeki kısa bekleme için "sırada" durumu gösterme
+            if now - job.submitted_at < self.batch_wait and job.last_position is None:
+                continue
+            if job.last_position != position:
+                job.last_position = position
+                self._emit(job.sid, "transcription_status", {
+                    "status": "queued",
+                    "position": position,
+                    "eta": self.eta(position),
+                })
+
+    def _collect(self):
+        try:
+            index, results, duration = self._result_q.get_nowait()
+        except queue.Empty:
+            return False
+
+        self._observe_batch(results)
+
+        worker = self._workers[index]
+        # Üstel hareketli ortalama ile ETA tahminini güncelle (yığın süresi)
+        self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * duration
+        for job_id, text, error, timings in results:
+            self._observe(error, timings)
+            # Yeniden başlatılan sürecin eski sonuçları yeni yığınla eşleşmez
+            with self._lock:
+                job = worker.jobs.pop(job_id, None)
+            if job is not None:
+                self._finish(job, text, error)
+        return True
+
+    def _observe_batch(self, results):
+        done = [timings for _job_id, _text, error, timings in results if not error]
+        if not done:
+            return
+        size = done[0]["batch"]
+        STT_BATCH_SIZE.observe(size)
+        STT_BATCH_MODEL_SECONDS.inc(done[0]["batch_seconds"], batch_size=size)
+        STT_BATCH_AUDIO_SECONDS.inc(sum(t["audio"] for t in done), batch_size=size)
+
+    def _batch_speedup(self):
+        """Tekli çevirinin ses saniyesi başına süresinin toplu çeviriye oranı."""
+
+        def rtf(sizes):
+            model = sum(STT_BATCH_MODEL_SECONDS.value(batch_size=n) for n in sizes)
+            audio = sum(STT_BATCH_AUDIO_SECONDS.value(batch_size=n) for n in sizes)
+            return model / audio
+
+        # Henüz iki türden de ölçüm yoksa ZeroDivisionError → örnek yazılmaz
+        return rtf([1]) / rtf(range(2, self.batch_size + 1))
+
+    def _observe(self, error, timings):
+        if error:
+            STT_ERRORS.inc()
+            return
+        labels = {
+            "backend": self.settings["backend"],
+            "model": self.settings["model_name"],
+        }
+        STT_DECODE.observe(timings["decode"])
+        STT_TRANSCRIBE.observe(timings["transcribe"], **labels)
+        STT_AUDIO_SECONDS.inc(timings["audio"])
+        if timings["audio"] > 0:
+            STT_REAL_TIME_FACTOR.observe(timings["transcribe"] / timings["audio"], **labels)
+
+    def _finish(self, job, text, error):
+        if job.cancelled:
+            return
+        if job.on_done is not None:
+            job.on_done(job, text, error)
+        elif error:
+            logger.error("Whisper hatası: %s", error)
+            self._emit(job.sid, "transcription_status", {"status": "error", "message": error})
+        elif not text:
+            self._emit(job.sid, "transcription_status", {"status": "empty"})
+        else:
+            logger.debug("Transkripsiyon: %s...", text[:60])
+            self._emit(job.sid, "transcription_result", {"text": text})
+
+    def _emit(self, sid, event, data):
+        self._socketio.emit(event, data, to=sid)
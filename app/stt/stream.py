@@ -0,0 +1,231 @@
+"""Parça parça gelen ses için artımlı çözümleme ve kayan pencereli STT.
+
+İstemci MediaRecorder parçalarını ``audio_chunk`` olarak gönderir. Parçalar
+kalıcı bir ffmpeg sürecinin stdin'ine yazılır; stdout'tan 16 kHz mono PCM
+okunur. Enerji tabanlı VAD konuşma sonundaki sessizliği yakalayınca (veya
+pencere dolunca) segment kapatılıp transkripsiyon havuzuna gönderilir.
+Segment sürerken belirli aralıklarla ara transkripsiyon yapılır ve
+``transcription_partial`` olayı yayınlanır. Sunucuda oturum başına en fazla
+bir pencerelik ses tutulur.
+"""
+
+import subprocess
+import threading
+
+import numpy as np
+
+from app.stt.audio import SAMPLE_RATE, pcm16_to_float32
+from app.stt.pool import QueueFullError
+
+_FRAME = SAMPLE_RATE * 30 // 1000  # 30 ms VAD çerçevesi
+_READ_SIZE = 32 * 1024
+
+
+class FfmpegStreamDecoder:
+    """webm/opus bayt akışını artımlı olarak float32 PCM'e çözen ffmpeg süreci."""
+
+    def __init__(self):
+        self._proc = subprocess.Popen(
+            [
+                "ffmpeg", "-nostdin", "-loglevel", "error",
+                "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buf = bytearray()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self):
+        while True:
+            data = self._proc.stdout.read1(_READ_SIZE)
+            if not data:
+                break
+            with self._lock:
+                self._buf.extend(data)
+
+    def feed(self, data):
+        """Yeni sıkıştırılmış ses parçasını ffmpeg'e yaz."""
+        try:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    def read(self):
+        """O ana kadar çözülmüş yeni örnekleri döndür."""
+        with self._lock:
+            usable = len(self._buf) - len(self._buf) % 2
+            raw = bytes(self._buf[:usable])
+            del self._buf[:usable]
+        return pcm16_to_float32(raw)
+
+    def close(self, timeout=10):
+        """Girdiyi kapat, ffmpeg'in bitmesini bekle, kalan örnekleri döndür."""
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        try:
+            self._proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        self._reader.join(timeout=timeout)
+        return self.read()
+
+    def kill(self):
+        if self._proc.poll() is None:
+            self._proc.kill()
+
+
+class StreamingTranscription:
+    """Tek bir istemcinin akış halindeki kayıt oturumu.
+
+    ``emit(event, data)`` ilgili ``sid``'e olay gönderir; transkripsiyonlar
+    ``pool.submit(..., on_done=...)`` ile iş süreçlerinde çalışır.
+    """
+
+    def __init__(self, sid, pool, emit, config):
+        self.sid = sid
+        self._pool = pool
+        self._emit = emit
+        self._window = int(config["STT_STREAM_WINDOW_SECONDS"] * SAMPLE_RATE)
+        self._silence_frames = config["STT_VAD_SILENCE_MS"] // 30
+        self._threshold = config["STT_VAD_THRESHOLD"]
+        self._partial_every = int(config["STT_STREAM_PARTIAL_SECONDS"] * SAMPLE_RATE)
+
+        self._decoder = FfmpegStreamDecoder()
+        self._lock = threading.Lock()
+        self._segment = np.zeros(0, dtype=np.float32)
+        self._segment_id = 0
+        self._has_speech = False
+        self._trailing_silence = 0
+        self._since_partial = 0
+        self._partial_busy = False
+        self._partial_text = ""
+        self._texts = []  # segment sırasına göre metinler (None = bekliyor)
+        self._stopping = False
+        self._done = False
+
+    # ── Girdi ───────────────────────────────────────────────
+
+    def feed(self, data):
+        self._decoder.feed(data)
+        self._consume(self._decoder.read())
+
+    def finish(self):
+        """Kaydı bitir: kalan sesi çöz, son segmenti gönder, sonucu bekle."""
+        samples = self._decoder.close()
+        self._consume(samples)
+        with self._lock:
+            self._commit_locked()
+            self._stopping = True
+            self._maybe_final_locked()
+
+    def abort(self):
+        self._decoder.kill()
+        with self._lock:
+            self._done = True
+
+    # ── VAD ve segmentleme ──────────────────────────────────
+
+    def _consume(self, samples):
+        if not len(samples):
+            return
+        with self._lock:
+            if self._done:
+                return
+            self._segment = np.concatenate([self._segment, samples])
+            self._since_partial += len(samples)
+
+            tail = samples[: len(samples) - len(samples) % _FRAME]
+            for frame in tail.reshape(-1, _FRAME):
+                if np.sqrt(np.mean(frame ** 2)) >= self._threshold:
+                    self._has_speech = True
+                    self._trailing_silence = 0
+                else:
+                    self._trailing_silence += 1
+
+            if self._has_speech and self._trailing_silence >= self._silence_frames:
+                self._commit_locked()
+            elif len(self._segment) >= self._window:
+                self._commit_locked()
+            elif self._has_speech and self._since_partial >= self._partial_every:
+                self._request_partial_locked()
+
+    def _commit_locked(self):
+        """Geçerli segmenti kapat ve havuza gönder; sesi bellekten bırak."""
+        segment, has_speech = self._segment, self._has_speech
+        self._segment = np.zeros(0, dtype=np.float32)
+        self._segment_id += 1
+        self._has_speech = False
+        self._trailing_silence = 0
+        self._since_partial = 0
+        self._partial_text = ""
+        if not has_speech:
+            return
+
+        index = len(self._texts)
+        self._texts.append(None)
+
+        def on_done(job, text, error):
+            with self._lock:
+                self._texts[index] = "" if error else text
+                self._emit_partial_locked()
+                self._maybe_final_locked()
+
+        self._submit(segment, on_done, index)
+
+    def _request_partial_locked(self):
+        if self._partial_busy:
+            return
+        self._partial_busy = True
+        self._since_partial = 0
+        segment_id = self._segment_id
+
+        def on_done(job, text, error):
+            with self._lock:
+                self._partial_busy = False
+                if error or segment_id != self._segment_id:
+                    return
+                self._partial_text = text
+                self._emit_partial_locked()
+
+        self._submit(self._segment.copy(), on_done)
+
+    def _submit(self, audio, on_done, index=None):
+        try:
+            self._pool.submit(self.sid, audio, on_done=on_done)
+        except QueueFullError:
+            # Ara sonuç atlanabilir; kesin segment kaybolursa boş sayılır
+            if index is not None:
+                self._texts[index] = ""
+            else:
+                self._partial_busy = False
+
+    # ── Çıktı ───────────────────────────────────────────────
+
+    def _text_locked(self):
+        return " ".join(t for t in self._texts if t).strip()
+
+    def _emit_partial_locked(self):
+        if self._done:
+            return
+        text = " ".join(filter(None, [self._text_locked(), self._partial_text]))
+        if text:
+            self._emit("transcription_partial", {"text": text})
+
+    def _maybe_final_locked(self):
+        if not self._stopping or self._done or None in self._texts:
+            return
+        self._done = True
+        text = self._text_locked()
+        if text:
+            self._emit("transcription_result", {"text": text})
+        else:
+            self._emit("transcription_status", {"status": "empty"})
@@ -0,0 +1 @@
+"""Yerel performans ölçüm betikleri (``python -m benchmarks.<ad>``)."""
@@ -0,0 +1,125 @@
+"""Answer ekleme hızını N eşzamanlı yazıcı altında ölç.
+
+Kullanım (depo kökünden):
+
+    python -m benchmarks.db_insert --writers 8 --rows 200
+    python -m benchmarks.db_insert --no-tuning          # PRAGMA'sız karşılaştırma
+    python -m benchmarks.db_insert --mode writer        # write-behind toplu yazıcı
+    python -m benchmarks.db_insert --url postgresql://user:pw@localhost/anamnez
+
+Varsayılan olarak geçici bir SQLite dosyası kullanılır.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from config import Config
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(url, writers, rows, mode, tuning):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+        DB_TUNING = tuning
+        PERSISTENCE_MODE = "async" if mode == "writer" else "sync"
+
+    from app import create_app, db, writer
+    from app.models import Answer
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def commit_worker(worker_id):
+        with app.app_context():
+            for i in range(rows):
+                started = time.perf_counter()
+                try:
+                    db.session.add(Answer(
+                        user_id=1,
+                        question_text=f"soru {worker_id}-{i}",
+                        answer_text="cevap " * 20,
+                    ))
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    with lock:
+                        errors.append(str(e).splitlines()[0])
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+
+    def writer_worker(worker_id):
+        for i in range(rows):
+            started = time.perf_counter()
+            writer.add(
+                Answer,
+                user_id=1,
+                question_text=f"soru {worker_id}-{i}",
+                answer_text="cevap " * 20,
+            )
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    target = writer_worker if mode == "writer" else commit_worker
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(writers)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if mode == "writer":
+        writer.shutdown()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stored = db.session.query(Answer).count()
+
+    total = writers * rows
+    print(f"mod={mode} ayar={'açık' if tuning else 'kapalı'} url={url}")
+    print(f"  yazıcı={writers} satır/yazıcı={rows} toplam={total} kaydedilen={stored}")
+    print(f"  süre={elapsed:.2f} sn  verim={stored / elapsed:.0f} satır/sn")
+    if latencies:
+        print(
+            f"  çağrı gecikmesi ms: ort={statistics.mean(latencies) * 1000:.2f} "
+            f"p50={_percentile(latencies, 50) * 1000:.2f} "
+            f"p95={_percentile(latencies, 95) * 1000:.2f} "
+            f"p99={_percentile(latencies, 99) * 1000:.2f}"
+        )
+    if errors:
+        print(f"  hata={len(errors)} (ör. {errors[0]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="SQLAlchemy bağlantı adresi (varsayılan: geçici SQLite)")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--mode", choices=("commit", "writer"), default="commit",
+                        help="commit: satır başına commit, writer: write-behind")
+    parser.add_argument("--no-tuning", action="store_true", help="motor profilini kapat")
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="anamnez-bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    run(url, args.writers, args.rows, args.mode, not args.no_tuning)
+
+
+if __name__ == "__main__":
+    main()
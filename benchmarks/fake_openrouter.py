@@ -0,0 +1,188 @@
+"""Yük testleri için yerel OpenRouter yedeği (gerçek API kredisi harcamaz).
+
+``/chat/completions`` uç noktasını OpenAI biçiminde taklit eder: normal
+JSON yanıt, ``stream: true`` ile SSE parçaları ve ``usage`` alanı. Gecikme,
+parça aralığı ve hata enjeksiyonu ayarlanabilir; ``--seed`` ile aynı
+gecikme/hata dizisi tekrar üretilir. ``--fail-models`` ile verilen modellere
+her istekte hata döner (yedek model zincirini denemek için).
+
+    python -m benchmarks.fake_openrouter --port 8099 --latency-ms 300 --jitter-ms 100
+    OPENROUTER_BASE_URL=http://127.0.0.1:8099/api/v1 python run.py
+
+Yanıt metni istem türüne göre seçilir: READY kontrolüne ``READY`` /
+``NOT_READY``, diğer çağrılara ``--reply-words`` kelimelik Türkçe metin.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = (
+    "anlıyorum bunu biraz daha açar mısın son zamanlarda kendini nasıl "
+    "hissediyorsun uykuların nasıl ailenle ilişkilerin iş ya da okul "
+    "hayatında seni en çok ne zorluyor bu duyguyu ilk ne zaman fark ettin"
+).split()
+
+
+class FakeOpenRouter(ThreadingHTTPServer):
+    """Ayarlanabilir gecikme ve hata oranıyla çalışan sahte API sunucusu."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=300, jitter_ms=100, chunk_ms=20,
+                 reply_words=30, error_rate=0.0, error_status=500,
+                 ready_rate=0.3, seed=0, fail_models=()):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.chunk_delay = chunk_ms / 1000
+        self.reply_words = reply_words
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ready_rate = ready_rate
+        self.fail_models = frozenset(fail_models)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streams": 0, "errors": 0, "models": {}}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def handle_error(self, request, client_address):
+        # İstemci (ör. durdurulan sunucu) bağlantıyı yanıt ortasında kapattı
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def plan(self, body):
+        """Bir istek için (gecikme, hata mı, yanıt metni) belirle."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["streams"] += bool(body.get("stream"))
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            model = body.get("model")
+            failed = failed or model in self.fail_models
+            self.stats["models"][model] = self.stats["models"].get(model, 0) + 1
+            self.stats["errors"] += failed
+            ready = self._random.random() < self.ready_rate
+            words = [self._random.choice(_WORDS) for _ in range(self.reply_words)]
+
+        system = (body.get("messages") or [{}])[0].get("content", "")
+        if "READY" in system and "NOT_READY" in system:
+            text = "READY" if ready else "NOT_READY"
+        else:
+            text = " ".join(words).capitalize() + "?"
+        return delay, failed, text
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        delay, failed, text = self.server.plan(body)
+        time.sleep(delay)
+
+        if failed:
+            status = self.server.error_status
+            self._json(status, {"error": {"code": status, "message": "injected error"}})
+            return
+
+        prompt_tokens = sum(len(m.get("content", "")) for m in body["messages"]) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4}
+        if not body.get("stream"):
+            self._json(200, {
+                "choices": [{"message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            delta = word if i == 0 else " " + word
+            self._chunk({"choices": [{"delta": {"content": delta}}]})
+            time.sleep(self.server.chunk_delay)
+        self._chunk({"choices": [{"delta": {}}], "usage": usage})
+        self._write(b"data: [DONE]\n\n")
+        self._write(b"")
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, payload):
+        self._write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode())
+
+    def _write(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=300, help="ilk yanıta kadar ortalama gecikme")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="gecikmeye eklenen ± rastgele sapma")
+    parser.add_argument("--chunk-ms", type=float, default=20, help="akışta parçalar arası süre")
+    parser.add_argument("--reply-words", type=int, default=30)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="hata döndürülecek istek oranı (0-1)")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--ready-rate", type=float, default=0.3, help="READY kontrolünde READY oranı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fail-models", default="", help="her istekte hata dönecek modeller (virgülle)")
+
+
+def from_args(args, port=0):
+    return FakeOpenRouter(
+        port=port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        chunk_ms=args.chunk_ms,
+        reply_words=args.reply_words,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        ready_rate=args.ready_rate,
+        seed=args.seed,
+        fail_models=[m.strip() for m in args.fail_models.split(",") if m.strip()],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8099)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = from_args(args, args.port)
+    print(f"OPENROUTER_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"istatistik: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
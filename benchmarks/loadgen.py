@@ -0,0 +1,443 @@
+"""N eşzamanlı danışanla tam akış yük testi (tarz seçimi → sohbet → rapor).
+
+Varsayılan olarak her şey yerelde kurulur: ``fake_openrouter`` yedek API
+sunucusu, geçici SQLite veritabanı, ``bench-<i>`` kullanıcıları ve
+``gunicorn.conf.py`` ile tek bir gevent sunucu süreci. Gerçek API kredisi
+harcanmaz, GPU gerekmez.
+
+    python -m benchmarks.loadgen --patients 20 --turns 5
+    python -m benchmarks.loadgen --patients 50 --latency-ms 800 --error-rate 0.05
+    python -m benchmarks.loadgen --transport http          # routes.question yolu
+    python -m benchmarks.loadgen --url http://127.0.0.1:5001 --username test --password test123
+
+Her danışan: giriş → ``/select-style`` → ``--turns`` mesaj (Socket.IO
+``user_message`` veya HTTP ``POST /question``) → ``/result`` → rapor hazır
+olana kadar ``/api/report`` yoklaması. İşlem başına p50/p95/p99 gecikme ve
+saniyedeki tur sayısı raporlanır. ``--seed`` mesajları, düşünme sürelerini
+ve yedek API'nin gecikme/hata dizisini sabitler.
+
+Yerel kurulumda danışanlar art arda mesaj gönderdiği için kullanıcı başına
+LLM hız sınırı yükseltilir (``--keep-user-limits`` ile kapatılır); genel
+sınırlar ve eşzamanlılık sınırı olduğu gibi kalır.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from app.constants import PSIKOLOG_TARZLARI
+from benchmarks import fake_openrouter
+from benchmarks.multiworker import ROOT, _free_port, _wait_ready
+
+TARZLAR = sorted(PSIKOLOG_TARZLARI)
+MESSAGES = (
+    "Son zamanlarda geceleri uyuyamıyorum, sabahları çok yorgun kalkıyorum.",
+    "İş yerinde sürekli gerginim, patronumla aram pek iyi değil.",
+    "Annemle babam ayrıldığından beri kendimi yalnız hissediyorum.",
+    "Bazen nedensiz yere kalbim hızlanıyor ve panik oluyorum.",
+    "Arkadaşlarımla görüşmeyi bıraktım, evden çıkmak istemiyorum.",
+    "İştahım azaldı, son iki ayda birkaç kilo verdim.",
+    "Sınav döneminde bu şikayetlerim daha da artıyor.",
+    "Çocukluğumda da benzer dönemler yaşadığımı hatırlıyorum.",
+)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Recorder:
+    """İşlem adına göre gecikme ve hata kaydı (iş parçacığı güvenli)."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(list)
+        self.busy = 0
+        self.turn_spans = []
+        self._lock = threading.Lock()
+
+    def ok(self, op, seconds):
+        with self._lock:
+            self.latencies[op].append(seconds)
+
+    def fail(self, op, reason):
+        with self._lock:
+            self.errors[op].append(reason)
+
+    def turn(self, started, finished):
+        with self._lock:
+            self.turn_spans.append((started, finished))
+
+    def mark_busy(self):
+        with self._lock:
+            self.busy += 1
+
+
+# ── Danışan ─────────────────────────────────────────────────
+
+class Patient:
+    """Tek bir danışanın tam akışı."""
+
+    def __init__(self, index, base, username, password, args, recorder):
+        self.index = index
+        self.base = base
+        self.username = username
+        self.password = password
+        self.args = args
+        self.rec = recorder
+        self.random = random.Random(args.seed * 1000 + index)
+        self.http = requests.Session()
+
+    def _timed(self, op, fn):
+        started = time.perf_counter()
+        try:
+            response = fn()
+        except requests.RequestException as e:
+            self.rec.fail(op, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.rec.fail(op, f"HTTP {response.status_code}")
+            return None
+        self.rec.ok(op, elapsed)
+        return response
+
+    def run(self):
+        login = self._timed("login", lambda: self.http.post(
+            f"{self.base}/login",
+            data={"username": self.username, "password": self.password},
+            allow_redirects=False,
+        ))
+        if login is None or "session" not in self.http.cookies:
+            self.rec.fail("login", "oturum açılamadı")
+            return
+
+        tarz = self.random.choice(TARZLAR)
+        if self._timed("select_style", lambda: self.http.post(
+            f"{self.base}/select-style", data={"tarz": tarz}, allow_redirects=False,
+        )) is None:
+            return
+
+        if self.args.transport == "socket":
+            if not self._chat_socket():
+                # Sohbet yarıda kaldı; rapor da eksik sayılır
+                self.rec.fail("report_ready", "oturum koptu")
+                return
+        else:
+            self._chat_http()
+        self._report()
+
+    def _think(self):
+        if self.args.think_ms:
+            time.sleep(self.random.uniform(0.5, 1.5) * self.args.think_ms / 1000)
+
+    def _message(self, turn):
+        return f"{self.random.choice(MESSAGES)} ({turn + 1})"
+
+    def _chat_socket(self):
+        """Turları Socket.IO üzerinden gönder; oturum koparsa ``False`` döndür."""
+        import socketio as sio_client
+        from engineio.payload import Payload
+
+        # websocket-client kurulu değilse istemci polling kullanır; akışın tüm
+        # parçaları tek yanıtta gelebilir, varsayılan sınır (16) oturumu düşürür
+        Payload.max_decode_packets = max(Payload.max_decode_packets, 1000)
+
+        client = sio_client.Client(reconnection=False)
+        done = threading.Event()
+        state = {}
+
+        @client.on("ai_response_chunk")
+        def on_chunk(data):
+            state.setdefault("first", time.perf_counter())
+
+        @client.on("ai_response")
+        def on_response(data):
+            state["result"] = "ok"
+            done.set()
+
+        @client.on("busy")
+        def on_busy(data):
+            state["result"] = "busy"
+            done.set()
+
+        cookie = "; ".join(f"{k}={v}" for k, v in self.http.cookies.items())
+        try:
+            client.connect(self.base, headers={"Cookie": cookie}, wait_timeout=10)
+        except Exception as e:
+            self.rec.fail("turn", f"bağlantı: {type(e).__name__}")
+            return True
+
+        try:
+            for turn in range(self.args.turns):
+                self._think()
+                done.clear()
+                state.clear()
+                started = time.perf_counter()
+                try:
+                    if not client.connected:
+                        raise sio_client.exceptions.SocketIOError("bağlantı kapalı")
+                    client.emit("user_message", {"message": self._message(turn)})
+                except sio_client.exceptions.SocketIOError as e:
+                    # Sunucu oturumu düşürdü: bu ve kalan turlar hata sayılır
+                    for _ in range(turn, self.args.turns):
+                        self.rec.fail("turn", f"oturum koptu: {type(e).__name__}")
+                    return False
+                if not done.wait(self.args.timeout):
+                    self.rec.fail("turn", "zaman aşımı")
+                    continue
+                finished = time.perf_counter()
+                if state["result"] == "busy":
+                    self.rec.mark_busy()
+                    self.rec.fail("turn", "busy")
+                    continue
+                self.rec.ok("turn", finished - started)
+                self.rec.turn(started, finished)
+                if "first" in state:
+                    self.rec.ok("first_chunk", state["first"] - started)
+        finally:
+            client.disconnect()
+        return True
+
+    def _chat_http(self):
+        for turn in range(self.args.turns):
+            self._think()
+            started = time.perf_counter()
+            response = self._timed("turn", lambda: self.http.post(
+                f"{self.base}/question",
+                data={"cevap": self._message(turn)},
+                allow_redirects=False,
+            ))
+            if response is None:
+                continue
+            self.rec.turn(started, time.perf_counter())
+            if response.status_code == 302 and "/result" in response.headers.get("Location", ""):
+                break  # 5. cevaptan sonra sonuç sayfasına yönlendirir
+
+    def _report(self):
+        started = time.perf_counter()
+        if self._timed("result", lambda: self.http.get(
+            f"{self.base}/result", allow_redirects=False,
+        )) is None:
+            return
+
+        deadline = started + self.args.timeout
+        while time.perf_counter() < deadline:
+            response = self.http.get(f"{self.base}/api/report")
+            status = response.json().get("status") if response.ok else "error"
+            if status == "done":
+                self.rec.ok("report_ready", time.perf_counter() - started)
+                return
+            if status == "error":
+                self.rec.fail("report_ready", "rapor hatası")
+                return
+            time.sleep(0.2)
+        self.rec.fail("report_ready", "zaman aşımı")
+
+
+# ── Yerel kurulum ───────────────────────────────────────────
+
+def _prepare_database(workdir, patients):
+    """Geçici veritabanını oluştur ve ``bench-<i>`` kullanıcılarını ekle."""
+    from werkzeug.security import generate_password_hash
+
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'app.db')}"
+        GREETING_CACHE_PATH = os.path.join(workdir, "greetings.json")
+
+    from app import create_app, db
+    from app.models import User
+
+    app = create_app(BenchConfig)
+    # Aynı parola için tek özet yeter; PBKDF2 kullanıcı başına saniyeler sürer
+    password_hash = generate_password_hash("bench", method="pbkdf2:sha256")
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            User(username=f"bench-{i}", password_hash=password_hash, role="user")
+            for i in range(patients)
+        )
+        db.session.commit()
+    return BenchConfig.SQLALCHEMY_DATABASE_URI
+
+
+def _start_server(workdir, database_url, api_base, args):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        OPENROUTER_BASE_URL=api_base,
+        OPENROUTER_API_KEY="bench",
+        GREETING_CACHE_PATH=os.path.join(workdir, "greetings.json"),
+        STT_PRELOAD="0",
+        GREETING_PREFILL="0",
+        LOG_LEVEL=args.log_level,
+    )
+    if not args.keep_user_limits:
+        env.setdefault("LLM_RATE_PER_USER", "6000")
+    log = open(os.path.join(workdir, "server.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "-b", f"127.0.0.1:{port}", "run:app"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    return f"http://127.0.0.1:{port}", proc, log
+
+
+# ── Rapor ───────────────────────────────────────────────────
+
+_SERVER_SERIES = (
+    "anamnez_llm_errors_total",
+    "anamnez_fallback_responses_total",
+    "anamnez_admission_rejected_total",
+)
+
+
+def _scrape_metrics(base):
+    """Sunucunun ``/metrics`` çıktısından hata/yedek sayaçlarını topla."""
+    try:
+        response = requests.get(f"{base}/metrics", timeout=5)
+    except requests.RequestException:
+        return {}
+    if not response.ok:
+        return {}
+    totals = {}
+    for line in response.text.splitlines():
+        name = line.split("{", 1)[0].split(" ", 1)[0]
+        if name in _SERVER_SERIES:
+            totals[name] = totals.get(name, 0) + float(line.rsplit(" ", 1)[1])
+    return totals
+
+
+def summarize(recorder, wall_seconds):
+    ops = ("login", "select_style", "turn", "first_chunk", "result", "report_ready")
+    rows = {}
+    for op in ops:
+        values = recorder.latencies.get(op, [])
+        errors = recorder.errors.get(op, [])
+        if not values and not errors:
+            continue
+        rows[op] = {
+            "n": len(values),
+            "errors": len(errors),
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p95_ms": _percentile(values, 95) * 1000,
+            "p99_ms": _percentile(values, 99) * 1000,
+            "max_ms": max(values, default=0.0) * 1000,
+        }
+
+    spans = recorder.turn_spans
+    chat_seconds = (max(f for _, f in spans) - min(s for s, _ in spans)) if spans else 0.0
+    return {
+        "operations": rows,
+        "turns": len(spans),
+        "busy": recorder.busy,
+        "chat_seconds": chat_seconds,
+        "turns_per_second": len(spans) / chat_seconds if chat_seconds else 0.0,
+        "wall_seconds": wall_seconds,
+    }
+
+
+def print_summary(summary):
+    print(f"{'işlem':<13} {'n':>5} {'hata':>5} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for op, row in summary["operations"].items():
+        print(f"{op:<13} {row['n']:>5} {row['errors']:>5} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"tur={summary['turns']} busy={summary['busy']} "
+          f"sohbet süresi={summary['chat_seconds']:.1f} sn "
+          f"→ {summary['turns_per_second']:.2f} tur/sn "
+          f"(toplam {summary['wall_seconds']:.1f} sn)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--think-ms", type=float, default=500, help="mesajlar arası ortalama düşünme süresi")
+    parser.add_argument("--ramp-s", type=float, default=2.0, help="danışanların başlatılmasının yayıldığı süre")
+    parser.add_argument("--transport", choices=("socket", "http"), default="socket")
+    parser.add_argument("--timeout", type=float, default=60.0, help="tur / rapor başına en uzun bekleme")
+    parser.add_argument("--url", help="çalışan bir sunucuyu hedefle (yerel kurulum yapılmaz)")
+    parser.add_argument("--username", default="test", help="--url ile tüm danışanların kullanıcısı")
+    parser.add_argument("--password", default="test123")
+    parser.add_argument("--keep-user-limits", action="store_true")
+    parser.add_argument("--log-level", default="WARNING", help="yerel sunucunun LOG_LEVEL değeri")
+    parser.add_argument("--json", help="sonuçları bu dosyaya JSON olarak yaz")
+    fake_openrouter.add_arguments(parser)
+    args = parser.parse_args()
+
+    fake = server = None
+    if args.url:
+        base = args.url.rstrip("/")
+        credentials = [(args.username, args.password)] * args.patients
+    else:
+        workdir = tempfile.mkdtemp(prefix="anamnez-loadgen-")
+        fake = fake_openrouter.from_args(args).start()
+        database_url = _prepare_database(workdir, args.patients)
+        server = _start_server(workdir, database_url, fake.base_url, args)
+        base = server[0]
+        credentials = [(f"bench-{i}", "bench") for i in range(args.patients)]
+        print(f"sunucu={base} yedek API={fake.base_url} günlükler={workdir}")
+
+    recorder = Recorder()
+    try:
+        _wait_ready(base)
+        patients = [
+            Patient(i, base, username, password, args, recorder)
+            for i, (username, password) in enumerate(credentials)
+        ]
+        threads = [threading.Thread(target=p.run, name=f"patient-{p.index}") for p in patients]
+        step = args.ramp_s / max(1, len(threads) - 1)
+        started = time.perf_counter()
+        for i, thread in enumerate(threads):
+            if i:
+                time.sleep(step)
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        server_metrics = _scrape_metrics(base)
+    finally:
+        if server is not None:
+            _, proc, log = server
+            proc.terminate()
+            proc.wait(timeout=10)
+            log.close()
+        if fake is not None:
+            fake.shutdown()
+
+    summary = summarize(recorder, wall)
+    summary["server"] = server_metrics
+    summary["config"] = {
+        k: v for k, v in vars(args).items() if k not in ("password", "json")
+    }
+    print(f"danışan={args.patients} tur={args.turns} aktarım={args.transport} seed={args.seed}")
+    print_summary(summary)
+    if server_metrics:
+        print("sunucu: " + " ".join(
+            f"{name.removeprefix('anamnez_')}={value:g}" for name, value in server_metrics.items()
+        ))
+    if fake is not None:
+        print(f"yedek API: {fake.stats}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
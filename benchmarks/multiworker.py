@@ -0,0 +1,338 @@
+"""İki sunucu süreci + yerel yedek broker ile çoklu worker doğrulaması.
+
+Kullanım (depo kökünden, gunicorn/gevent/redis paketleri kurulu olmalı):
+
+    python -m benchmarks.multiworker
+
+Redis protokolünün yayın/abone ve liste (görüşme deposu) alt kümesini
+konuşan küçük bir broker başlatılır, ardından ``gunicorn.conf.py`` ile iki
+ayrı port üzerinde iki sunucu süreci açılır. Görüşme deposu varsayılan
+olarak aynı broker üzerindeki ``CONVERSATION_STORE=redis``'tir
+(``--store sqlite`` ile ortak SQLite dosyası). Kontroller:
+
+1. Yapışkan oturum: bir worker'da açılan Engine.IO polling oturumu diğer
+   worker'da tanınmaz (yük dengeleyici istemciyi aynı worker'a sabitlemeli).
+2. Ortak kuyruk: başka bir süreçten (ör. transkripsiyon işçisi)
+   ``message_queue`` üzerinden yayınlanan olay, istemci hangi worker'a
+   bağlı olursa olsun ona ulaşır.
+3. Ortak görüşme deposu: bir worker'da başlayan görüşme diğer worker'da
+   sürdürülür ve ilk worker son mesajı görür.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHANNEL = "anamnez-socketio"
+
+
+# ── Yedek broker (Redis PUBLISH/SUBSCRIBE + liste alt kümesi) ─
+
+def _bulk(value):
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_bulk(item) for item in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(*items, push=False):
+    # RESP3 (HELLO 3) istemcilerinde yayın mesajları "push" (>) çerçevesidir
+    head = b">" if push else b"*"
+    return head + b"%d\r\n" % len(items) + b"".join(_bulk(item) for item in items)
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        parts = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            parts.append(self.rfile.read(size + 2)[:-2])
+        return parts
+
+    def send(self, data):
+        with self.server.lock:
+            self.wfile.write(data)
+
+    def handle(self):
+        subscribed = set()
+        self.resp3 = False
+        transaction = None  # MULTI sonrası kuyruğa alınan komutlar
+        try:
+            while True:
+                command = self._read_command()
+                if not command:
+                    break
+                name = command[0].upper()
+                if name == b"MULTI":
+                    transaction = []
+                    self.send(b"+OK\r\n")
+                elif name == b"EXEC":
+                    replies = [self.server.run_list_command(queued) for queued in transaction or ()]
+                    transaction = None
+                    self.send(_bulk(replies))
+                elif name == b"DISCARD":
+                    transaction = None
+                    self.send(b"+OK\r\n")
+                elif transaction is not None:
+                    transaction.append(command)
+                    self.send(b"+QUEUED\r\n")
+                elif name in _LIST_COMMANDS:
+                    self.send(_bulk(self.server.run_list_command(command)))
+                elif name == b"SUBSCRIBE":
+                    for channel in command[1:]:
+                        subscribed.add(channel)
+                        self.server.subscribers.setdefault(channel, set()).add(self)
+                        self.send(_array(b"subscribe", channel, len(subscribed), push=self.resp3))
+                elif name == b"UNSUBSCRIBE":
+                    for channel in command[1:] or list(subscribed):
+                        subscribed.discard(channel)
+                        self.server.subscribers.get(channel, set()).discard(self)
+                        self.send(_array(b"unsubscribe", channel, len(subscribed), push=self.resp3))
+                elif name == b"PUBLISH":
+                    channel, message = command[1], command[2]
+                    targets = list(self.server.subscribers.get(channel, ()))
+                    for target in targets:
+                        target.send(_array(b"message", channel, message, push=target.resp3))
+                    self.send(_bulk(len(targets)))
+                elif name == b"HELLO":
+                    self.resp3 = command[1:2] == [b"3"]
+                    proto = 3 if self.resp3 else 2
+                    self.send(b"%1\r\n" + _bulk(b"proto") + _bulk(proto))
+                elif name == b"PING":
+                    self.send(b"+PONG\r\n")
+                else:  # CLIENT SETINFO, SELECT vb.
+                    self.send(b"+OK\r\n")
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.server.subscribers.get(channel, set()).discard(self)
+
+
+_LIST_COMMANDS = frozenset({b"RPUSH", b"LRANGE", b"EXPIRE", b"DEL"})
+
+
+class StandInBroker(socketserver.ThreadingTCPServer):
+    """Yalnızca geliştirme/doğrulama için; kalıcılık ve kimlik doğrulama yok."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _BrokerHandler)
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.lists = {}
+        self._expires = {}
+        self._data_lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def run_list_command(self, command):
+        """``RPUSH``/``LRANGE``/``EXPIRE``/``DEL`` çalıştır; yanıt değerini döndür."""
+        name, args = command[0].upper(), command[1:]
+        with self._data_lock:
+            now = time.monotonic()
+            for key in [k for k, deadline in self._expires.items() if deadline <= now]:
+                self.lists.pop(key, None)
+                del self._expires[key]
+
+            if name == b"RPUSH":
+                items = self.lists.setdefault(args[0], [])
+                items.extend(args[1:])
+                return len(items)
+            if name == b"LRANGE":
+                items = self.lists.get(args[0], [])
+                start, stop = int(args[1]), int(args[2])
+                stop = len(items) + stop if stop < 0 else stop
+                return items[start:stop + 1]
+            if name == b"EXPIRE":
+                if args[0] not in self.lists:
+                    return 0
+                self._expires[args[0]] = now + int(args[1])
+                return 1
+            removed = 0
+            for key in args:  # DEL
+                self._expires.pop(key, None)
+                removed += self.lists.pop(key, None) is not None
+            return removed
+
+
+# ── Sunucu süreçleri ───────────────────────────────────────
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_workers(count, env, workdir):
+    workers = []
+    for index in range(count):
+        port = _free_port()
+        log = open(os.path.join(workdir, f"worker-{index}.log"), "w")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+             "-b", f"127.0.0.1:{port}", "run:app"],
+            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        workers.append((f"http://127.0.0.1:{port}", proc, log))
+    return workers
+
+
+def _wait_ready(base, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base}/login", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"{base} zamanında açılmadı")
+
+
+# ── Kontroller ──────────────────────────────────────────────
+
+def check_sticky(worker_a, worker_b):
+    """A'da açılan polling oturumu B'de reddedilmeli, A'da kabul edilmeli."""
+    handshake = requests.get(f"{worker_a}/socket.io/?EIO=4&transport=polling", timeout=5)
+    sid = json.loads(handshake.text[1:])["sid"]
+    query = f"/socket.io/?EIO=4&transport=polling&sid={sid}"
+    requests.post(worker_a + query, data="40", timeout=5)
+    same = requests.get(worker_a + query, timeout=5).status_code
+    other = requests.get(worker_b + query, timeout=5).status_code
+    ok = same == 200 and other == 400
+    print(f"  yapışkan oturum: aynı worker={same} diğer worker={other} → "
+          f"{'OK (dengeleyici yapışkan olmalı)' if ok else 'BEKLENMEDİK'}")
+    return ok
+
+
+def check_cross_worker(workers, broker):
+    """Her worker'a bir istemci bağla; kuyruktan yayınlanan olay hepsine ulaşmalı."""
+    import socketio as sio_client
+    from flask_socketio import SocketIO
+
+    received = {}
+    clients = []
+    for base in workers:
+        client = sio_client.Client()
+        client.on("mq_probe", lambda data, base=base: received.setdefault(base, data))
+        client.connect(base, transports=["polling"])
+        clients.append(client)
+
+    # Worker'lar kanala ilk bağlantıda abone olur
+    deadline = time.monotonic() + 10
+    while (len(broker.subscribers.get(CHANNEL.encode(), ())) < len(workers)
+           and time.monotonic() < deadline):
+        time.sleep(0.1)
+
+    # Web sürecinin dışındaki bir yayıncı (ör. ayrı bir işçi süreci)
+    external = SocketIO(message_queue=broker.url, channel=CHANNEL)
+    for base, client in zip(workers, clients):
+        external.emit("mq_probe", {"target": base}, to=client.get_sid())
+
+    deadline = time.monotonic() + 10
+    while len(received) < len(workers) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    for client in clients:
+        client.disconnect()
+
+    ok = len(received) == len(workers)
+    for base in workers:
+        print(f"  kuyruk üzerinden olay {base}: {'alındı' if base in received else 'ALINMADI'}")
+    return ok
+
+
+def check_conversation(worker_a, worker_b, broker, store):
+    """A'da başlayan görüşme B'de sürmeli; A, B'de eklenen mesajları görmeli."""
+    answer = "Son zamanlarda geceleri uyuyamıyorum."
+    http = requests.Session()
+    http.post(f"{worker_a}/login", data={"username": "test", "password": "test123"}, timeout=10)
+    http.post(f"{worker_a}/select-style", data={"tarz": "samimi"}, timeout=30)
+    continued = http.post(f"{worker_b}/question", data={"cevap": answer}, timeout=30)
+    seen = answer in http.get(f"{worker_a}/question", timeout=10).text
+
+    ok = continued.ok and seen
+    detail = f"diğer worker={continued.status_code} ilk worker cevabı {'gördü' if seen else 'GÖRMEDİ'}"
+    if store == "redis":
+        # Karşılama + cevap + yeni soru broker'daki listede olmalı
+        sizes = [len(items) for items in broker.lists.values()]
+        ok = ok and sizes == [3]
+        detail += f" broker listeleri={sizes}"
+    print(f"  görüşme deposu ({store}): {detail} → {'OK' if ok else 'BEKLENMEDİK'}")
+    return ok
+
+
+def main():
+    from benchmarks.fake_openrouter import FakeOpenRouter
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--store", choices=("redis", "sqlite"), default="redis",
+                        help="CONVERSATION_STORE (redis: yedek broker üzerinde)")
+    args = parser.parse_args()
+
+    broker = StandInBroker()
+    api = FakeOpenRouter(latency_ms=20, jitter_ms=0, chunk_ms=1).start()
+    workdir = tempfile.mkdtemp(prefix="anamnez-multiworker-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        CONVERSATION_STORE=args.store,
+        CONVERSATION_STORE_URL=(
+            broker.url if args.store == "redis" else os.path.join(workdir, "conversations.db")
+        ),
+        SOCKETIO_MESSAGE_QUEUE=broker.url,
+        SOCKETIO_CHANNEL=CHANNEL,
+        OPENROUTER_BASE_URL=api.base_url,
+        OPENROUTER_API_KEY="bench",
+        GREETING_CACHE_PATH=os.path.join(workdir, "greetings.json"),
+        STT_PRELOAD="0",
+    )
+    for command in ("migrate-db", "seed-db"):
+        subprocess.run([sys.executable, "-m", "flask", "--app", "run", command],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+
+    print(f"broker={broker.url} worker={args.workers} depo={args.store} günlükler={workdir}")
+    workers = _start_workers(args.workers, env, workdir)
+    try:
+        bases = [base for base, _, _ in workers]
+        for base in bases:
+            _wait_ready(base)
+        ok = (check_sticky(bases[0], bases[1])
+              & check_cross_worker(bases, broker)
+              & check_conversation(bases[0], bases[1], broker, args.store))
+    finally:
+        for _, proc, log in workers:
+            proc.terminate()
+            proc.wait(timeout=10)
+            log.close()
+        broker.shutdown()
+        api.shutdown()
+
+    print("✅ Çoklu worker kontrolleri geçti" if ok else "❌ Çoklu worker kontrolleri başarısız")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
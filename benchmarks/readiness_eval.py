@@ -0,0 +1,135 @@
+"""Yerel READY puanlayıcısını kaydedilmiş LLM kararlarıyla karşılaştır.
+
+Kayıt toplamak için uygulamayı ``READINESS_SCORER=llm`` (veya ``hybrid``)
+ve ``READINESS_LOG_PATH=readiness.jsonl`` ile çalıştırın, sonra:
+
+    python -m benchmarks.readiness_eval readiness.jsonl
+    python -m benchmarks.readiness_eval readiness.jsonl --threshold 0.55 --margin 0.1
+    python -m benchmarks.readiness_eval readiness.jsonl --sweep
+    python -m benchmarks.readiness_eval --topics
+
+``--topics`` konu çıkarımını ``TOPIC_CASES``'teki cümlelerle denetler
+(kısa köklerin dolgu ve ilgisiz kelimelerle eşleşmesi gibi gerilemeler
+için); bir durum tutmazsa sıfırdan farklı kodla çıkar.
+
+Puanlar kayıttaki geçmişten güncel ``heuristic_score`` ile yeniden
+hesaplanır; böylece sezgisel değişiklikler eski kayıtlarla denenebilir.
+"""
+
+import argparse
+import json
+import time
+
+from app.readiness import features, heuristic_score
+
+# (danışan cevabı, beklenen konular)
+TOPIC_CASES = [
+    # Kaçamak cevap: "işte" dolgu, "uyumlu"/"yasak" uyku/yas değil
+    ("İşte öyle, bilmem. Uyumlu biriyim, yasak bir şey yok.", []),
+    ("İştahım hiç yok, işte böyle.", ["beden"]),
+    ("Uyuyamıyorum, işimde çok stres var.", ["iş_okul", "kaygı", "uyku"]),
+    ("Babamı geçen yıl kaybettim, hâlâ yastayım.", ["aile", "geçmiş"]),
+    ("İşyerinde patronumla sorun yaşıyorum, geceleri uyanıyorum.", ["iş_okul", "uyku"]),
+]
+
+
+def load(path):
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if record.get("llm_ready") is not None:
+                    records.append(record)
+    return records
+
+
+def check_topics(cases=TOPIC_CASES):
+    """Beklenen konuları çıkmayan ``(cevap, beklenen, bulunan)`` durumları."""
+    failures = []
+    for text, expected in cases:
+        found = features([{"tip": "kullanici", "mesaj": text}])["topics"]
+        if found != sorted(expected):
+            failures.append((text, sorted(expected), found))
+    return failures
+
+
+def evaluate(labelled, threshold, margin):
+    """(puan, LLM kararı) çiftleri için yerel ve hibrit mod ölçümleri."""
+    tp = fp = tn = fn = 0
+    uncertain = hybrid_agree = 0
+    for score, llm_ready in labelled:
+        local = score >= threshold
+        if local and llm_ready:
+            tp += 1
+        elif local:
+            fp += 1
+        elif llm_ready:
+            fn += 1
+        else:
+            tn += 1
+        if abs(score - threshold) < margin:
+            uncertain += 1
+            hybrid_agree += 1  # belirsiz bölgede LLM'e sorulur
+        elif local == llm_ready:
+            hybrid_agree += 1
+
+    total = len(labelled)
+    return {
+        "total": total,
+        "accuracy": (tp + tn) / total,
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "confusion": (tp, fp, fn, tn),
+        "hybrid_accuracy": hybrid_agree / total,
+        "llm_call_rate": uncertain / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", nargs="?", help="READINESS_LOG_PATH ile üretilen JSONL dosyası")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--margin", type=float, default=0.1)
+    parser.add_argument("--sweep", action="store_true", help="eşik değerlerini tara")
+    parser.add_argument("--topics", action="store_true", help="konu çıkarımı gerileme durumları")
+    args = parser.parse_args()
+
+    if args.topics:
+        failures = check_topics()
+        for text, expected, found in failures:
+            print(f"HATA {text!r}: beklenen={expected} bulunan={found}")
+        print(f"konu durumları: {len(TOPIC_CASES) - len(failures)}/{len(TOPIC_CASES)} doğru")
+        if failures:
+            parser.exit(1)
+        if not args.log:
+            return
+    if not args.log:
+        parser.error("kayıt dosyası gerekli (ya da --topics)")
+
+    records = load(args.log)
+    if not records:
+        parser.exit(1, "Kayıt bulunamadı.\n")
+
+    started = time.perf_counter()
+    labelled = [(heuristic_score(r["history"]), r["llm_ready"]) for r in records]
+    per_call_ms = (time.perf_counter() - started) * 1000 / len(records)
+    ready = sum(1 for _, llm_ready in labelled if llm_ready)
+
+    print(f"kayıt={len(records)} LLM READY={ready} yerel puan süresi={per_call_ms:.3f} ms/çağrı")
+
+    thresholds = [round(0.3 + 0.05 * i, 2) for i in range(11)] if args.sweep else [args.threshold]
+    print(f"{'eşik':>5} {'doğruluk':>9} {'kesinlik':>9} {'duyarlılık':>10} "
+          f"{'hibrit':>7} {'LLM oranı':>9}  TP/FP/FN/TN")
+    for threshold in thresholds:
+        m = evaluate(labelled, threshold, args.margin)
+        print(
+            f"{threshold:>5.2f} {m['accuracy']:>9.2%} {m['precision']:>9.2%} "
+            f"{m['recall']:>10.2%} {m['hybrid_accuracy']:>7.2%} "
+            f"{m['llm_call_rate']:>9.2%}  {'/'.join(map(str, m['confusion']))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
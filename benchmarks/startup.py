@@ -0,0 +1,65 @@
+"""Soğuk başlangıç süresini ölç: ``import app`` ve ``create_app()``.
+
+Kullanım (depo kökünden):
+
+    python -m benchmarks.startup --runs 5
+
+Her ölçüm taze bir Python sürecinde yapılır; ağır modüllerin (numpy,
+torch, whisper) başlangıçta yüklenip yüklenmediği de raporlanır.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("numpy", "torch", "whisper", "faster_whisper")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({config!r})
+created = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "create_app": created - imported,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(config):
+    """Taze bir süreçte tek ölçüm yap."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _PROBE.format(config=config, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--config", default="config.Config",
+                        help="create_app'e verilecek yapılandırma sınıfı")
+    args = parser.parse_args()
+
+    results = [measure(args.config) for _ in range(args.runs)]
+    imports = [r["import"] * 1000 for r in results]
+    creates = [r["create_app"] * 1000 for r in results]
+    heavy = sorted({m for r in results for m in r["heavy"]})
+
+    print(f"çalıştırma={args.runs} config={args.config}")
+    print(f"  import app   ms: medyan={statistics.median(imports):.0f} min={min(imports):.0f}")
+    print(f"  create_app() ms: medyan={statistics.median(creates):.0f} min={min(creates):.0f}")
+    print(f"  yüklenen ağır modüller: {', '.join(heavy) if heavy else 'yok'}")
+
+
+if __name__ == "__main__":
+    main()
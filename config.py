@@ -14,23 +14,155 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Veritabanı motoru profili (SQLite: WAL + PRAGMA, sunucu DB: havuz ayarları)
+    DB_TUNING = os.environ.get("DB_TUNING", "1") == "1"
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_SYNCHRONOUS = "NORMAL"  # WAL ile güvenli, her commit'te fsync yok
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # 256 MB
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_RECYCLE = 1800  # saniye
+
+    # Görüşme geçmişi deposu: "memory" (süreç içi LRU) | "sqlite" | "redis"
+    CONVERSATION_STORE = os.environ.get("CONVERSATION_STORE", "memory")
+    CONVERSATION_STORE_URL = os.environ.get("CONVERSATION_STORE_URL")  # dosya yolu / redis://
+    CONVERSATION_STORE_MAX = 1000  # memory: tutulacak en fazla görüşme
+    CONVERSATION_TTL = 24 * 60 * 60  # redis: görüşme anahtarı ömrü (saniye)
+
+    # Answer/TestResult yazımı: "async" (write-behind, toplu) | "sync" (anında commit)
+    PERSISTENCE_MODE = os.environ.get("PERSISTENCE_MODE", "async")
+    PERSISTENCE_BATCH_SIZE = 50  # bu kadar satır birikince yaz
+    PERSISTENCE_FLUSH_INTERVAL = 1.0  # en geç bu kadar saniyede bir yaz
+    PERSISTENCE_RETRIES = 3  # başarısız toplu yazma tekrar sayısı (sonra satır satır)
+    PERSISTENCE_RETRY_BACKOFF = 0.2  # ilk tekrar beklemesi (saniye), her seferinde iki katı
+
     # OpenRouter API
     OPENROUTER_API_KEY = os.environ.get(
         "OPENROUTER_API_KEY",
         None,  # Üretimde mutlaka .env'de ayarlanmalı
     )
     OPENROUTER_MODEL = os.environ.get("OPENROUTER_MODEL", "openai/gpt-3.5-turbo")
+    # Yük testlerinde yerel yedek sunucu: benchmarks/fake_openrouter.py
+    OPENROUTER_BASE_URL = os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+    # OpenRouter HTTP istemcisi (bağlantı havuzu, zaman aşımı, tekrar)
+    OPENROUTER_POOL_SIZE = int(os.environ.get("OPENROUTER_POOL_SIZE", 10))
+    OPENROUTER_CONNECT_TIMEOUT = float(os.environ.get("OPENROUTER_CONNECT_TIMEOUT", 5))
+    OPENROUTER_READ_TIMEOUT = float(os.environ.get("OPENROUTER_READ_TIMEOUT", 60))
+    OPENROUTER_MAX_RETRIES = int(os.environ.get("OPENROUTER_MAX_RETRIES", 2))
+    OPENROUTER_BACKOFF_BASE = 0.5  # saniye
+    OPENROUTER_BACKOFF_MAX = 8.0  # saniye
+    OPENROUTER_RETRY_BUDGET = 20.0  # tüm tekrarlar için toplam süre (saniye)
+    OPENROUTER_CIRCUIT_THRESHOLD = 5  # devreyi açan ardışık hata sayısı
+    OPENROUTER_CIRCUIT_RESET = 30.0  # devrenin açık kalma süresi (saniye)
+
+    # Görev başına model zinciri: virgülle ayrılmış, sırayla denenir (boş = OPENROUTER_MODEL)
+    LLM_ROUTES = {
+        "sohbet": os.environ.get("LLM_ROUTE_SOHBET", ""),
+        "karşılama": os.environ.get("LLM_ROUTE_KARSILAMA", ""),
+        "özet": os.environ.get("LLM_ROUTE_OZET", ""),
+        "ready": os.environ.get("LLM_ROUTE_READY", ""),
+        "analiz": os.environ.get("LLM_ROUTE_ANALIZ", ""),
+    }
+    OPENROUTER_FALLBACK_MODELS = os.environ.get("OPENROUTER_FALLBACK_MODELS", "")  # tüm zincirlerin sonuna
+    LLM_ROUTE_TIMEOUTS = {"ready": 15.0}  # görev başına okuma zaman aşımı (yoksa OPENROUTER_READ_TIMEOUT)
+    LLM_ROUTE_MAX_FAILURES = 3  # modeli beklemeye alan ardışık hata sayısı
+    LLM_ROUTE_ERROR_THRESHOLD = 0.5  # modeli beklemeye alan hata oranı (üstel ortalama)
+    LLM_ROUTE_COOLDOWN = 30.0  # beklemeye alınan model bu süre zincirin sonuna gider (saniye)
+
+    # Psikolog yanıtlarını SSE ile parça parça ilet (ai_response_chunk)
+    OPENROUTER_STREAMING = os.environ.get("OPENROUTER_STREAMING", "1") == "1"
+
+    # Bağlam penceresi: son N tur aynen, eskiler artımlı özet olarak gönderilir
+    CONTEXT_SUMMARY = os.environ.get("CONTEXT_SUMMARY", "1") == "1"
+    CONTEXT_RECENT_TURNS = int(os.environ.get("CONTEXT_RECENT_TURNS", 6))
+    CONTEXT_SUMMARY_STEP = int(os.environ.get("CONTEXT_SUMMARY_STEP", 4))  # özet bu kadar turda bir güncellenir
+    CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 3000))  # istem token üst sınırı
+    CONTEXT_SUMMARY_MAX_TOKENS = 400
+
+    # READY kararı: "hybrid" (yerel puan, belirsizse LLM) | "heuristic" | "llm"
+    READINESS_SCORER = os.environ.get("READINESS_SCORER", "hybrid")
+    READINESS_THRESHOLD = float(os.environ.get("READINESS_THRESHOLD", 0.6))
+    READINESS_MARGIN = float(os.environ.get("READINESS_MARGIN", 0.1))  # belirsizlik bandı
+    READINESS_LOG_PATH = os.environ.get("READINESS_LOG_PATH")  # LLM kararlarının JSONL kaydı
+    READINESS_WAIT_TIMEOUT = float(os.environ.get("READINESS_WAIT_TIMEOUT", 2.0))  # yanıttan sonra READY sonucu için en fazla bekleme (saniye)
+
+    # Psikolog tarzları: yerleşik tarzlara eklenen/üzerine yazan JSON dosyası
+    STYLES_FILE = os.environ.get("STYLES_FILE")
+    # Artımlı mesaj listesi tutulan en fazla görüşme (süreç başına, 0 = kapalı)
+    PROMPT_CACHE_CONVERSATIONS = int(os.environ.get("PROMPT_CACHE_CONVERSATIONS", 1000))
+
+    # Kısa erken cevaplar için yanıt önbelleği (tarz, soru, cevap, tur)
+    RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "0") == "1"
+    RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 2000))
+    RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 24 * 60 * 60))  # saniye
+    RESPONSE_CACHE_SIMILARITY = float(os.environ.get("RESPONSE_CACHE_SIMILARITY", 0.8))  # 3-gram Jaccard
+    RESPONSE_CACHE_MAX_TURN = int(os.environ.get("RESPONSE_CACHE_MAX_TURN", 2))
+    RESPONSE_CACHE_MAX_WORDS = int(os.environ.get("RESPONSE_CACHE_MAX_WORDS", 4))
+
+    # İlk karşılama önbelleği: (tarz, model) başına K farklı karşılama
+    GREETING_CACHE = os.environ.get("GREETING_CACHE", "1") == "1"
+    GREETING_POOL_SIZE = int(os.environ.get("GREETING_POOL_SIZE", 5))
+    GREETING_TTL = int(os.environ.get("GREETING_TTL", 7 * 24 * 60 * 60))  # saniye
+    GREETING_CACHE_PATH = os.environ.get("GREETING_CACHE_PATH")  # varsayılan: instance/greetings.json
+    GREETING_PREFILL = os.environ.get("GREETING_PREFILL", "0") == "1"  # açılışta havuzları doldur
+
+    # Kabul denetimi: kullanıcı başına ve genel token kovası (istek/dakika),
+    # eşzamanlı LLM çağrısı sınırı; yer açılmazsa istemciye "busy" gönderilir
+    ADMISSION_CONTROL = os.environ.get("ADMISSION_CONTROL", "1") == "1"
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 10))  # en uzun bekleme (saniye)
+    LLM_RATE_PER_USER = int(os.environ.get("LLM_RATE_PER_USER", 20))
+    LLM_RATE_GLOBAL = int(os.environ.get("LLM_RATE_GLOBAL", 300))
+    LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 10))
+    STT_RATE_PER_USER = int(os.environ.get("STT_RATE_PER_USER", 10))
+    STT_RATE_GLOBAL = int(os.environ.get("STT_RATE_GLOBAL", 120))
+
+    # Loglama ve ölçümler
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")  # "text" | "json"
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"  # /metrics uç noktası
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # ayarlıysa "Authorization: Bearer <token>" gerekir
+
+    # Arka plan görev havuzu (READY kontrolü vb.)
+    BACKGROUND_WORKERS = int(os.environ.get("BACKGROUND_WORKERS", 4))
 
     # Whisper STT
     WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "small")
+    # "whisper" (openai-whisper, fp32) | "faster-whisper" (CTranslate2, int8 CPU)
+    STT_BACKEND = os.environ.get("STT_BACKEND", "whisper")
+    STT_COMPUTE_TYPE = os.environ.get("STT_COMPUTE_TYPE", "int8")  # faster-whisper
+    STT_CPU_THREADS = int(os.environ.get("STT_CPU_THREADS", 0))  # 0 = otomatik
+    STT_BEAM_SIZE = int(os.environ.get("STT_BEAM_SIZE", 0))  # 0 = kütüphane varsayılanı
+    # Modelleri açılışta yükle ve sessiz bir klip ile ısıt (ilk kullanıcı beklemesin)
+    STT_PRELOAD = os.environ.get("STT_PRELOAD", "0") == "1"
+    STT_WARMUP = os.environ.get("STT_WARMUP", "1") == "1"
     WHISPER_INITIAL_PROMPT = (
         "Bu bir profesyonel klinik görüşmedir. "
         "Lütfen standart İstanbul Türkçesi ile transkripsiyon yap. "
         "Argo, yerel ağız veya dini kalıplardan kaçın."
     )
+    STT_WORKERS = int(os.environ.get("STT_WORKERS", 1))  # her süreç kendi modelini tutar
+    STT_QUEUE_SIZE = int(os.environ.get("STT_QUEUE_SIZE", 8))  # bekleyen iş sınırı
+    STT_MAX_AUDIO_SECONDS = 120  # tek kayıt için en uzun süre
+    # Mikro yığınlama: boştaki süreç, kuyruk STT_BATCH_SIZE'a ulaşana ya da en
+    # eski iş STT_BATCH_WAIT_MS bekleyene kadar bekler (1 = tek tek çevir)
+    STT_BATCH_SIZE = int(os.environ.get("STT_BATCH_SIZE", 1))
+    STT_BATCH_WAIT_MS = int(os.environ.get("STT_BATCH_WAIT_MS", 100))
+
+    # Akış halinde STT (audio_chunk → transcription_partial)
+    STT_STREAMING = os.environ.get("STT_STREAMING", "1") == "1"
+    STT_STREAM_WINDOW_SECONDS = 30.0  # oturum başına tutulan en uzun segment
+    STT_STREAM_PARTIAL_SECONDS = 2.0  # ara transkripsiyon aralığı
+    STT_VAD_THRESHOLD = 0.01  # 30 ms çerçeve RMS eşiği
+    STT_VAD_SILENCE_MS = 600  # segmenti kapatan sessizlik süresi
 
     # SocketIO
     MAX_AUDIO_BUFFER = 16 * 1024 * 1024  # 16 MB
+    # "threading" (geliştirme) | "gevent" | "eventlet" — gunicorn.conf.py gevent seçer
+    SOCKETIO_ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE", "threading")
+    # Birden çok sunucu süreci için ortak kuyruk (ör. redis://redis:6379/0)
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE") or None
+    SOCKETIO_CHANNEL = os.environ.get("SOCKETIO_CHANNEL", "anamnez-socketio")
 
 
 class DevelopmentConfig(Config):
@@ -43,3 +175,13 @@ class ProductionConfig(Config):
     """Üretim ortamı."""
 
     DEBUG = False
+
+
+class TestingConfig(Config):
+    """Test ortamı — bellek içi veritabanı, senkron yazma."""
+
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    PERSISTENCE_MODE = "sync"
+    GREETING_CACHE = False
+    ADMISSION_CONTROL = False
@@ -0,0 +1,28 @@
+"""Üretim sunucusu yapılandırması: ``gunicorn -c gunicorn.conf.py run:app``.
+
+Flask-SocketIO, gunicorn'un kendi yük dağıtıcısıyla yapışkan oturum
+sağlayamadığı için her gunicorn örneği tek bir gevent worker çalıştırır.
+Birden çok çekirdek için farklı portlarda birden çok örnek başlatılır,
+önlerine yapışkan oturumlu bir yük dengeleyici (nginx ``ip_hash`` vb.)
+konur ve örnekler ``SOCKETIO_MESSAGE_QUEUE`` üzerinden haberleşir.
+"""
+
+import os
+
+# Uygulama worker içinde import edilmeden önce ayarlanmalı (config.py okur)
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "gevent")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+worker_class = "gevent"
+workers = 1
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+timeout = 120  # uzun LLM yanıtları
+graceful_timeout = 30
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    """Worker uygulamayı yükledikten sonra arka plan servislerini başlat."""
+    from run import start_background_services
+
+    start_background_services()
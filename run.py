@@ -1,9 +1,38 @@
 """Uygulama giriş noktası."""
 
-from app import create_app, socketio
+import os
 
-app = create_app()
+from app import create_app, prompts, socketio, stt
+
+
+def start_background_services():
+    """Sunucu açılırken STT ön yüklemesini ve karşılama doldurmayı başlat.
+
+    Yalnızca istek karşılayan süreçte çağrılır: gunicorn'da
+    ``post_worker_init`` kancasından, ``python run.py``'de Werkzeug'un asıl
+    sunucu alt sürecinden. ``flask --app run <komut>`` gibi tek seferlik
+    komutlar bu modülü import etse de iş süreci başlatmaz, LLM çağırmaz.
+    """
+    if app.config["STT_PRELOAD"]:
+        # STT iş süreçlerini hemen başlat; modeller arka planda yüklenip ısınır
+        stt.start()
+
+    if app.config["GREETING_PREFILL"]:
+        # Eksik karşılama havuzlarını arka planda doldur
+        from app.services import prefill_greetings
+
+        prefill_greetings(prompts.styles)
+
+
+# STT iş süreçleri "spawn" ile başlar ve bu modülü __mp_main__ olarak yeniden
+# yükler; uygulama yalnızca gerçek giriş noktasında kurulur.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=5001, debug=True, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    # Debug modunda Werkzeug önce bir izleyici süreç başlatır; asıl sunucu
+    # WERKZEUG_RUN_MAIN=true ile çalışan alt süreçtir.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_services()
+    socketio.run(app, host='0.0.0.0', port=5001, debug=True, allow_unsafe_werkzeug=True)